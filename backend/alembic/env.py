@@ -74,8 +74,13 @@ async def run_migrations_online() -> None:
     async with connectable.connect() as connection:
         await connection.run_sync(do_run_migrations)
 
+    await connectable.dispose()
+
 
 if context.is_offline_mode():
     run_migrations_offline()
+elif config.attributes.get("connection") is not None:
+    # Invoked from a running app with an open connection (app.db.migrate).
+    do_run_migrations(config.attributes["connection"])
 else:
     asyncio.run(run_migrations_online())
@@ -0,0 +1,28 @@
+"""organizations keyset index
+
+Revision ID: 5c2e8f1a9b37
+Revises: 968f755d9e27
+Create Date: 2026-10-19 09:12:04.118230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8f1a9b37'
+down_revision: Union[str, None] = '968f755d9e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_organizations_created_at_id', 'organizations', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_organizations_created_at_id', table_name='organizations')
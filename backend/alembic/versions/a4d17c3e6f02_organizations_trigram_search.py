@@ -0,0 +1,40 @@
+"""organizations trigram search
+
+Revision ID: a4d17c3e6f02
+Revises: 5c2e8f1a9b37
+Create Date: 2026-10-19 10:03:51.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d17c3e6f02'
+down_revision: Union[str, None] = '5c2e8f1a9b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = ('organization_name', 'address', 'contact_info')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in SEARCH_COLUMNS:
+        op.create_index(
+            f'ix_organizations_{column}_trgm',
+            'organizations',
+            [column],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in SEARCH_COLUMNS:
+        op.drop_index(f'ix_organizations_{column}_trgm', table_name='organizations')
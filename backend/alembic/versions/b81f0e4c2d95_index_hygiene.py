@@ -0,0 +1,64 @@
+"""index hygiene: drop duplicate id indexes, index foreign keys
+
+Revision ID: b81f0e4c2d95
+Revises: a4d17c3e6f02
+Create Date: 2026-10-19 11:26:40.930518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81f0e4c2d95'
+down_revision: Union[str, None] = 'a4d17c3e6f02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# UniqueConstraint('id') from the initial schema duplicates each primary key.
+# Postgres drops such a duplicate when it is part of the same CREATE TABLE, but
+# databases where it was added separately carry a second btree on every table.
+DUPLICATE_ID_CONSTRAINTS = {
+    'organizations': 'organizations_id_key',
+    'roles': 'roles_id_key',
+    'users': 'users_id_key',
+}
+
+
+def _foreign_keys_using(index_names):
+    """Foreign keys that Postgres bound to one of `index_names` instead of the primary key."""
+    rows = op.get_bind().execute(
+        sa.text(
+            "SELECT conname, conrelid::regclass::text, pg_get_constraintdef(oid) "
+            "FROM pg_constraint WHERE contype = 'f' "
+            "AND conindid::regclass::text = ANY(:names)"
+        ),
+        {"names": list(index_names)},
+    )
+    return rows.all()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dependent = _foreign_keys_using(DUPLICATE_ID_CONSTRAINTS.values())
+    for name, table, _ in dependent:
+        op.drop_constraint(name, table, type_='foreignkey')
+
+    for table, constraint in DUPLICATE_ID_CONSTRAINTS.items():
+        op.execute(f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}')
+
+    for name, table, definition in dependent:
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {name} {definition}')
+
+    op.create_index(op.f('ix_users_organization_id'), 'users', ['organization_id'], unique=False)
+    op.create_index(op.f('ix_user_roles_role_id'), 'user_roles', ['role_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_roles_role_id'), table_name='user_roles')
+    op.drop_index(op.f('ix_users_organization_id'), table_name='users')
+    # The duplicate unique constraints are not restored: they only ever
+    # duplicated the primary key index.
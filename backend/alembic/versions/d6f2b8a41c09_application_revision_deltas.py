@@ -0,0 +1,37 @@
+"""application revision deltas
+
+Revision ID: d6f2b8a41c09
+Revises: c3a9e5d07b18
+Create Date: 2026-10-19 13:58:22.671904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6f2b8a41c09'
+down_revision: Union[str, None] = 'c3a9e5d07b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('grant_applications', sa.Column('latest_version', sa.Integer(), server_default='1', nullable=False))
+    op.execute(
+        "UPDATE grant_applications SET latest_version = "
+        "(SELECT max(version) FROM grant_application_versions v WHERE v.application_id = grant_applications.id) "
+        "WHERE EXISTS (SELECT 1 FROM grant_application_versions v WHERE v.application_id = grant_applications.id)"
+    )
+    op.add_column('grant_application_versions', sa.Column('encoding', sa.String(length=8), server_default='full', nullable=False))
+    op.add_column('grant_application_versions', sa.Column('delta_depth', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('grant_application_versions', 'delta_depth')
+    op.drop_column('grant_application_versions', 'encoding')
+    op.drop_column('grant_applications', 'latest_version')
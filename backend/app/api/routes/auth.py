@@ -1,13 +1,16 @@
 from datetime import timedelta
 from typing import Annotated
+from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from sqlalchemy import exists, select
 from sqlalchemy.exc import IntegrityError
 from starlette import status
+from app.models.roles import Role, UserRole
 from app.models.user import User
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 from jose import jwt, JWTError
 from app.schemas.auth import CreateUserRequest, Token
+from app.deps.rate_limit import login_rate_limit
 from app.settings import get_settings
 from app.utils import (
     hash_password,
@@ -21,6 +24,7 @@ settings = get_settings()
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 oauth2_bearer = OAuth2PasswordBearer(tokenUrl="auth/login")
+oauth2_bearer_optional = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
 
 
 @router.post("/register", status_code=status.HTTP_201_CREATED)
@@ -55,7 +59,11 @@ async def create_user(db: DbDependency, create_user_request: CreateUserRequest):
         )
 
 
-@router.post("/login", response_model=Token)
+@router.post(
+    "/login",
+    response_model=Token,
+    dependencies=[Depends(login_rate_limit)]
+)
 async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()], db: DbDependency
 ):
@@ -89,4 +97,33 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_bearer)]):
         )
 
 
+async def get_optional_user(token: Annotated[str | None, Depends(oauth2_bearer_optional)]):
+    """The signed-in user, or None without a token; an invalid token is still rejected."""
+    if token is None:
+        return None
+    return await get_current_user(token)
+
+
 CurrentUser = Annotated[dict, Depends(get_current_user)]
+OptionalUser = Annotated[dict | None, Depends(get_optional_user)]
+
+
+async def get_admin_user(user: CurrentUser, db: DbDependency):
+    """The signed-in user, provided they hold the `admin_role` role."""
+    try:
+        user_id = UUID(str(user["id"]))
+    except ValueError:
+        user_id = None
+    is_admin = user_id is not None and await db.scalar(select(exists().where(
+        UserRole.user_id == user_id,
+        UserRole.role_id == Role.id,
+        Role.role_name == settings.admin_role,
+    )))
+    if not is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
+        )
+    return user
+
+
+AdminUser = Annotated[dict, Depends(get_admin_user)]
@@ -0,0 +1,60 @@
+from typing import List
+from fastapi import APIRouter, Depends, Query, status
+
+from app.api.routes.auth import get_admin_user
+from app.db.pool import pool_status
+from app.db.query_stats import query_stats
+from app.db.session import engine, read_engine
+from app.deps.usage import usage_rollup
+from app.schemas.usage import UsageRollup
+
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(get_admin_user)]
+)
+
+
+@router.get(
+    "/db/pool",
+    status_code=status.HTTP_200_OK
+)
+async def db_pool_status():
+    """Connection pool occupancy and cumulative checkout/wait counters."""
+    status = pool_status(engine.pool)
+    if read_engine is not None:
+        status["replica"] = pool_status(read_engine.pool)
+    return status
+
+
+
+@router.get(
+    "/db/queries",
+    status_code=status.HTTP_200_OK
+)
+async def db_query_stats(
+    limit: int = Query(50, ge=1, le=500),
+    order_by: str = Query("total_ms", pattern="^(total_ms|max_ms|calls|slow_calls)$")
+):
+    """Per-statement call counts and latency since startup or the last reset."""
+    return query_stats.top(limit, order_by)
+
+
+@router.delete(
+    "/db/queries",
+    status_code=status.HTTP_204_NO_CONTENT
+)
+async def reset_db_query_stats():
+    """Start collecting statement stats from scratch."""
+    query_stats.reset()
+
+
+@router.get(
+    "/usage",
+    response_model=List[UsageRollup],
+    status_code=status.HTTP_200_OK
+)
+async def llm_usage(rollup=Depends(usage_rollup)):
+    """LLM calls, tokens and latency per organization and day."""
+    return rollup
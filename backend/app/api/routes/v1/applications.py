@@ -0,0 +1,160 @@
+from fastapi import APIRouter, Depends, Response, status
+from fastapi.responses import StreamingResponse
+from typing import List
+
+from app.api.routes.auth import get_current_user
+from app.core.responses import trusted_response
+from app.deps.application import (
+    create_application_version,
+    edit_application,
+    get_application_version,
+    list_application_versions,
+    list_organization_applications,
+    redo_application_edit,
+    regenerate_application,
+    StoredRevision,
+    undo_application_edit,
+)
+from app.deps.export import export_application
+from app.schemas.application import (
+    GrantApplicationSummary,
+    GrantApplicationVersionMeta,
+    GrantApplicationVersionRead,
+)
+
+
+router = APIRouter(
+    prefix="/api/v1",
+    tags=["applications"],
+    dependencies=[Depends(get_current_user)]
+)
+
+
+@router.get(
+    "/organizations/{organization_id}/applications",
+    response_model=List[GrantApplicationSummary],
+    status_code=status.HTTP_200_OK
+)
+async def list_applications_(
+    response: Response,
+    result: List[GrantApplicationSummary] = Depends(list_organization_applications)
+):
+    """Fetch an organization's saved drafts, most recent first."""
+    return trusted_response(List[GrantApplicationSummary], result, response)
+
+
+@router.get(
+    "/applications/{application_id}",
+    response_model=GrantApplicationVersionRead,
+    status_code=status.HTTP_200_OK
+)
+async def get_application_(
+    result: GrantApplicationVersionRead = Depends(get_application_version)
+):
+    """Fetch the current version of a saved draft."""
+    return trusted_response(GrantApplicationVersionRead, result)
+
+
+@router.get(
+    "/applications/{application_id}/versions",
+    response_model=List[GrantApplicationVersionMeta],
+    status_code=status.HTTP_200_OK
+)
+async def list_versions_(
+    result: List[GrantApplicationVersionMeta] = Depends(list_application_versions)
+):
+    """Fetch the version history of a saved draft."""
+    return trusted_response(List[GrantApplicationVersionMeta], result)
+
+
+@router.get(
+    "/applications/{application_id}/versions/{version}",
+    response_model=GrantApplicationVersionRead,
+    status_code=status.HTTP_200_OK
+)
+async def get_version_(
+    result: GrantApplicationVersionRead = Depends(get_application_version)
+):
+    """Fetch a specific version of a saved draft."""
+    return trusted_response(GrantApplicationVersionRead, result)
+
+
+@router.post(
+    "/applications/{application_id}/versions",
+    response_model=GrantApplicationVersionRead,
+    status_code=status.HTTP_201_CREATED
+)
+async def create_version_(
+    result: GrantApplicationVersionRead = Depends(create_application_version)
+):
+    """Save an edited version of a draft."""
+    return trusted_response(GrantApplicationVersionRead, result, status_code=status.HTTP_201_CREATED)
+
+
+@router.post(
+    "/applications/{application_id}/edit",
+    response_model=GrantApplicationVersionRead,
+    status_code=status.HTTP_201_CREATED
+)
+async def edit_application_(
+    result: GrantApplicationVersionRead = Depends(edit_application)
+):
+    """Apply an AI edit to the current version of a saved draft."""
+    return trusted_response(GrantApplicationVersionRead, result, status_code=status.HTTP_201_CREATED)
+
+
+@router.post(
+    "/applications/{application_id}/regenerate",
+    response_model=GrantApplicationVersionRead,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_200_OK: {"description": "No section was affected; the base version is returned"}},
+)
+async def regenerate_application_(
+    result: StoredRevision = Depends(regenerate_application)
+):
+    """Rewrite only the sections of a draft affected by changed inputs.
+
+    Returns the base version unchanged, with 200 instead of 201, when no
+    section is affected.
+    """
+    return trusted_response(
+        GrantApplicationVersionRead,
+        result.version,
+        status_code=status.HTTP_201_CREATED if result.created else status.HTTP_200_OK,
+    )
+
+
+@router.post(
+    "/applications/{application_id}/undo",
+    response_model=GrantApplicationVersionRead,
+    status_code=status.HTTP_200_OK
+)
+async def undo_application_edit_(
+    result: GrantApplicationVersionRead = Depends(undo_application_edit)
+):
+    """Step the draft back to the previous version."""
+    return trusted_response(GrantApplicationVersionRead, result)
+
+
+@router.post(
+    "/applications/{application_id}/redo",
+    response_model=GrantApplicationVersionRead,
+    status_code=status.HTTP_200_OK
+)
+async def redo_application_edit_(
+    result: GrantApplicationVersionRead = Depends(redo_application_edit)
+):
+    """Step the draft forward to the most recent undone version."""
+    return trusted_response(GrantApplicationVersionRead, result)
+
+
+@router.get(
+    "/applications/{application_id}/export",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK
+)
+async def export_application_(
+    result=Depends(export_application)
+):
+    """Download a version of a draft as DOCX or PDF."""
+    return result
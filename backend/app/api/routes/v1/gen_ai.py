@@ -1,25 +1,37 @@
 import json
+import logging
+from functools import lru_cache
 from typing import List, Optional
-from fastapi import APIRouter, File, Form, UploadFile
-from google.auth import default
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
 
-from app.deps.gemini_service import GeminiService, create_grant_template_endpoint
+from app.core.tracing import TracedRoute
+from app.deps.gemini_service import GeminiService, create_grant_template_endpoint, read_file_part
 from app.settings import get_settings
 
 
 router = APIRouter(
     prefix="",
-    tags=["gen"]
+    tags=["gen"],
+    route_class=TracedRoute
 )
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
-gemini_service = GeminiService(settings.gemini_api_key)
+
+
+@lru_cache()
+def get_template_service() -> GeminiService:
+    """Build the template service on first use rather than at import time."""
+    return GeminiService(settings.gemini_api_key)
+
 
 @router.post("/generate-grant-template")
 async def generate_grant(
     user_context: str = Form(...),  # JSON string of user info
     files: List[UploadFile] = File(default=[]),
-    additional_instructions: Optional[str] = Form(None)
+    additional_instructions: Optional[str] = Form(None),
+    gemini_service: GeminiService = Depends(get_template_service)
 ):
     context_data = json.loads(user_context)
     grant_template = File(default=[])
@@ -35,4 +47,36 @@ async def generate_grant(
     return result
 
 
+@router.post("/generate-grant-template/stream")
+async def stream_grant_template(
+    user_context: str = Form(...),  # JSON string of user info
+    grant_template: UploadFile = File(...),
+    files: List[UploadFile] = File(default=[]),
+    additional_instructions: Optional[str] = Form(None),
+    gemini_service: GeminiService = Depends(get_template_service)
+):
+    """
+    Generate a grant template outline-first, as newline-delimited JSON events.
+
+    The outline event arrives after one fast model call; each section follows
+    as soon as it is written, with sections written concurrently.
+    """
+    context_data = json.loads(user_context)
+    # Uploads are closed once this handler returns, before the body streams.
+    template_part = await read_file_part(grant_template)
+    context_parts = [await read_file_part(file) for file in files]
+
+    async def events():
+        try:
+            async for event in gemini_service.stream_grant_template(
+                context_data, template_part, context_parts, additional_instructions
+            ):
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            # Headers are already sent; report the failure in the stream.
+            logger.error("Streaming grant template failed: %s", e)
+            detail = e.detail if isinstance(e, HTTPException) else "Failed to generate grant template"
+            yield json.dumps({"event": "error", "detail": detail}) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
 
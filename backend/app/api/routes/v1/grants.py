@@ -3,12 +3,22 @@ Grant Application Generation API Routes
 """
 import os
 import logging
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Optional
+from uuid import UUID
 from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel
 from pathlib import Path
 
+from app.api.routes.auth import OptionalUser
+from app.core.responses import trusted_response
+from app.deps.application import input_payload_hash, save_generated_application
+from app.models.organization import Organization
+from app.schemas.generation import CompanyInfo, SelectedTemplate
 from app.services.gemini_service import GeminiService
+from app.services.sections import section_hashes
+from app.services.usage import usage_scope
+from app.utils import DbDependency
 
 logger = logging.getLogger(__name__)
 
@@ -17,39 +27,28 @@ router = APIRouter(
     tags=["grants"]
 )
 
-class CompanyInfo(BaseModel):
-    companyName: str
-    description: str
-    address: str = ""
-    email: str = ""
-    phone: str = ""
-    employeeCount: str = ""
-    annualRevenue: str = ""
-    industry: str = ""
-    website: str = ""
-
-class SelectedTemplate(BaseModel):
-    title: str = "SBIR Phase I"
-    agency: str = "NSF"
-    amount: str = "$275,000"
-    duration: str = "6-12 months"
-    category: str = "Technology Innovation"
-
 class GrantApplicationRequest(BaseModel):
     companyInfo: CompanyInfo
     selectedTemplate: SelectedTemplate = SelectedTemplate()
     questionAnswers: Dict[str, str] = {}
+    organizationId: Optional[UUID] = None
     
 class GrantApplicationResponse(BaseModel):
     status: str
     generated_application: str
     message: str
+    applicationId: Optional[UUID] = None
+    version: Optional[int] = None
 
 @router.post("/generate-grant-application", response_model=GrantApplicationResponse)
-async def generate_grant_application(request: GrantApplicationRequest):
+async def generate_grant_application(request: GrantApplicationRequest, db: DbDependency, user: OptionalUser):
     """
     Generate a professional grant application using company data and Gemini AI.
     
+    When `organizationId` is given, the result is saved as a new draft for
+    that organization so it can be reloaded without generating again; this
+    requires a signed-in user.
+    
     Args:
         request: Company information and grant details
         
@@ -59,6 +58,22 @@ async def generate_grant_application(request: GrantApplicationRequest):
     try:
         logger.info("Received grant application generation request")
         
+        if request.organizationId and user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Sign in to save a draft for an organization",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+
+        if request.organizationId and not await db.get(Organization, request.organizationId):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Organization not found"
+            )
+        # Don't hold a pooled connection idle in transaction while the LLM works;
+        # the draft is saved on a fresh transaction afterwards.
+        await db.close()
+        
         # Initialize Gemini service
         gemini_service = GeminiService()
         
@@ -70,7 +85,7 @@ async def generate_grant_application(request: GrantApplicationRequest):
             )
         
         # Read the base prompt from prompt.txt
-        prompt_file_path = Path(__file__).parent.parent.parent.parent / "prompt.txt"
+        prompt_file_path = Path(__file__).parents[4] / "prompt.txt"
         
         if not prompt_file_path.exists():
             raise HTTPException(
@@ -82,13 +97,16 @@ async def generate_grant_application(request: GrantApplicationRequest):
             base_prompt = f.read()
         
         # Convert request to dict for processing
-        company_data = request.dict()
+        company_data = request.dict(exclude={"organizationId"})
         
         # Generate the grant application
-        generated_application = await gemini_service.generate_grant_application(
-            base_prompt=base_prompt,
-            company_data=company_data
-        )
+        started = time.perf_counter()
+        with usage_scope(request.organizationId):
+            generated_application = await gemini_service.generate_grant_application(
+                base_prompt=base_prompt,
+                company_data=company_data
+            )
+        latency_ms = round((time.perf_counter() - started) * 1000)
         
         if not generated_application:
             raise HTTPException(
@@ -98,22 +116,38 @@ async def generate_grant_application(request: GrantApplicationRequest):
         
         logger.info("Grant application generated successfully")
         
-        return GrantApplicationResponse(
+        application = None
+        if request.organizationId:
+            application = await save_generated_application(
+                db,
+                organization_id=request.organizationId,
+                title=f"{request.selectedTemplate.title} - {request.companyInfo.companyName}",
+                content=generated_application,
+                input_hash=input_payload_hash(company_data),
+                model_name=gemini_service.model.model_name,
+                model_metadata={"latency_ms": latency_ms},
+                section_inputs=section_hashes(base_prompt, company_data),
+            )
+        
+        # The markdown body is large; skip re-validating it against response_model.
+        return trusted_response(GrantApplicationResponse, GrantApplicationResponse(
             status="success",
             generated_application=generated_application,
-            message="Grant application generated successfully"
-        )
+            message="Grant application generated successfully",
+            applicationId=application.id if application else None,
+            version=application.head_version if application else None
+        ))
         
     except HTTPException:
         raise
     except ValueError as e:
-        logger.error(f"Validation error: {str(e)}")
+        logger.error("Validation error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
     except Exception as e:
-        logger.error(f"Unexpected error generating grant application: {str(e)}")
+        logger.error("Unexpected error generating grant application: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error occurred while generating grant application"
@@ -138,7 +172,7 @@ async def validate_api_key():
         }
         
     except Exception as e:
-        logger.error(f"Error validating API key: {str(e)}")
+        logger.error("Error validating API key: %s", e)
         return {
             "status": "error",
             "api_key_valid": False,
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from app.core.metrics import REGISTRY
+
+
+router = APIRouter(
+    tags=["metrics"],
+    include_in_schema=False
+)
+
+
+@router.get("/metrics")
+async def metrics():
+    """Prometheus text exposition of the app's metrics."""
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
@@ -1,9 +1,18 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
 from typing import List
 
-from app.schemas.organization import OrganizationRead
+from app.core.responses import trusted_response
+from app.schemas.bulk import BulkResult
+from app.schemas.organization import (
+    OrganizationBulkUpdate,
+    OrganizationCreate,
+    OrganizationRead,
+)
 from app.api.routes.auth import get_current_user
 from app.deps.organization import (
+    bulk_create_organizations,
+    bulk_delete_organizations,
+    bulk_update_organizations,
     create_organization,
     delete_organization,
     get_organization_by_id,
@@ -19,6 +28,19 @@ router = APIRouter(
 )
 
 
+def bulk_body(item_schema: dict) -> dict:
+    """OpenAPI request body for endpoints that read a JSON array or NDJSON stream."""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": item_schema}},
+                "application/x-ndjson": {"schema": item_schema},
+            },
+        }
+    }
+
+
 @router.post(
     "/",
     response_model=OrganizationRead,
@@ -37,21 +59,24 @@ async def create_organization_or(
     status_code=status.HTTP_200_OK
 )
 async def list_orgs_or_404(
+    response: Response,
     result: List[OrganizationRead] = Depends(list_organizations)
 ):
     """Fetch a list containing organizations."""
-    return result
+    return trusted_response(List[OrganizationRead], result, response)
 
 
 @router.get(
     "/{organization_id}",
+    response_model=OrganizationRead,
     status_code = status.HTTP_200_OK
 )
 async def get_organization(
+    response: Response,
     result = Depends(get_organization_by_id)
 ):
     """Fetch a single organization by id."""
-    return result
+    return trusted_response(OrganizationRead, result, response)
 
 
 @router.put(
@@ -75,3 +100,42 @@ async def delete_organization_(
 ):
     """Delete an organization entry."""
     return result
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkResult,
+    status_code=status.HTTP_200_OK,
+    openapi_extra=bulk_body(OrganizationCreate.model_json_schema())
+)
+async def bulk_create_organizations_(
+    result: BulkResult = Depends(bulk_create_organizations)
+):
+    """Create many organizations, reporting failures per row."""
+    return result
+
+
+@router.patch(
+    "/bulk",
+    response_model=BulkResult,
+    status_code=status.HTTP_200_OK,
+    openapi_extra=bulk_body(OrganizationBulkUpdate.model_json_schema())
+)
+async def bulk_update_organizations_(
+    result: BulkResult = Depends(bulk_update_organizations)
+):
+    """Update many organizations, reporting failures per row."""
+    return result
+
+
+@router.post(
+    "/bulk/delete",
+    response_model=BulkResult,
+    status_code=status.HTTP_200_OK,
+    openapi_extra=bulk_body({"type": "string", "format": "uuid"})
+)
+async def bulk_delete_organizations_(
+    result: BulkResult = Depends(bulk_delete_organizations)
+):
+    """Delete many organizations by id, reporting failures per row."""
+    return result
@@ -0,0 +1,33 @@
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+
+def compress_text(text: str) -> tuple[str, bytes]:
+    """Compress `text`, preferring zstd when `zstandard` is installed.
+
+    Returns:
+        The codec name to store alongside the data, and the compressed bytes.
+    """
+    raw = text.encode("utf-8")
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=10).compress(raw)
+    return "zlib", zlib.compress(raw, 6)
+
+
+def decompress_text(codec: str, data: bytes) -> str:
+    """Inverse of `compress_text` for any codec it may have written."""
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd compressed content")
+        raw = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == "zlib":
+        raw = zlib.decompress(data)
+    elif codec == "none":
+        raw = data
+    else:
+        raise ValueError(f"Unknown compression codec: {codec}")
+    return raw.decode("utf-8")
@@ -0,0 +1,37 @@
+from difflib import SequenceMatcher
+from typing import Union
+
+# A delta is a list of ops applied in order to the parent's lines:
+#   [start, end]  copy parent lines[start:end]
+#   "text"        insert text
+DeltaOp = Union[list[int], str]
+
+
+def make_delta(parent: str, child: str) -> list[DeltaOp]:
+    """Line-level delta that rebuilds `child` from `parent`.
+
+    Edits to a long markdown document usually touch a few paragraphs, so
+    diffing whole lines keeps both the delta and the diff itself cheap.
+    """
+    old = parent.splitlines(keepends=True)
+    new = child.splitlines(keepends=True)
+    ops: list[DeltaOp] = []
+    matcher = SequenceMatcher(None, old, new, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append("".join(new[j1:j2]))
+    return ops
+
+
+def apply_delta(parent: str, delta: list[DeltaOp]) -> str:
+    """Rebuild the child text from `parent` and a delta from `make_delta`."""
+    old = parent.splitlines(keepends=True)
+    parts = []
+    for op in delta:
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(old[op[0]:op[1]])
+    return "".join(parts)
@@ -0,0 +1,75 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable
+from uuid import UUID
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _microseconds(value: datetime) -> int:
+    if value.tzinfo is None:
+        # SQLite hands back naive datetimes; everything is stored in UTC.
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def row_etag(row_id: UUID, updated_at: datetime) -> str:
+    """Weak ETag identifying one version of a row.
+
+    The tag embeds `updated_at` with microsecond precision so a precondition
+    can be turned back into a `WHERE updated_at = ...` clause.
+    """
+    return f'W/"{row_id}.{_microseconds(updated_at)}"'
+
+
+def _parse_tags(header: str) -> list[str]:
+    tags = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tags.append(tag.strip('"'))
+    return tags
+
+
+def parse_if_match(header: str, row_id: UUID | str) -> list[datetime] | None:
+    """Return the `updated_at` versions of `row_id` accepted by an `If-Match` header.
+
+    `None` means any version is accepted (`If-Match: *`). Weak tags are
+    compared like strong ones since the tag already pins an exact row version.
+    Tags that belong to another row or cannot be parsed match nothing.
+    """
+    if header.strip() == "*":
+        return None
+
+    versions = []
+    for tag in _parse_tags(header):
+        tag_id, _, micros = tag.rpartition(".")
+        if tag_id.lower() != str(row_id).lower() or not micros.isdigit():
+            continue
+        versions.append(EPOCH + timedelta(microseconds=int(micros)))
+    return versions
+
+
+def list_etag(rows: Iterable[tuple[UUID, datetime]], *extra: Any) -> str:
+    """Weak ETag for a list response built from the `(id, updated_at)` of its rows.
+
+    `extra` covers anything else that changes the response, such as whether
+    a next page exists.
+    """
+    digest = hashlib.sha1()
+    for row_id, updated_at in rows:
+        digest.update(f"{row_id}.{_microseconds(updated_at)};".encode())
+    for value in extra:
+        digest.update(f"{value};".encode())
+    return f'W/"{digest.hexdigest()}"'
+
+
+def if_none_match(header: str | None, etag: str) -> bool:
+    """Whether an `If-None-Match` header matches `etag`, using weak comparison."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return _parse_tags(etag)[0] in _parse_tags(header)
@@ -0,0 +1,127 @@
+"""
+Application logging: JSON lines written from a background thread.
+
+`setup_logging` points the root logger at a `QueueHandler`, so a log call on
+the event loop only appends the record to an in-memory queue. A
+`QueueListener` thread formats the records and does the stream I/O. Log
+messages use %-style arguments, and they are only formatted by the listener,
+and only for records that pass the level check.
+
+`RequestIdMiddleware` gives every request an id (taken from `X-Request-ID`
+when the client sends one). Records logged while handling that request
+carry the id.
+"""
+import contextvars
+import json
+import logging
+import queue
+import sys
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from logging.handlers import QueueHandler, QueueListener
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.settings import get_settings
+
+settings = get_settings()
+
+request_id: contextvars.ContextVar[str | None] = contextvars.ContextVar("request_id", default=None)
+
+# Arguments of these types cannot change before the listener formats them.
+_IMMUTABLE_ARGS = (str, bytes, int, float, complex, bool, type(None), Decimal, uuid.UUID, date, time, timedelta)
+
+# Attributes every LogRecord has; anything else was passed in `extra=`.
+_RECORD_FIELDS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "request_id"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including `extra=` fields and the request id."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _ContextQueueHandler(QueueHandler):
+    """`QueueHandler` that leaves formatting to the listener thread.
+
+    The stock `prepare` formats the message on the calling thread; this one
+    only captures what has to be read there: the request id, and the message
+    itself when an argument is an object that may change (or be closed) by
+    the time the listener gets to it. Tracebacks are still formatted by the
+    listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.request_id = request_id.get()
+        args = record.args.values() if isinstance(record.args, dict) else record.args or ()
+        if not all(isinstance(arg, _IMMUTABLE_ARGS) for arg in args):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+def setup_logging() -> QueueListener:
+    """Route the root logger through a queue to a stdout handler.
+
+    Returns:
+        The started listener; stop it on shutdown to flush queued records
+    """
+    handler = logging.StreamHandler(sys.stdout)
+    if settings.log_json:
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        if isinstance(existing, _ContextQueueHandler):
+            root.removeHandler(existing)
+    root.addHandler(_ContextQueueHandler(log_queue))
+    root.setLevel(settings.log_level.upper())
+    listener.start()
+    return listener
+
+
+class RequestIdMiddleware:
+    """Pure ASGI middleware binding an id to each request for its log records.
+
+    The id is echoed back in the `X-Request-ID` response header.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = next((v for k, v in scope["headers"] if k == b"x-request-id"), None)
+        rid = incoming.decode("latin-1")[:128] if incoming else uuid.uuid4().hex
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-request-id", rid.encode("latin-1"))]
+            await send(message)
+
+        token = request_id.set(rid)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id.reset(token)
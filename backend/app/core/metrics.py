@@ -0,0 +1,163 @@
+"""
+Prometheus metrics for HTTP requests, LLM calls and the database pool.
+
+Everything is registered on `REGISTRY` and served by `GET /metrics`. Request
+metrics are labelled with the route template, not the raw path, so ids in
+URLs do not create new series.
+"""
+import time
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.db.pool import pool_status
+
+
+REGISTRY = CollectorRegistry()
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route and status code.",
+    ["method", "route", "status"],
+    registry=REGISTRY,
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the end of its response.",
+    ["method", "route"],
+    registry=REGISTRY,
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled.",
+    ["method"],
+    registry=REGISTRY,
+)
+
+LLM_LATENCY = Histogram(
+    "llm_request_duration_seconds",
+    "Duration of LLM calls, including retries.",
+    ["service", "operation", "model"],
+    buckets=(0.5, 1, 2.5, 5, 10, 20, 30, 45, 60, 90, 120, float("inf")),
+    registry=REGISTRY,
+)
+LLM_REQUESTS = Counter(
+    "llm_requests_total",
+    "LLM calls by outcome.",
+    ["service", "operation", "model", "outcome"],
+    registry=REGISTRY,
+)
+LLM_RETRIES = Counter(
+    "llm_retries_total",
+    "LLM call attempts retried after a transient error.",
+    ["service", "operation", "model"],
+    registry=REGISTRY,
+)
+LLM_PROMPT_TOKENS = Counter(
+    "llm_prompt_tokens_total",
+    "Prompt tokens reported by the LLM.",
+    ["service", "operation", "model"],
+    registry=REGISTRY,
+)
+LLM_OUTPUT_TOKENS = Counter(
+    "llm_output_tokens_total",
+    "Output tokens reported by the LLM.",
+    ["service", "operation", "model"],
+    registry=REGISTRY,
+)
+LLM_TIER_LATENCY = Histogram(
+    "llm_tier_request_duration_seconds",
+    "Duration of routed LLM calls by model tier; abandoned calls lost a fallback race.",
+    ["service", "operation", "tier", "outcome"],
+    buckets=(0.5, 1, 2.5, 5, 10, 20, 30, 45, 60, 90, 120, float("inf")),
+    registry=REGISTRY,
+)
+LLM_FALLBACKS = Counter(
+    "llm_fallbacks_total",
+    "Routed LLM calls that were also sent to the fallback tier, by reason.",
+    ["service", "operation", "reason"],
+    registry=REGISTRY,
+)
+LLM_UPLOAD_BYTES = Counter(
+    "llm_upload_bytes_total",
+    "Bytes of files uploaded to the LLM provider.",
+    ["service"],
+    registry=REGISTRY,
+)
+
+
+class PoolCollector(Collector):
+    """Reads the database pool counters when scraped instead of on every checkout."""
+
+    def __init__(self, engines: dict):
+        self.engines = engines
+
+    def collect(self):
+        gauges = {
+            name: GaugeMetricFamily(f"db_pool_{name}", help, labels=["engine"])
+            for name, help in (
+                ("size", "Configured pool size."),
+                ("checked_out", "Connections currently in use."),
+                ("checked_in", "Idle connections in the pool."),
+                ("overflow", "Connections open beyond the pool size."),
+            )
+        }
+        counters = {
+            name: CounterMetricFamily(f"db_pool_{name}", help, labels=["engine"])
+            for name, help in (
+                ("checkouts", "Connections handed out by the pool."),
+                ("waits", "Checkouts that had to wait for a free connection."),
+                ("timeouts", "Checkouts that gave up waiting."),
+                ("wait_seconds", "Time spent waiting for a connection."),
+            )
+        }
+        for label, engine in self.engines.items():
+            if engine is None:
+                continue
+            status = pool_status(engine.pool)
+            for name, family in gauges.items():
+                if name in status:
+                    family.add_metric([label], status[name])
+            for name, family in counters.items():
+                key = "wait_seconds_total" if name == "wait_seconds" else name
+                if key in status:
+                    family.add_metric([label], status[key])
+        yield from gauges.values()
+        yield from counters.values()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request count, latency and in-flight requests.
+
+    The route label is read from the matched FastAPI route after routing,
+    so it is the path template; unmatched requests share one label.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight = HTTP_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            route = scope.get("route")
+            path = getattr(route, "path", "<unmatched>")
+            HTTP_LATENCY.labels(method, path).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method, path, str(status_code)).inc()
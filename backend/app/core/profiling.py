@@ -0,0 +1,116 @@
+"""
+Opt-in per-request profiling.
+
+`ProfilingMiddleware` profiles requests that carry the `profiling_header`
+header, plus a random `profiling_sample_ratio` fraction of all requests, and
+writes one file per profiled request to `profiling_dir`:
+
+- "cprofile": a `.prof` file of deterministic call stats (open it with
+  `python -m pstats` or snakeviz)
+- "pyinstrument": a `.html` sampling profile; needs `pip install pyinstrument`
+
+Profilers see everything running on the event loop thread, not only the
+profiled request, so one request is profiled at a time and others are
+passed through untouched while it runs.
+"""
+import asyncio
+import cProfile
+import random
+import re
+import time
+from pathlib import Path
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.settings import get_settings
+
+settings = get_settings()
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+
+def profiling_allowed() -> bool:
+    """Profiling is never installed in production, whatever the setting says."""
+    return settings.profiling_enabled and settings.env_name != "production"
+
+
+class _CProfile:
+    suffix = "prof"
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+
+    def start(self) -> None:
+        self.profiler.enable()
+
+    def stop(self) -> None:
+        self.profiler.disable()
+
+    def write(self, path: Path) -> None:
+        self.profiler.dump_stats(path)
+
+
+class _Pyinstrument:
+    suffix = "html"
+
+    def __init__(self):
+        from pyinstrument import Profiler
+
+        self.profiler = Profiler(async_mode="enabled")
+
+    def start(self) -> None:
+        self.profiler.start()
+
+    def stop(self) -> None:
+        self.profiler.stop()
+
+    def write(self, path: Path) -> None:
+        path.write_text(self.profiler.output_html(), encoding="utf-8")
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware writing a profile of selected requests.
+
+    The response of a profiled request carries an `X-Profile-File` header
+    with the name of the file written.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        if settings.profiling_profiler not in PROFILERS:
+            raise ValueError(f"profiling_profiler must be one of {PROFILERS}")
+        if settings.profiling_profiler == "pyinstrument":
+            try:
+                import pyinstrument  # noqa: F401
+            except ImportError:
+                raise RuntimeError("profiling_profiler=pyinstrument requires `pip install pyinstrument`")
+        self.header = settings.profiling_header.lower().encode("latin-1")
+        self.directory = Path(settings.profiling_dir)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._busy = False
+
+    def _wanted(self, scope: Scope) -> bool:
+        if any(name == self.header for name, _ in scope["headers"]):
+            return True
+        return random.random() < settings.profiling_sample_ratio
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self._busy or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self._busy = True
+        profiler = _Pyinstrument() if settings.profiling_profiler == "pyinstrument" else _CProfile()
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        path = self.directory / f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{slug}-{time.time_ns() % 10**6:06d}.{profiler.suffix}"
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-profile-file", path.name.encode())]
+            await send(message)
+
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            self._busy = False
+            await asyncio.to_thread(profiler.write, path)
@@ -0,0 +1,198 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, Protocol, Sequence
+
+from fastapi import HTTPException, status
+
+
+class RateLimitBackend(Protocol):
+    async def hit(self, limits: Sequence[tuple[str, int]], window: int) -> float:
+        """Record an attempt against every `(key, limit)` in `limits`.
+
+        The attempt is counted for all keys or, when any of them is over its
+        limit, for none, so a rejected attempt costs no other key its budget.
+
+        Returns 0 when the attempt is allowed, otherwise the number of
+        seconds until it would be.
+        """
+        ...
+
+
+def _retry_after(previous: int, current: int, limit: int, window: int, elapsed: float) -> float:
+    """Seconds until the weighted count drops low enough to admit one more attempt."""
+    if current + 1 > limit or previous == 0:
+        return window - elapsed
+    # previous * (1 - t / window) + current + 1 <= limit, solved for t
+    needed = window * (1 - (limit - current - 1) / previous)
+    return max(needed - elapsed, 0.001)
+
+
+class _Window:
+    __slots__ = ("start", "current", "previous")
+
+    def __init__(self, start: float):
+        self.start = start
+        self.current = 0
+        self.previous = 0
+
+
+class InMemoryRateLimitBackend:
+    """Sliding-window counters held in process memory.
+
+    Each key keeps two integer counters (current and previous fixed window)
+    and the previous window is weighted by how much of it still overlaps the
+    sliding window. Keys are kept in least-recently-used order so stale
+    entries are evicted from the front, and `max_keys` bounds memory when a
+    burst sprays many distinct usernames or addresses.
+    """
+
+    def __init__(self, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._windows: OrderedDict[str, _Window] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def _evict(self, now: float, window: int) -> None:
+        while self._windows:
+            oldest = next(iter(self._windows.values()))
+            if oldest.start + 2 * window > now and len(self._windows) <= self.max_keys:
+                break
+            self._windows.popitem(last=False)
+
+    def _entry(self, key: str, window_start: float, window: int) -> _Window:
+        entry = self._windows.get(key)
+        if entry is None:
+            entry = _Window(window_start)
+            self._windows[key] = entry
+        else:
+            self._windows.move_to_end(key)
+            if entry.start != window_start:
+                adjacent = window_start - entry.start == window
+                entry.previous = entry.current if adjacent else 0
+                entry.current = 0
+                entry.start = window_start
+        return entry
+
+    async def hit(self, limits: Sequence[tuple[str, int]], window: int) -> float:
+        now = self.clock()
+        window_start = math.floor(now / window) * window
+        elapsed = now - window_start
+
+        entries = [(self._entry(key, window_start, window), limit) for key, limit in limits]
+        retry_after = max(
+            (
+                _retry_after(entry.previous, entry.current, limit, window, elapsed)
+                for entry, limit in entries
+                if entry.previous * (1 - elapsed / window) + entry.current + 1 > limit
+            ),
+            default=0.0,
+        )
+        if not retry_after:
+            for entry, _ in entries:
+                entry.current += 1
+
+        self._evict(now, window)
+        return retry_after
+
+
+# Checks every key's sliding-window count and increments all of them only
+# when none is over its limit, atomically. KEYS holds (previous, current)
+# window keys per limit; returns whether the attempt was counted, followed by
+# each key's (previous, current) counts before the attempt.
+_HIT_SCRIPT = """
+local weight = tonumber(ARGV[1])
+local ttl = tonumber(ARGV[2])
+local counts = {}
+local allowed = 1
+for i = 1, #KEYS / 2 do
+    local previous = tonumber(redis.call('GET', KEYS[2 * i - 1]) or '0')
+    local current = tonumber(redis.call('GET', KEYS[2 * i]) or '0')
+    counts[2 * i - 1] = previous
+    counts[2 * i] = current
+    if previous * weight + current + 1 > tonumber(ARGV[2 + i]) then
+        allowed = 0
+    end
+end
+if allowed == 1 then
+    for i = 1, #KEYS / 2 do
+        redis.call('INCR', KEYS[2 * i])
+        redis.call('EXPIRE', KEYS[2 * i], ttl)
+    end
+end
+table.insert(counts, 1, allowed)
+return counts
+"""
+
+
+class RedisRateLimitBackend:
+    """Sliding-window counters shared between workers through Redis.
+
+    Checking and counting an attempt is one Lua script, so concurrent
+    attempts on several workers cannot all pass a check before any of them
+    is counted. Requires the optional `redis` package.
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        import redis.asyncio as redis
+
+        self.redis = redis.from_url(url)
+        self.prefix = prefix
+        self._hit = self.redis.register_script(_HIT_SCRIPT)
+
+    async def hit(self, limits: Sequence[tuple[str, int]], window: int) -> float:
+        now = time.time()
+        index = int(now // window)
+        elapsed = now - index * window
+
+        keys = []
+        for key, _ in limits:
+            keys += [f"{self.prefix}{key}:{index - 1}", f"{self.prefix}{key}:{index}"]
+        # Redis turns Lua numbers into integers; pass the weight as a string.
+        allowed, *counts = await self._hit(
+            keys=keys,
+            args=[repr(1 - elapsed / window), 2 * window, *(limit for _, limit in limits)],
+        )
+        if allowed:
+            return 0.0
+
+        return max(
+            _retry_after(previous, current, limit, window, elapsed)
+            for (_, limit), previous, current in zip(limits, counts[::2], counts[1::2])
+            if previous * (1 - elapsed / window) + current + 1 > limit
+        )
+
+
+class LoginRateLimiter:
+    """Throttle login attempts per username and per client address."""
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        per_username: int,
+        per_ip: int,
+        window_seconds: int,
+    ):
+        self.backend = backend
+        self.per_username = per_username
+        self.per_ip = per_ip
+        self.window_seconds = window_seconds
+
+    async def check(self, username: str, client_ip: str | None) -> None:
+        """Raise 429 when either the username or the client address is over its limit.
+
+        A rejected attempt is counted against neither.
+        """
+        limits = [(f"login:user:{username.strip().lower()}", self.per_username)]
+        if client_ip:
+            limits.append((f"login:ip:{client_ip}", self.per_ip))
+        retry_after = await self.backend.hit(limits, self.window_seconds)
+
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts. Try again later.",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
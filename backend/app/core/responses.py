@@ -0,0 +1,66 @@
+from functools import lru_cache
+from typing import Any
+from fastapi import Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+from app.settings import get_settings
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def default_response_class() -> type[JSONResponse]:
+    """orjson-backed responses when enabled and installed, the stdlib encoder otherwise."""
+    if get_settings().fast_json_responses and orjson is not None:
+        return ORJSONResponse
+    return JSONResponse
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def _is_validated(content: Any) -> bool:
+    if isinstance(content, list):
+        return all(isinstance(item, BaseModel) for item in content)
+    return isinstance(content, BaseModel)
+
+
+def trusted_response(
+    schema: Any,
+    content: Any,
+    response: Response | None = None,
+    status_code: int = 200,
+) -> Response:
+    """Serialize trusted output of a dependency straight to JSON bytes.
+
+    FastAPI validates a route's return value against `response_model`, dumps
+    it to Python objects and only then encodes it. ORM rows are validated here
+    once, with `from_attributes`, and schema instances built by our own code
+    not at all; pydantic then writes the JSON bytes directly. Keep
+    `response_model` on the route for the OpenAPI schema.
+
+    Args:
+        schema: The response schema, e.g. `List[OrganizationRead]`
+        content: ORM rows or instances of `schema`
+        response: The route's `Response` parameter, whose headers are copied
+        status_code: Status of the response
+
+    Returns:
+        A ready `Response`, which FastAPI sends without further processing
+    """
+    adapter = _adapter(schema)
+    if not _is_validated(content):
+        content = adapter.validate_python(content, from_attributes=True)
+    headers = None
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return Response(
+        adapter.dump_json(content),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
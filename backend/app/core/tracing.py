@@ -0,0 +1,191 @@
+"""
+OpenTelemetry tracing for requests, database queries and the LLM pipeline.
+
+`setup_tracing` installs a tracer provider whose exporter is chosen by the
+`tracing_exporter` setting:
+
+- "console": one JSON span per line on stdout
+- "file": the same, appended to `tracing_file`
+- "otlp": OTLP/gRPC to `OTEL_EXPORTER_OTLP_ENDPOINT`; needs
+  `opentelemetry-exporter-otlp`
+- "package.module:factory": any callable returning a `SpanExporter`
+- "none": tracing disabled (default)
+
+Spans follow the active context, which `asyncio.to_thread` copies into the
+worker thread, so work done in the thread pool nests under its caller.
+"""
+import importlib
+import sys
+from typing import Any
+from fastapi import Request
+from fastapi.routing import APIRoute
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SpanExporter
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.settings import get_settings
+
+settings = get_settings()
+tracer = trace.get_tracer("grant-api")
+
+# Statements are truncated in span attributes; bulk inserts can be huge.
+MAX_STATEMENT_LENGTH = 2000
+
+
+def _json_line(span: ReadableSpan) -> str:
+    return span.to_json(indent=None) + "\n"
+
+
+class FileSpanExporter(ConsoleSpanExporter):
+    """JSON lines appended to `path`; the file is closed on shutdown."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "a", buffering=1)
+        super().__init__(out=self._file, formatter=_json_line)
+
+    def shutdown(self) -> None:
+        super().shutdown()
+        self._file.close()
+
+
+def _make_exporter(name: str) -> SpanExporter | None:
+    if name == "none":
+        return None
+    if name == "console":
+        return ConsoleSpanExporter(out=sys.stdout, formatter=_json_line)
+    if name == "file":
+        return FileSpanExporter(settings.tracing_file)
+    if name == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            raise RuntimeError("tracing_exporter=otlp requires `pip install opentelemetry-exporter-otlp`")
+        return OTLPSpanExporter()
+
+    module, _, factory = name.partition(":")
+    if not factory:
+        raise ValueError(f"Unknown tracing exporter {name!r}")
+    return getattr(importlib.import_module(module), factory)()
+
+
+def setup_tracing() -> TracerProvider | None:
+    """Install the global tracer provider configured by `Settings`.
+
+    Returns:
+        The provider, so it can be flushed on shutdown, or None when disabled
+    """
+    exporter = _make_exporter(settings.tracing_exporter)
+    if exporter is None:
+        return None
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.tracing_service_name}),
+        sampler=ParentBased(TraceIdRatioBased(settings.tracing_sample_ratio)),
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    return provider
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Wrap every statement executed on `engine` in a `db.query` span."""
+    sync_engine = engine.sync_engine
+    system = sync_engine.dialect.name
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        span = tracer.start_span("db.query", kind=SpanKind.CLIENT)
+        span.set_attribute("db.system", system)
+        span.set_attribute("db.statement", statement[:MAX_STATEMENT_LENGTH])
+        if executemany:
+            span.set_attribute("db.executemany.rows", len(parameters))
+        conn.info.setdefault("trace_spans", []).append(span)
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("trace_spans")
+        if spans:
+            spans.pop().end()
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context):
+        spans = context.connection.info.get("trace_spans") if context.connection else None
+        if spans:
+            span = spans.pop()
+            span.record_exception(context.original_exception)
+            span.set_status(Status(StatusCode.ERROR))
+            span.end()
+
+
+def start_executor_span(submitted_ns: int) -> None:
+    """Record the time a thread-pool job waited before it started running.
+
+    Call first thing inside the worker with the `time.time_ns()` taken when
+    the job was submitted.
+    """
+    tracer.start_span("executor.queue", start_time=submitted_ns).end()
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware opening a server span per request.
+
+    Continues a trace from an incoming `traceparent` header, and renames the
+    span to the matched route template once routing has happened.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        method = scope["method"]
+        with tracer.start_as_current_span(
+            method, context=propagate.extract(carrier), kind=SpanKind.SERVER
+        ) as span:
+            span.set_attribute("http.request.method", method)
+            span.set_attribute("url.path", scope["path"])
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.response.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    span.update_name(f"{method} {route.path}")
+                    span.set_attribute("http.route", route.path)
+
+
+class TracedRoute(APIRoute):
+    """Route class that parses multipart bodies inside their own span.
+
+    FastAPI reads the form before any dependency or endpoint code runs; doing
+    it here first (Starlette caches the result) makes the parse visible.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def traced_handler(request: Request) -> Any:
+            content_type = request.headers.get("content-type", "")
+            if content_type.startswith("multipart/form-data"):
+                with tracer.start_as_current_span("http.multipart_parse") as span:
+                    form = await request.form()
+                    span.set_attribute("http.request.body.size", int(request.headers.get("content-length", 0)))
+                    span.set_attribute("form.files", sum(1 for _, v in form.multi_items() if not isinstance(v, str)))
+            return await handler(request)
+
+        return traced_handler
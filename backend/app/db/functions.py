@@ -0,0 +1,59 @@
+"""
+Portable SQL time functions for model defaults and migrations.
+
+Postgres gets its native functions. SQLite has neither `now()` nor
+`clock_timestamp()`, so it gets the current UTC time in the text format
+SQLAlchemy's `DateTime` uses there (microseconds included), which keeps
+server-generated values comparable with bound parameters.
+"""
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import Date, DateTime
+
+
+SQLITE_UTCNOW = "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
+class utcnow(FunctionElement):
+    """Start of the current transaction; Postgres `now()`."""
+    type = DateTime(timezone=True)
+    inherit_cache = True
+
+
+class clock_utcnow(FunctionElement):
+    """Time the statement runs, distinct within one transaction; Postgres `clock_timestamp()`."""
+    type = DateTime(timezone=True)
+    inherit_cache = True
+
+
+class utc_date(FunctionElement):
+    """The UTC calendar day of a timestamp, whatever the session's TimeZone."""
+    type = Date()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow(element, compiler, **kw):
+    return "now()"
+
+
+@compiles(clock_utcnow)
+def _clock_utcnow(element, compiler, **kw):
+    return "clock_timestamp()"
+
+
+@compiles(utcnow, "sqlite")
+@compiles(clock_utcnow, "sqlite")
+def _sqlite_utcnow(element, compiler, **kw):
+    return SQLITE_UTCNOW
+
+
+@compiles(utc_date)
+def _utc_date(element, compiler, **kw):
+    return "date(timezone('UTC', %s))" % compiler.process(element.clauses, **kw)
+
+
+@compiles(utc_date, "sqlite")
+def _sqlite_utc_date(element, compiler, **kw):
+    # Timestamps are stored as UTC text there.
+    return "date(%s)" % compiler.process(element.clauses, **kw)
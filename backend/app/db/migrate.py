@@ -0,0 +1,37 @@
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app import models  # noqa: F401  (registers every table on Base.metadata)
+from app.models.base import Base
+
+
+ALEMBIC_DIR = Path(__file__).resolve().parents[2] / "alembic"
+
+
+async def upgrade_database(engine: AsyncEngine, revision: str = "head") -> None:
+    """Apply the Alembic migrations to `engine` from inside the running event loop.
+
+    `alembic upgrade` from the command line opens its own event loop, which
+    cannot be nested in the app's; here the migrations run on a connection the
+    caller's loop already owns.
+
+    The existing revisions were written for Postgres only (pg_trgm, `now()`),
+    so a new database on any other backend is created from the models, whose
+    defaults are portable, and stamped at `revision` instead of replaying
+    them.
+    """
+    def upgrade(connection) -> None:
+        config = Config()
+        config.set_main_option("script_location", str(ALEMBIC_DIR))
+        config.attributes["connection"] = connection
+        if connection.dialect.name != "postgresql" and not inspect(connection).has_table("alembic_version"):
+            Base.metadata.create_all(connection)
+            command.stamp(config, revision)
+        else:
+            command.upgrade(config, revision)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(upgrade)
@@ -0,0 +1,76 @@
+import time
+from dataclasses import asdict, dataclass
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    checkins: int = 0
+    connects: int = 0
+    waits: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    timeouts: int = 0
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """`AsyncAdaptedQueuePool` that counts checkouts, new connections and waits.
+
+    A checkout counts as a wait when it found no idle connection and no
+    overflow headroom, i.e. when it had to queue for another request to
+    return a connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+        event.listen(self, "checkout", self._on_checkout)
+        event.listen(self, "checkin", self._on_checkin)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.stats.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        self.stats.checkins += 1
+
+    def _create_connection(self):
+        self.stats.connects += 1
+        return super()._create_connection()
+
+    def _do_get(self):
+        must_wait = (
+            self._max_overflow > -1
+            and self.checkedin() == 0
+            and self._overflow >= self._max_overflow
+        )
+        if not must_wait:
+            return super()._do_get()
+
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.stats.waits += 1
+            self.stats.wait_seconds_total += waited
+            self.stats.wait_seconds_max = max(self.stats.wait_seconds_max, waited)
+
+
+def pool_status(pool) -> dict:
+    """Current occupancy of `pool` plus its cumulative counters when instrumented."""
+    status = {"pool_class": type(pool).__name__}
+    if hasattr(pool, "checkedout"):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+        )
+    if isinstance(pool, InstrumentedAsyncPool):
+        status.update(asdict(pool.stats))
+    return status
@@ -0,0 +1,149 @@
+import logging
+import re
+import time
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s|\?")
+_IN_LIST = re.compile(r"\bIN \((?:\s*\?\s*,)*\s*\?\s*\)", re.IGNORECASE)
+_VALUES_ROWS = re.compile(r"(VALUES \([^()]*\))(?:\s*,\s*\([^()]*\))+", re.IGNORECASE)
+_SAVEPOINT = re.compile(r"\b(sa_savepoint_)\d+\b")
+_SPACE = re.compile(r"\s+")
+
+# Statements worth an EXPLAIN; EXPLAIN without ANALYZE never executes them.
+_EXPLAINABLE = ("select", "with", "update", "delete")
+
+
+# Statements come from SQLAlchemy's compiled cache, so the same few strings repeat.
+@lru_cache(maxsize=2048)
+def normalize_sql(statement: str) -> str:
+    """Collapse a statement to its shape so executions of it aggregate together.
+
+    Literals and placeholders become `?`, `IN (...)` lists and multi-row
+    `VALUES` collapse to one item, and whitespace is squeezed. Parameter
+    values never make it into the result.
+    """
+    sql = _STRING.sub("?", statement)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _SAVEPOINT.sub(r"\1?", sql)
+    sql = _SPACE.sub(" ", sql).strip()
+    sql = _IN_LIST.sub("IN (?)", sql)
+    return _VALUES_ROWS.sub(r"\1, ...", sql)
+
+
+@dataclass
+class StatementStats:
+    calls: int = 0
+    slow_calls: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_plan: list[str] | None = None
+
+
+class QueryStats:
+    """Per-statement call counts and latency, keyed by normalized SQL.
+
+    At most `max_statements` distinct statements are tracked; executions of
+    statements seen after that are counted under "<other>".
+    """
+
+    OTHER = "<other>"
+
+    def __init__(self, max_statements: int):
+        self.max_statements = max_statements
+        self.statements: dict[str, StatementStats] = {}
+
+    def observe(self, sql: str, elapsed_ms: float, slow: bool) -> StatementStats:
+        stats = self.statements.get(sql)
+        if stats is None:
+            if len(self.statements) >= self.max_statements:
+                sql = self.OTHER
+            stats = self.statements.setdefault(sql, StatementStats())
+        stats.calls += 1
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+        if slow:
+            stats.slow_calls += 1
+        return stats
+
+    def top(self, limit: int, order_by: str = "total_ms") -> list[dict]:
+        rows = sorted(self.statements.items(), key=lambda item: getattr(item[1], order_by), reverse=True)
+        return [
+            {"statement": sql, **asdict(stats), "mean_ms": stats.total_ms / stats.calls}
+            for sql, stats in rows[:limit]
+        ]
+
+    def reset(self) -> None:
+        self.statements.clear()
+
+
+query_stats = QueryStats(settings.db_query_stats_max_statements)
+
+
+def _explain(conn, statement: str, parameters) -> list[str]:
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    # A fresh cursor, so the caller's result set is left alone.
+    # The savepoint keeps a failed EXPLAIN from aborting the transaction.
+    cursor = conn.connection.dbapi_connection.cursor()
+    cursor.execute("SAVEPOINT query_explain")
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [" ".join(str(col) for col in row) for row in cursor.fetchall()]
+    except Exception:
+        cursor.execute("ROLLBACK TO SAVEPOINT query_explain")
+        raise
+    finally:
+        cursor.execute("RELEASE SAVEPOINT query_explain")
+        cursor.close()
+
+
+def instrument_queries(engine: AsyncEngine) -> None:
+    """Time every statement on `engine` into `query_stats` and log slow ones.
+
+    Statements slower than `db_slow_query_ms` are logged as normalized SQL,
+    without parameter values. With `db_slow_query_explain`, their plan is
+    captured too and kept with the statement's stats.
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+        slow = elapsed_ms >= settings.db_slow_query_ms
+        sql = normalize_sql(statement)
+        stats = query_stats.observe(sql, elapsed_ms, slow)
+        if not slow:
+            return
+
+        logger.warning("Slow query (%.1f ms): %s", elapsed_ms, sql, extra={"duration_ms": round(elapsed_ms, 1)})
+        if (
+            settings.db_slow_query_explain
+            and not executemany
+            and statement.lstrip().lower().startswith(_EXPLAINABLE)
+        ):
+            try:
+                stats.last_plan = _explain(conn, statement, parameters)
+            except Exception as e:
+                logger.warning("EXPLAIN failed for slow query: %s", e)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("query_start") if context.connection else None
+        if starts:
+            starts.pop()
@@ -0,0 +1,56 @@
+from sqlalchemy import ColumnElement, case, func, literal, or_
+from app.models.organization import Organization
+
+
+# Columns covered by the trigram GIN indexes and how much a match in each
+# contributes to the rank. The organization name dominates so that an exact
+# name hit always sorts above an address that happens to contain the keyword.
+ORGANIZATION_SEARCH_WEIGHTS = {
+    "organization_name": 1.0,
+    "address": 0.5,
+    "contact_info": 0.5,
+}
+
+
+def _escape_like(keyword: str) -> str:
+    return keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def organization_search(
+    keyword: str,
+    fields: tuple[str, ...] = ("organization_name",),
+    trigram: bool = True,
+) -> tuple[ColumnElement[bool], ColumnElement[float]]:
+    """Build the filter and rank expressions for a keyword search.
+
+    A row matches when any of `fields` contains `keyword` as a substring or
+    fuzzily matches one of its words (`pg_trgm`'s `<%` operator). Both forms
+    are answered from the `gin_trgm_ops` indexes. The rank is the weighted
+    best word similarity across the searched fields.
+
+    Without `trigram` (the embedded SQLite database) only substring matches
+    count, and the rank is the weight of the best field that matched.
+
+    Returns:
+        A `(filter, rank)` pair of SQL expressions.
+    """
+    pattern = f"%{_escape_like(keyword)}%"
+    matches = []
+    scores = []
+    for name in fields:
+        column = getattr(Organization, name)
+        weight = ORGANIZATION_SEARCH_WEIGHTS[name]
+        contains = column.ilike(pattern, escape="\\")
+        matches.append(contains)
+        if trigram:
+            matches.append(literal(keyword).op("<%")(column))
+            scores.append(func.word_similarity(keyword, column) * weight)
+        else:
+            scores.append(case((contains, weight), else_=0.0))
+
+    if len(scores) == 1:
+        rank = scores[0]
+    else:
+        # SQLite has no greatest(); its multi-argument max() is the same thing.
+        rank = func.greatest(*scores) if trigram else func.max(*scores)
+    return or_(*matches), rank
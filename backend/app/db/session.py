@@ -1,22 +1,107 @@
-from sqlalchemy import create_engine
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     create_async_engine,
     async_sessionmaker
 )
 
+from app.db.pool import InstrumentedAsyncPool
+from app.db.query_stats import instrument_queries
 from app.settings import get_settings
 
 settings = get_settings()
 
-engine = create_async_engine(settings.db_url)
-AsyncSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def engine_options(db_url: str) -> dict:
+    """Pool and driver options for `create_async_engine` taken from `Settings`."""
+    options = {
+        "poolclass": InstrumentedAsyncPool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if db_url.startswith("postgresql+asyncpg"):
+        options["connect_args"] = {"statement_cache_size": settings.db_statement_cache_size}
+    return options
+
+
+def make_engine(db_url: str) -> AsyncEngine:
+    """Create an engine for `db_url`; Postgres in production, SQLite for embedded use.
+
+    SQLite (`sqlite+aiosqlite:///path.db`) lets the API and the migrations
+    run in process without a database server, e.g. for benchmarks.
+    """
+    engine = create_async_engine(db_url, **engine_options(db_url))
+    if engine.dialect.name == "sqlite":
+        _configure_sqlite(engine)
+    instrument_queries(engine)
+    return engine
+
+
+def _configure_sqlite(engine: AsyncEngine) -> None:
+    # The sqlite3 driver starts transactions lazily and breaks SAVEPOINT;
+    # SQLAlchemy's documented fix is to emit BEGIN ourselves. Foreign keys
+    # (and so ON DELETE CASCADE) are off unless enabled per connection.
+    @event.listens_for(engine.sync_engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+
+engine = make_engine(settings.db_url)
+AsyncSessionLocal = async_sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
+
+read_engine = (
+    make_engine(settings.db_read_url)
+    if settings.db_read_url
+    else None
+)
+ReadSessionLocal = (
+    async_sessionmaker(
+        autocommit=False, autoflush=False, expire_on_commit=False, bind=read_engine
+    )
+    if read_engine
+    else None
+)
+
+
+class LazySession:
+    """Stand-in for an `AsyncSession` that is only opened on first use.
+
+    Routes that declare a database dependency but never touch it do not pay
+    for building a session.
+    """
+
+    __slots__ = ("_factory", "_session")
+
+    def __init__(self, factory: async_sessionmaker):
+        self._factory = factory
+        self._session: AsyncSession | None = None
+
+    def __getattr__(self, name):
+        if self._session is None:
+            self._session = self._factory()
+        return getattr(self._session, name)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
 
 
 # Dependency to get a DB session per request
 async def get_db():
-    # db: Session = SessionLocal()
-    db: AsyncSession = AsyncSessionLocal()
+    db = LazySession(AsyncSessionLocal)
     try:
         yield db
     finally:
@@ -0,0 +1,470 @@
+import asyncio
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Awaitable, Callable, NamedTuple, Sequence
+from uuid import UUID
+from fastapi import Depends, HTTPException, Response, status
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
+from app.deps.db_routing import get_routed_db
+from app.core.compression import compress_text, decompress_text
+from app.models.application import GeneratedSection, GrantApplication, GrantApplicationVersion
+from app.schemas.application import (
+    ApplicationEditRequest,
+    ApplicationRegenerateRequest,
+    GrantApplicationVersionCreate,
+    GrantApplicationVersionRead,
+)
+from app.services.gemini_service import GeminiService
+from app.services.revisions import load_version, new_version
+from app.services.sections import (
+    PROMPT_PATH,
+    prompt_sections,
+    section_bodies,
+    section_hashes,
+    splice_sections,
+    split_sections,
+)
+from app.services.usage import usage_scope
+from app.schemas.params import cursor_pagination, decode_cursor, encode_cursor
+from app.settings import get_settings
+
+settings = get_settings()
+
+
+def input_payload_hash(payload: dict[str, Any]) -> str:
+    """Stable SHA-256 of a generation request, independent of key order."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _version_read(row: GrantApplicationVersion, content: str) -> GrantApplicationVersionRead:
+    return GrantApplicationVersionRead(
+        application_id=row.application_id,
+        version=row.version,
+        parent_version=row.parent_version,
+        source=row.source,
+        encoding=row.encoding,
+        input_hash=row.input_hash,
+        model_name=row.model_name,
+        model_metadata=row.model_metadata,
+        content_length=row.content_length,
+        created_at=row.created_at,
+        content=content,
+    )
+
+
+# INSERT ... ON CONFLICT per supported backend.
+_DIALECT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+async def _cache_sections(
+    db: AsyncSession,
+    organization_id: UUID,
+    sections: dict[str, tuple[str, str, str | None]],
+) -> None:
+    """Add `{input hash: (section, body, model name)}` to the section cache, skipping known hashes.
+
+    A hash another request cached meanwhile is skipped by the database
+    (`ON CONFLICT DO NOTHING`) instead of failing the commit.
+    """
+    if not sections:
+        return
+    rows = []
+    for input_hash, (section, body, model_name) in sections.items():
+        codec, data = compress_text(body)
+        rows.append({
+            "organization_id": organization_id,
+            "input_hash": input_hash,
+            "section": section,
+            "model_name": model_name,
+            "compression": codec,
+            "content": data,
+        })
+    insert = _DIALECT_INSERTS[db.get_bind().dialect.name]
+    await db.execute(insert(GeneratedSection).values(rows).on_conflict_do_nothing())
+
+
+async def save_generated_application(
+    db: AsyncSession,
+    organization_id: UUID,
+    title: str,
+    content: str,
+    input_hash: str,
+    model_name: str | None,
+    model_metadata: dict[str, Any],
+    section_inputs: dict[str, str] | None = None,
+) -> GrantApplication:
+    """Store a freshly generated application as version 1 of a new draft.
+
+    With `section_inputs` (see `section_hashes`), the sections found in
+    `content` are cached, and a later regeneration only rewrites sections
+    whose inputs changed.
+    """
+    if section_inputs:
+        model_metadata = {**model_metadata, "section_inputs": section_inputs}
+        bodies = section_bodies(content, list(section_inputs))
+        await _cache_sections(
+            db,
+            organization_id,
+            {section_inputs[title]: (title, body, model_name) for title, body in bodies.items()},
+        )
+    application = GrantApplication(
+        organization_id=organization_id, title=title, head_version=1, latest_version=1
+    )
+    db.add(application)
+    db.add(new_version(
+        application,
+        version=1,
+        content=content,
+        source="generated",
+        input_hash=input_hash,
+        model_name=model_name,
+        model_metadata=model_metadata,
+    ))
+    await db.commit()
+    return application
+
+
+async def list_organization_applications(
+    organization_id: UUID,
+    response: Response,
+    pagination_params: tuple[str | None, int] = Depends(cursor_pagination),
+    db: AsyncSession = Depends(get_routed_db)
+) -> Sequence[GrantApplication]:
+    """Fetch an organization's drafts, most recently updated first."""
+    cursor, limit = pagination_params
+    query = (
+        select(GrantApplication)
+        .where(GrantApplication.organization_id == organization_id)
+        .order_by(GrantApplication.updated_at.desc(), GrantApplication.id.desc())
+    )
+    if cursor:
+        updated_at, app_id = decode_cursor(cursor, 2)
+        try:
+            before = (datetime.fromisoformat(updated_at), UUID(app_id))
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        query = query.where(tuple_(GrantApplication.updated_at, GrantApplication.id) < before)
+
+    result = await db.execute(query.limit(limit + 1))
+    applications = result.scalars().all()
+    if len(applications) > limit:
+        applications = applications[:limit]
+        if applications:
+            last = applications[-1]
+            response.headers["X-Next-Cursor"] = encode_cursor(last.updated_at.isoformat(), last.id)
+    return applications
+
+
+async def list_application_versions(
+    application_id: UUID,
+    db: AsyncSession = Depends(get_routed_db)
+) -> Sequence[GrantApplicationVersion]:
+    """Fetch version metadata of a draft, newest first, without loading content."""
+    result = await db.execute(
+        select(GrantApplicationVersion)
+        .options(defer(GrantApplicationVersion.content))
+        .where(GrantApplicationVersion.application_id == application_id)
+        .order_by(GrantApplicationVersion.version.desc())
+    )
+    versions = result.scalars().all()
+    if not versions:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Application not found")
+    return versions
+
+
+async def get_application_version(
+    application_id: UUID,
+    version: int | None = None,
+    db: AsyncSession = Depends(get_routed_db)
+) -> GrantApplicationVersionRead:
+    """Fetch one version of a draft, or its head version."""
+    loaded = await load_version(db, application_id, version)
+    if not loaded:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Application version not found")
+    return _version_read(*loaded)
+
+
+class Revision(NamedTuple):
+    """Content for `_add_revision`, and how it was made."""
+    content: str
+    source: str = "edited"
+    input_hash: str | None = None
+    model_name: str | None = None
+    model_metadata: dict[str, Any] | None = None
+
+
+class StoredRevision(NamedTuple):
+    """What `_add_revision` returns: the head afterwards, and whether it is new."""
+    version: GrantApplicationVersionRead
+    created: bool
+
+
+async def _add_revision(
+    db: AsyncSession,
+    application_id: UUID,
+    base_version: int | None,
+    make_content: Callable[[GrantApplication, tuple[GrantApplicationVersion, str]], Awaitable[Revision | None]],
+) -> StoredRevision:
+    """Store a new head revision derived from `base_version` (default: head).
+
+    `make_content` receives the draft and the base version row and text, and
+    returns the new revision, which is stored as a delta against the base,
+    or None to leave the draft as it is (then the base version is returned,
+    with `created` false). It may wait on the LLM for a long
+    time, so the read transaction is closed first and the connection goes
+    back to the pool; if the draft changed meanwhile, the write fails with 409.
+    """
+    application = await db.get(GrantApplication, application_id)
+    if not application:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Application not found")
+
+    base = await load_version(db, application_id, base_version or application.head_version)
+    if not base:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Application version not found")
+    seen = (application.head_version, application.latest_version)
+    await db.commit()
+
+    with usage_scope(application.organization_id):
+        revision = await make_content(application, base)
+    if revision is None:
+        return StoredRevision(_version_read(*base), created=False)
+
+    model_metadata = revision.model_metadata
+    if model_metadata is None and "section_inputs" in base[0].model_metadata:
+        # The sections still stem from the same inputs; keep them, so a
+        # later regeneration leaves this edit alone where inputs are unchanged.
+        model_metadata = {"section_inputs": base[0].model_metadata["section_inputs"]}
+    row = new_version(
+        application,
+        version=seen[1] + 1,
+        content=revision.content,
+        source=revision.source,
+        parent=base,
+        input_hash=revision.input_hash,
+        model_name=revision.model_name,
+        model_metadata=model_metadata,
+    )
+    db.add(row)
+    try:
+        # Only move the head if nobody else did since the draft was read.
+        moved = await db.execute(
+            update(GrantApplication)
+            .where(
+                GrantApplication.id == application_id,
+                GrantApplication.head_version == seen[0],
+                GrantApplication.latest_version == seen[1],
+            )
+            .values(head_version=row.version, latest_version=row.version)
+            .execution_options(synchronize_session=False)
+        )
+        stored = moved.rowcount == 1
+        if stored:
+            await db.commit()
+    except IntegrityError:
+        stored = False
+    if not stored:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Application was modified by another request"
+        )
+
+    await db.refresh(row, ["created_at"])
+    return StoredRevision(_version_read(row, revision.content), created=True)
+
+
+async def create_application_version(
+    application_id: UUID,
+    data: GrantApplicationVersionCreate,
+    db: AsyncSession = Depends(get_routed_db)
+) -> GrantApplicationVersionRead:
+    """Store an edited version of a draft and make it the head."""
+    async def content(*_) -> Revision:
+        return Revision(data.content)
+
+    return (await _add_revision(db, application_id, data.parent_version, content)).version
+
+
+async def edit_application(
+    application_id: UUID,
+    data: ApplicationEditRequest,
+    db: AsyncSession = Depends(get_routed_db)
+) -> GrantApplicationVersionRead:
+    """Apply an AI edit to a saved draft without the client sending the document."""
+    async def content(_: GrantApplication, base: tuple[GrantApplicationVersion, str]) -> Revision:
+        try:
+            return Revision(await GeminiService().edit_text(
+                base[1], data.selected_text, data.edit_instruction
+            ))
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+    return (await _add_revision(db, application_id, data.base_version, content)).version
+
+
+async def regenerate_application(
+    application_id: UUID,
+    data: ApplicationRegenerateRequest,
+    db: AsyncSession = Depends(get_routed_db)
+) -> StoredRevision:
+    """Bring a saved draft up to date with changed inputs, one section at a time.
+
+    Only sections whose inputs (see `app.services.sections`) differ from the
+    ones the base version was written from are rewritten; a section seen
+    before with the same inputs comes from the section cache. The rewritten
+    sections are spliced into the base text, so the others, including manual
+    edits, are kept. Nothing is stored when no section is affected; the
+    result then says the base version was not `created`.
+    """
+    try:
+        base_prompt = PROMPT_PATH.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Prompt template file not found"
+        )
+    company_data = data.model_dump(exclude={"base_version"})
+    sections = prompt_sections(base_prompt)
+    titles = [section.title for section in sections]
+    hashes = section_hashes(base_prompt, company_data)
+
+    async def content(
+        application: GrantApplication, base: tuple[GrantApplicationVersion, str]
+    ) -> Revision | None:
+        row, text = base
+        previous = row.model_metadata.get("section_inputs") or {}
+        present = split_sections(text, titles)
+        changed = [
+            section for section in sections
+            if previous.get(section.title) != hashes[section.title] or section.title not in present
+        ]
+        if not changed:
+            return None
+
+        cached = {
+            hit.input_hash: hit
+            for hit in await db.scalars(
+                select(GeneratedSection).where(
+                    GeneratedSection.organization_id == application.organization_id,
+                    GeneratedSection.input_hash.in_([hashes[section.title] for section in changed]),
+                )
+            )
+        }
+        bodies = {
+            section.title: decompress_text(hit.compression, hit.content)
+            for section in changed
+            if (hit := cached.get(hashes[section.title])) is not None
+        }
+        missing = [section for section in changed if section.title not in bodies]
+        # Sections may come from different tiers (fallbacks) or from the cache.
+        models = {hit.model_name for hit in cached.values() if hit.model_name}
+        if missing:
+            # Don't hold the cache lookup's transaction while sections are written.
+            await db.commit()
+            try:
+                service = GeminiService()
+                semaphore = asyncio.Semaphore(settings.regenerate_max_parallel_sections)
+
+                async def write(section) -> tuple[str, str]:
+                    async with semaphore:
+                        return await service.generate_section(
+                            base_prompt, company_data, section.title, section.length, text
+                        )
+
+                written = await asyncio.gather(*(write(section) for section in missing))
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+            bodies.update((section.title, body) for section, (body, _) in zip(missing, written))
+            models.update(model_name for _, model_name in written)
+            await _cache_sections(
+                db,
+                application.organization_id,
+                {
+                    hashes[section.title]: (section.title, body, model_name)
+                    for section, (body, model_name) in zip(missing, written)
+                },
+            )
+
+        return Revision(
+            splice_sections(text, titles, bodies),
+            source="regenerated",
+            input_hash=input_payload_hash(company_data),
+            model_name=next(iter(models)) if len(models) == 1 else None,
+            model_metadata={
+                "section_inputs": hashes,
+                "regenerated_sections": [section.title for section in missing],
+                "cached_sections": [section.title for section in changed if section not in missing],
+                "models": sorted(models),
+            },
+        )
+
+    return await _add_revision(db, application_id, data.base_version, content)
+
+
+async def _move_head(db: AsyncSession, application_id: UUID, redo: bool) -> GrantApplicationVersionRead:
+    application = await db.get(GrantApplication, application_id)
+    if not application:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Application not found")
+
+    V = GrantApplicationVersion
+    if redo:
+        # Redo follows the most recent edit made on top of the current head.
+        target = await db.scalar(
+            select(func.max(V.version)).where(
+                V.application_id == application_id, V.parent_version == application.head_version
+            )
+        )
+    else:
+        target = await db.scalar(
+            select(V.parent_version).where(
+                V.application_id == application_id, V.version == application.head_version
+            )
+        )
+    if target is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Nothing to redo" if redo else "Nothing to undo"
+        )
+
+    loaded = await load_version(db, application_id, target)
+    # Only move the head if no revision or other undo/redo moved it since it was read.
+    moved = await db.execute(
+        update(GrantApplication)
+        .where(
+            GrantApplication.id == application_id,
+            GrantApplication.head_version == application.head_version,
+            GrantApplication.latest_version == application.latest_version,
+        )
+        .values(head_version=target)
+        .execution_options(synchronize_session=False)
+    )
+    if moved.rowcount != 1:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Application was modified by another request"
+        )
+    await db.commit()
+    return _version_read(*loaded)
+
+
+async def undo_application_edit(
+    application_id: UUID,
+    db: AsyncSession = Depends(get_routed_db)
+) -> GrantApplicationVersionRead:
+    """Move the head of a draft back to its parent version."""
+    return await _move_head(db, application_id, redo=False)
+
+
+async def redo_application_edit(
+    application_id: UUID,
+    db: AsyncSession = Depends(get_routed_db)
+) -> GrantApplicationVersionRead:
+    """Move the head of a draft forward to its most recent child version."""
+    return await _move_head(db, application_id, redo=True)
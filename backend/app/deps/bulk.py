@@ -0,0 +1,86 @@
+import json
+from typing import Any, AsyncIterator, Hashable
+from fastapi import HTTPException, Request, status
+from sqlalchemy import Executable
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.bulk import BulkResult, BulkRowError
+
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+class RowParseError(ValueError):
+    pass
+
+
+async def iter_request_rows(request: Request) -> AsyncIterator[tuple[int, Any]]:
+    """Yield `(index, row)` pairs from a JSON array or NDJSON request body.
+
+    NDJSON bodies are decoded line by line while they stream in, so a large
+    upload never has to be held in memory as a whole. A line that is not valid
+    JSON is yielded as a `RowParseError` so it can be reported against its row.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+
+    if content_type in NDJSON_MEDIA_TYPES:
+        index = 0
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield index, _parse_line(line)
+                    index += 1
+        if buffer.strip():
+            yield index, _parse_line(buffer)
+        return
+
+    try:
+        rows = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be a JSON array or NDJSON")
+
+    for index, row in enumerate(rows):
+        yield index, row
+
+
+def _parse_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return RowParseError(f"Invalid JSON: {e}")
+
+
+async def execute_batch(
+    db: AsyncSession,
+    stmt: Executable,
+    batch: list[tuple[int, Hashable, dict]],
+    result: BulkResult,
+) -> None:
+    """Run `stmt` once for a whole batch of `(index, row_id, params)` and commit.
+
+    The batch goes out as a single multi-row/executemany call. If the database
+    rejects it, the batch is replayed one row per savepoint so that only the
+    offending rows are reported and the rest are still written.
+    """
+    try:
+        await db.execute(stmt, [params for _, _, params in batch])
+        await db.commit()
+        result.ids.extend(row_id for _, row_id, _ in batch)
+    except DBAPIError:
+        await db.rollback()
+        for index, row_id, params in batch:
+            try:
+                async with db.begin_nested():
+                    await db.execute(stmt, [params])
+                result.ids.append(row_id)
+            except DBAPIError as e:
+                # Drivers such as asyncpg wrap their own exception; report its message.
+                cause = e.orig.__cause__ or e.orig
+                detail = str(cause).strip().splitlines()[0]
+                result.errors.append(BulkRowError(index=index, id=row_id, detail=detail))
+        await db.commit()
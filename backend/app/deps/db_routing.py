@@ -0,0 +1,99 @@
+import math
+import time
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.db import session as db_session
+from app.db.session import LazySession
+from app.settings import get_settings
+
+
+settings = get_settings()
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+# Time of the client's last committed write, carried by the client itself so
+# every worker sees it; see `ReadYourWritesMiddleware`.
+LAST_WRITE_COOKIE = "last_write"
+
+
+def recent_write(last_write: str | None, now: float | None = None) -> bool:
+    """Whether a `last_write` cookie value falls within the read-your-writes window.
+
+    Writes stamped slightly in the future (clock skew between workers) count
+    as recent too.
+    """
+    try:
+        written = float(last_write)
+    except (TypeError, ValueError):
+        return False
+    window = settings.db_read_your_writes_seconds
+    return abs((time.time() if now is None else now) - written) < window
+
+
+def use_replica(method: str, last_write: str | None) -> bool:
+    """Whether a request may be served from the read replica."""
+    return (
+        db_session.ReadSessionLocal is not None
+        and method in SAFE_METHODS
+        and not recent_write(last_write)
+    )
+
+
+def _primary_session(request: Request) -> AsyncSession:
+    session = db_session.AsyncSessionLocal()
+
+    def mark(_) -> None:
+        request.state.last_write = time.time()
+
+    event.listen(session.sync_session, "after_commit", mark)
+    return session
+
+
+async def get_routed_db(request: Request):
+    """Session on the replica for safe requests, on the primary otherwise.
+
+    Commits made through the primary session start the client's
+    read-your-writes window.
+    """
+    if use_replica(request.method, request.cookies.get(LAST_WRITE_COOKIE)):
+        db = LazySession(db_session.ReadSessionLocal)
+    else:
+        db = LazySession(lambda: _primary_session(request))
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+class ReadYourWritesMiddleware:
+    """Pure ASGI middleware handing the time of a committed write to the client.
+
+    The time goes out in the `last_write` cookie, which expires with the
+    window; while the client sends it back, its reads stay on the primary on
+    whichever worker serves them.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                written = scope.get("state", {}).get("last_write")
+                if written is not None:
+                    cookie = (
+                        f"{LAST_WRITE_COOKIE}={written:.3f}; "
+                        f"Max-Age={math.ceil(settings.db_read_your_writes_seconds)}; "
+                        "Path=/; HttpOnly; SameSite=Lax"
+                    )
+                    message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
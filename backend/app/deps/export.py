@@ -0,0 +1,74 @@
+import os
+import re
+from typing import BinaryIO, Iterator, Literal
+from urllib.parse import quote
+from uuid import UUID
+from fastapi import Depends, Header, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.etag import if_none_match
+from app.deps.db_routing import get_routed_db
+from app.deps.organization import not_modified
+from app.models.application import GrantApplication
+from app.services.export import MEDIA_TYPES, export_cache, export_key
+from app.services.revisions import load_version
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _filename(title: str, version: int, fmt: str) -> str:
+    stem = re.sub(r"[^\w.-]+", "-", title).strip("-.") or "application"
+    return f"{stem}-v{version}.{fmt}"
+
+
+def _content_disposition(filename: str) -> str:
+    # As FileResponse does it: RFC 5987 encoding for non-ASCII names.
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def _chunks(file: BinaryIO) -> Iterator[bytes]:
+    with file:
+        while chunk := file.read(CHUNK_SIZE):
+            yield chunk
+
+
+async def export_application(
+    application_id: UUID,
+    format: Literal["docx", "pdf"] = "docx",
+    version: int | None = None,
+    if_none_match_header: str | None = Header(None, alias="If-None-Match"),
+    db: AsyncSession = Depends(get_routed_db)
+) -> StreamingResponse:
+    """Render one version of a draft (default: head) to DOCX or PDF.
+
+    The file is streamed from the export cache, through a handle opened
+    before the response starts, so pruning it meanwhile does no harm. The
+    ETag is the cache key, so a client holding the same rendering gets a 304.
+    """
+    application = await db.get(GrantApplication, application_id)
+    if not application:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Application not found")
+
+    loaded = await load_version(db, application_id, version or application.head_version)
+    if not loaded:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Application version not found")
+    row, content = loaded
+
+    etag = f'"{export_key(content, format)}"'
+    if if_none_match(if_none_match_header, etag):
+        raise not_modified(etag)
+
+    file, _ = await export_cache.open(content, format)
+    return StreamingResponse(
+        _chunks(file),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "ETag": etag,
+            "Content-Length": str(os.fstat(file.fileno()).st_size),
+            "Content-Disposition": _content_disposition(_filename(application.title, row.version, format)),
+        },
+    )
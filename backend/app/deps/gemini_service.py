@@ -1,14 +1,21 @@
-import os
 import asyncio
-from typing import List, Dict, Any, Optional
-import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
+import json
+import os
+import tempfile
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 from fastapi import HTTPException, UploadFile
+from app.core.metrics import LLM_UPLOAD_BYTES
+from app.core.tracing import tracer
+from app.schemas.generation import OutlineSection, TemplateOutline
+from app.services.llm import ModelRouter
+from app.settings import get_settings
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# (content, filename, mime type) of a file read from the request
+FilePart = Tuple[bytes, str, str]
 
 class GeminiService:
     def __init__(self, api_key: Optional[str] = None):
@@ -18,6 +25,11 @@ class GeminiService:
         Args:
             api_key: Google AI API key. If None, will try to get from environment
         """
+        # The SDK takes most of a second to import; only pay for it once a
+        # service is actually needed.
+        import google.generativeai as genai
+        from google.generativeai.types import HarmCategory, HarmBlockThreshold
+
         self.api_key = api_key
         if not self.api_key:
             raise ValueError("Google AI API key is required. Set GOOGLE_AI_API_KEY environment variable or pass api_key parameter.")
@@ -25,8 +37,8 @@ class GeminiService:
         # Configure the API
         genai.configure(api_key=self.api_key)
         
-        # Initialize the model (using latest Gemini Pro)
-        self.model = genai.GenerativeModel('gemini-1.5-pro-latest')
+        # Models are built per tier on first use; see `Settings.llm_routes`
+        self.router = ModelRouter(genai.GenerativeModel)
         
         # Safety settings - adjust as needed
         self.safety_settings = {
@@ -48,23 +60,31 @@ class GeminiService:
         Returns:
             Uploaded file object
         """
+        import google.generativeai as genai
+
         try:
-            # Save temporarily to upload (Gemini requires file path)
-            temp_path = f"/tmp/{file_name}"
-            with open(temp_path, "wb") as f:
-                f.write(file_content)
-            
-            # Upload to Gemini
-            uploaded_file = genai.upload_file(path=temp_path, display_name=file_name)
-            
-            # Clean up temp file
-            os.remove(temp_path)
+            with tracer.start_as_current_span("gemini.upload_file") as span:
+                span.set_attribute("file.size", len(file_content))
+                span.set_attribute("file.mime_type", mime_type)
+
+                def upload() -> Any:
+                    # Gemini requires a file path; a unique temp file keeps
+                    # concurrent uploads of same-named files apart.
+                    suffix = os.path.splitext(file_name)[1]
+                    with tempfile.NamedTemporaryFile(suffix=suffix) as f:
+                        f.write(file_content)
+                        f.flush()
+                        return genai.upload_file(path=f.name, display_name=file_name)
+
+                # The SDK call blocks; run it off the event loop.
+                uploaded_file = await asyncio.to_thread(upload)
+                LLM_UPLOAD_BYTES.labels("templates").inc(len(file_content))
             
-            logger.info(f"Uploaded file: {file_name} with URI: {uploaded_file.uri}")
+            logger.info("Uploaded file: %s with URI: %s", file_name, uploaded_file.uri)
             return uploaded_file
             
         except Exception as e:
-            logger.error(f"Error uploading file {file_name}: {str(e)}")
+            logger.error("Error uploading file %s: %s", file_name, e)
             raise HTTPException(status_code=500, detail=f"Failed to upload file {file_name}: {str(e)}")
 
     async def generate_grant_template(
@@ -90,49 +110,30 @@ class GeminiService:
             # Prepare the context text
             context_text = self._format_user_context(user_context)
             
-            # Upload files to Gemini
-            uploaded_files = []
-            
-            # Upload the grant template file first
-            template_content = await grant_template_file.read()
-            template_file = await self._upload_file_to_gemini(
-                template_content, 
-                grant_template_file.filename,
-                grant_template_file.content_type or "application/octet-stream"
+            # Upload the grant template file first, then the context files
+            uploaded_files = await self._upload_parts(
+                [await read_file_part(grant_template_file)]
+                + [await read_file_part(file) for file in files]
             )
-            uploaded_files.append(template_file)
-            
-            # Upload additional context files
-            for file in files:
-                file_content = await file.read()
-                uploaded_file = await self._upload_file_to_gemini(
-                    file_content,
-                    file.filename,
-                    file.content_type or "application/octet-stream"
-                )
-                uploaded_files.append(uploaded_file)
             
             # Create the prompt
-            prompt = self._create_grant_generation_prompt(
-                context_text, 
-                grant_template_file.filename,
-                additional_instructions
-            )
+            with tracer.start_as_current_span("gemini.build_prompt"):
+                prompt = self._create_grant_generation_prompt(
+                    context_text, 
+                    grant_template_file.filename,
+                    additional_instructions
+                )
             
             # Prepare content for generation
             content = [prompt] + uploaded_files
             
             # Generate the response
-            response = await asyncio.to_thread(
-                self.model.generate_content,
+            response, _ = await self.router.generate(
                 content,
+                service="templates",
+                operation="generate_template",
                 safety_settings=self.safety_settings,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.7,
-                    top_p=0.8,
-                    top_k=40,
-                    max_output_tokens=8192,
-                )
+                generation_config=self._generation_config()
             )
             
             if not response.text:
@@ -142,9 +143,183 @@ class GeminiService:
             return response.text
             
         except Exception as e:
-            logger.error(f"Error generating grant template: {str(e)}")
+            logger.error("Error generating grant template: %s", e)
             raise HTTPException(status_code=500, detail=f"Failed to generate grant template: {str(e)}")
 
+    async def _upload_parts(self, parts: List[FilePart]) -> List[Any]:
+        """Upload files to Gemini concurrently, keeping their order."""
+        return list(await asyncio.gather(*(
+            self._upload_file_to_gemini(content, filename, mime_type)
+            for content, filename, mime_type in parts
+        )))
+
+    def _generation_config(self, **overrides: Any) -> Any:
+        import google.generativeai as genai
+
+        return genai.types.GenerationConfig(
+            **{"temperature": 0.7, "top_p": 0.8, "top_k": 40, "max_output_tokens": 8192, **overrides}
+        )
+
+    async def generate_outline(
+        self,
+        context_text: str,
+        template_filename: str,
+        uploaded_files: List[Any],
+        additional_instructions: Optional[str] = None
+    ) -> List[OutlineSection]:
+        """
+        Plan a grant template as a list of sections with key points
+        
+        Args:
+            context_text: Formatted user context
+            template_filename: Name of the template file
+            uploaded_files: Template and context files already uploaded to Gemini
+            additional_instructions: Optional additional instructions
+            
+        Returns:
+            Sections in document order, at most `outline_max_sections`
+        """
+        prompt = self._create_grant_generation_prompt(
+            context_text, template_filename, additional_instructions
+        ) + """
+**OUTLINE ONLY:**
+Do not write the template yet. Return only JSON of the form
+{"sections": [{"title": "...", "key_points": ["...", "..."]}]}
+listing the template's sections in order, each with the 2-6 key points it must cover.
+"""
+        response, _ = await self.router.generate(
+            [prompt] + uploaded_files,
+            service="templates",
+            operation="generate_outline",
+            safety_settings=self.safety_settings,
+            generation_config=self._generation_config(response_mime_type="application/json")
+        )
+        try:
+            outline = TemplateOutline.model_validate(json.loads(response.text))
+        except ValueError as e:
+            raise HTTPException(status_code=502, detail=f"Model returned an invalid outline: {str(e)}")
+        if not outline.sections:
+            raise HTTPException(status_code=502, detail="Model returned an empty outline")
+        return outline.sections[:settings.outline_max_sections]
+
+    async def expand_section(
+        self,
+        context_text: str,
+        sections: List[OutlineSection],
+        index: int,
+        uploaded_files: List[Any],
+        additional_instructions: Optional[str] = None
+    ) -> str:
+        """
+        Write one section of an outlined grant template
+        
+        Args:
+            context_text: Formatted user context
+            sections: The whole outline, so the section fits the document
+            index: Which section to write
+            uploaded_files: Template and context files already uploaded to Gemini
+            additional_instructions: Optional additional instructions
+            
+        Returns:
+            The section in markdown, starting with its heading
+        """
+        section = sections[index]
+        outline_text = "\n".join(
+            f"{i + 1}. {s.title}" + (" <- WRITE THIS ONE" if i == index else "")
+            for i, s in enumerate(sections)
+        )
+        key_points = "\n".join(f"- {point}" for point in section.key_points) or "- (use your judgement)"
+        prompt = f"""
+You are an expert grant writer helping startups and founders write compelling grant applications.
+A grant template is being written one section at a time, following the uploaded template file
+and this outline:
+
+{outline_text}
+
+**CONTEXT INFORMATION:**
+{context_text}
+
+Write section {index + 1}, "{section.title}", in markdown, starting with the heading
+"## {section.title}". It must cover:
+{key_points}
+
+Where specific information is not available in the context, give clear guidance on what should be filled in.
+Return ONLY this section; the other sections are written separately.
+"""
+        if additional_instructions:
+            prompt += f"\n\n**SPECIAL INSTRUCTIONS:**\n{additional_instructions}"
+
+        response, _ = await self.router.generate(
+            [prompt] + uploaded_files,
+            service="templates",
+            operation="expand_section",
+            safety_settings=self.safety_settings,
+            generation_config=self._generation_config()
+        )
+        if not response.text:
+            raise ValueError(f"Empty response for section {section.title!r}")
+        return response.text.strip()
+
+    async def stream_grant_template(
+        self,
+        user_context: Dict[str, Any],
+        template_part: FilePart,
+        context_parts: List[FilePart],
+        additional_instructions: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate a grant template outline-first, yielding events as they are ready
+        
+        The outline comes from one fast call. Its sections are then expanded
+        concurrently, at most `outline_max_parallel_sections` at a time, and
+        each is yielded as soon as it is done, in completion order.
+        
+        Args:
+            user_context: Dictionary containing user/startup information
+            template_part: The template file to use as inspiration
+            context_parts: Additional files for context
+            additional_instructions: Optional additional instructions
+            
+        Yields:
+            {"event": "outline", "sections": [...]}, then one
+            {"event": "section", "index", "title", "content"} or
+            {"event": "section_error", "index", "title", "detail"} per section,
+            then {"event": "done", "failed": n}
+        """
+        context_text = self._format_user_context(user_context)
+        uploaded_files = await self._upload_parts([template_part] + context_parts)
+        sections = await self.generate_outline(
+            context_text, template_part[1], uploaded_files, additional_instructions
+        )
+        yield {"event": "outline", "sections": [s.model_dump() for s in sections]}
+
+        limit = asyncio.Semaphore(settings.outline_max_parallel_sections)
+
+        async def expand(index: int) -> Dict[str, Any]:
+            title = sections[index].title
+            try:
+                async with limit:
+                    content = await self.expand_section(
+                        context_text, sections, index, uploaded_files, additional_instructions
+                    )
+                return {"event": "section", "index": index, "title": title, "content": content}
+            except Exception as e:
+                logger.error("Error expanding section %d (%s): %s", index, title, e)
+                return {"event": "section_error", "index": index, "title": title, "detail": str(e)}
+
+        tasks = [asyncio.create_task(expand(i)) for i in range(len(sections))]
+        failed = 0
+        try:
+            for finished in asyncio.as_completed(tasks):
+                event = await finished
+                failed += event["event"] == "section_error"
+                yield event
+        finally:
+            # The client went away; stop expanding what is left.
+            for task in tasks:
+                task.cancel()
+        yield {"event": "done", "failed": failed}
+
     def _format_user_context(self, user_context: Dict[str, Any]) -> str:
         """
         Format user context into a readable string
@@ -254,6 +429,11 @@ The additional uploaded files contain supplementary information that should be i
 
         return base_prompt
 
+async def read_file_part(file: UploadFile) -> FilePart:
+    """Read an uploaded file while the request is still open."""
+    return (await file.read(), file.filename, file.content_type or "application/octet-stream")
+
+
 # Example usage function for FastAPI endpoint
 async def create_grant_template_endpoint(
     gemini_service: GeminiService,
@@ -292,5 +472,5 @@ async def create_grant_template_endpoint(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in endpoint: {str(e)}")
+        logger.error("Unexpected error in endpoint: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -1,20 +1,32 @@
+import uuid
+from datetime import datetime
 from typing import Sequence
-from fastapi import Depends, HTTPException, status
-from sqlalchemy import delete, select, update
+from uuid import UUID
+from fastapi import Depends, Header, HTTPException, Request, Response, status
+from pydantic import ValidationError
+from sqlalchemy import and_, bindparam, delete, insert, or_, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.etag import if_none_match, list_etag, parse_if_match, row_etag
+from app.deps.bulk import RowParseError, execute_batch, iter_request_rows
 from app.models.organization import Organization
 from app.schemas.organization import (
     ListOrganizationParams,
+    OrganizationBulkUpdate,
     OrganizationCreate,
     OrganizationUpdate
 )
-from app.db.session import get_db
-from app.schemas.params import pagination
+from app.schemas.bulk import BulkResult, BulkRowError
+from app.db.search import ORGANIZATION_SEARCH_WEIGHTS, organization_search
+from app.deps.db_routing import get_routed_db
+from app.schemas.params import cursor_pagination, decode_cursor, encode_cursor
+from app.settings import get_settings
+
+settings = get_settings()
 
 
 async def create_organization(
     data: OrganizationCreate,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_routed_db)
 ) -> Organization:
     """Create an organization based on `OrganizationCreate`."""
     try:
@@ -29,32 +41,108 @@ async def create_organization(
         raise e
 
 
+def not_modified(etag: str) -> HTTPException:
+    """304 response for a conditional GET; FastAPI sends it without a body."""
+    return HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
 async def list_organizations(
+    response: Response,
     params: ListOrganizationParams = Depends(),
-    pagination_params: tuple[int, int] = Depends(pagination),
-    db: AsyncSession = Depends(get_db)
+    pagination_params: tuple[str | None, int] = Depends(cursor_pagination),
+    if_none_match_header: str | None = Header(None, alias="If-None-Match"),
+    db: AsyncSession = Depends(get_routed_db)
 ) -> Sequence:
-    """Fetch a list of all organizations based on `ListOrganizationParams`."""
-    skip, limit = pagination_params
+    """Fetch a page of organizations based on `ListOrganizationParams`.
+
+    Without a keyword, pages are ordered on `(created_at, id)`; with one, they
+    are ranked by trigram similarity and ordered on `(rank desc, id)`. Either
+    way the next page continues after the row encoded in `cursor`, which is
+    returned in the `X-Next-Cursor` header.
+
+    The page's ETag is derived from the `id` and `updated_at` of its rows.
+    When `If-None-Match` is sent, the page is first fetched as `(id,
+    updated_at)` pairs only, and 304 is returned if the tag still matches.
+    """
+    cursor, limit = pagination_params
     try:
-        query = select(Organization).offset(skip).limit(limit)
+        after = decode_cursor(cursor, 2) if cursor else None
 
         if params.keyword:
-            query = query.filter(Organization.organization_name.ilike(f"%{params.keyword}%"))
+            fields = tuple(ORGANIZATION_SEARCH_WEIGHTS) if params.search_all_fields else ("organization_name",)
+            trigram = db.get_bind().dialect.name == "postgresql"
+            matches, sort_key = organization_search(params.keyword, fields, trigram)
+            conditions = [matches]
+            order_by = (sort_key.desc(), Organization.id)
+            if after:
+                try:
+                    last_rank, last_id = float(after[0]), UUID(after[1])
+                except ValueError:
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+                conditions.append(
+                    or_(sort_key < last_rank, and_(sort_key == last_rank, Organization.id > last_id))
+                )
+        else:
+            sort_key = Organization.created_at
+            conditions = []
+            order_by = (Organization.created_at, Organization.id)
+            if after:
+                try:
+                    last = (datetime.fromisoformat(after[0]), UUID(after[1]))
+                except ValueError:
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+                conditions.append(tuple_(Organization.created_at, Organization.id) > last)
+
+        def page(*columns):
+            return select(*columns, sort_key).where(*conditions).order_by(*order_by).limit(limit + 1)
+
+        if if_none_match_header:
+            result = await db.execute(page(Organization.id, Organization.updated_at))
+            versions = result.all()
+            etag = list_etag(
+                ((row_id, updated_at) for row_id, updated_at, _ in versions[:limit]),
+                len(versions) > limit,
+            )
+            if if_none_match(if_none_match_header, etag):
+                raise not_modified(etag)
 
-        result = await db.execute(query)
-        orgs = result.scalars().all()
-        return orgs
+        result = await db.execute(page(Organization))
+        rows = result.all()
+        more = len(rows) > limit
+        rows = rows[:limit]
+
+        if more and rows:
+            last_org, last_key = rows[-1]
+            if isinstance(last_key, datetime):
+                last_key = last_key.isoformat()
+            response.headers["X-Next-Cursor"] = encode_cursor(last_key, last_org.id)
+        response.headers["ETag"] = list_etag(((org.id, org.updated_at) for org, _ in rows), more)
+        return [org for org, _ in rows]
     except Exception as e:
         raise e
 
 
 async def get_organization_by_id(
-    organization_id: str,
-    db: AsyncSession = Depends(get_db)
+    organization_id: UUID,
+    response: Response,
+    if_none_match_header: str | None = Header(None, alias="If-None-Match"),
+    db: AsyncSession = Depends(get_routed_db)
 ) -> Organization:
-    """Fetch an organization entry based on `organization_id`."""
+    """Fetch an organization entry based on `organization_id`.
+
+    When `If-None-Match` is sent, only `updated_at` is read first and 304 is
+    returned if the row's ETag still matches.
+    """
     try:
+        if if_none_match_header:
+            updated_at = await db.scalar(
+                select(Organization.updated_at).where(Organization.id == organization_id)
+            )
+            if updated_at is not None:
+                etag = row_etag(organization_id, updated_at)
+                if if_none_match(if_none_match_header, etag):
+                    raise not_modified(etag)
+
         result = await db.execute(
             select(Organization).where(Organization.id == organization_id)
         )
@@ -63,37 +151,60 @@ async def get_organization_by_id(
         if not org:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Organization not found")
 
+        response.headers["ETag"] = row_etag(org.id, org.updated_at)
         return org
     except Exception as e:
         raise e
 
 
 async def update_organization(
-    organization_id: str,
+    organization_id: UUID,
     data: OrganizationUpdate,
-    db: AsyncSession = Depends(get_db)
+    response: Response,
+    if_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_routed_db)
 ) -> Organization:
-    """Update an organization entry based on `organization_id` and `OrganizationUpdate`."""
+    """Update an organization entry based on `organization_id` and `OrganizationUpdate`.
+
+    The update is a single `UPDATE ... RETURNING`. When an `If-Match` header is
+    sent, the row is only updated if its current ETag is one of the given tags,
+    otherwise 412 is returned.
+    """
     try:
-        result = await db.execute(
-            select(Organization).where(Organization.id == organization_id)
-        )
+        conditions = [Organization.id == organization_id]
+        if if_match:
+            versions = parse_if_match(if_match, organization_id)
+            if versions is not None:
+                conditions.append(Organization.updated_at.in_(versions))
+
+        org_data = data.model_dump(exclude_unset=True)
+        if org_data:
+            stmt = (
+                update(Organization)
+                .where(*conditions)
+                .values(**org_data)
+                .returning(Organization)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            stmt = select(Organization).where(*conditions)
+
+        result = await db.execute(stmt)
         org = result.scalars().first()
 
         if not org:
+            if if_match and await db.scalar(
+                select(Organization.id).where(Organization.id == organization_id)
+            ):
+                raise HTTPException(
+                    status_code=status.HTTP_412_PRECONDITION_FAILED,
+                    detail="Organization was modified by another request"
+                )
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Organization not found")
 
-        org_data = data.model_dump(exclude_unset=True)
-        stmt = (
-            update(Organization)
-            .where(Organization.id == organization_id)
-            .values(**org_data)
-        )
-
-        await db.execute(stmt)
-        await db.commit();
+        await db.commit()
 
-        await db.refresh(org)
+        response.headers["ETag"] = row_etag(org.id, org.updated_at)
         return org
 
     except Exception as e:
@@ -101,8 +212,8 @@ async def update_organization(
 
 
 async def delete_organization(
-    organization_id: str,
-    db: AsyncSession = Depends(get_db)
+    organization_id: UUID,
+    db: AsyncSession = Depends(get_routed_db)
 ):
     """Delete an organization entry based on `organization_id`."""
     try:
@@ -116,3 +227,132 @@ async def delete_organization(
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Organization not found")
     except Exception as e:
         raise e
+
+
+async def _validated_rows(request: Request, schema, result: BulkResult):
+    """Yield `(index, model)` for every row of the body that validates against `schema`."""
+    async for index, row in iter_request_rows(request):
+        try:
+            if isinstance(row, RowParseError):
+                raise row
+            yield index, schema.model_validate(row)
+        except (RowParseError, ValidationError) as e:
+            detail = e.errors(include_url=False) if isinstance(e, ValidationError) else str(e)
+            result.errors.append(BulkRowError(index=index, detail=detail))
+
+
+async def _existing_ids(db: AsyncSession, ids: list[UUID]) -> set[UUID]:
+    result = await db.execute(select(Organization.id).where(Organization.id.in_(ids)))
+    return set(result.scalars().all())
+
+
+async def bulk_create_organizations(
+    request: Request,
+    db: AsyncSession = Depends(get_routed_db)
+) -> BulkResult:
+    """Create organizations from a JSON array or NDJSON body of `OrganizationCreate`.
+
+    Rows are inserted `bulk_batch_size` at a time with one multi-row INSERT
+    and one commit per batch.
+    """
+    result = BulkResult()
+    stmt = insert(Organization.__table__)
+    batch = []
+
+    async for index, data in _validated_rows(request, OrganizationCreate, result):
+        org_id = uuid.uuid4()
+        batch.append((index, org_id, {"id": org_id, **data.model_dump()}))
+        if len(batch) >= settings.bulk_batch_size:
+            await execute_batch(db, stmt, batch, result)
+            batch = []
+
+    if batch:
+        await execute_batch(db, stmt, batch, result)
+    return result
+
+
+async def _flush_updates(db: AsyncSession, batch: list, result: BulkResult) -> None:
+    existing = await _existing_ids(db, [data.id for _, data in batch])
+
+    # executemany needs the same columns in every row, so group rows by the
+    # set of fields they change.
+    groups: dict[tuple[str, ...], list] = {}
+    for index, data in batch:
+        if data.id not in existing:
+            result.errors.append(BulkRowError(index=index, id=data.id, detail="Organization not found"))
+            continue
+        values = data.model_dump(exclude_unset=True, exclude={"id"})
+        groups.setdefault(tuple(sorted(values)), []).append(
+            (index, data.id, {"b_id": data.id, **values})
+        )
+
+    table = Organization.__table__
+    for fields, rows in groups.items():
+        if not fields:
+            result.ids.extend(row_id for _, row_id, _ in rows)
+            continue
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values({field: bindparam(field) for field in fields})
+        )
+        await execute_batch(db, stmt, rows, result)
+
+
+async def bulk_update_organizations(
+    request: Request,
+    db: AsyncSession = Depends(get_routed_db)
+) -> BulkResult:
+    """Update organizations from a JSON array or NDJSON body of `OrganizationBulkUpdate`."""
+    result = BulkResult()
+    batch = []
+
+    async for index, data in _validated_rows(request, OrganizationBulkUpdate, result):
+        batch.append((index, data))
+        if len(batch) >= settings.bulk_batch_size:
+            await _flush_updates(db, batch, result)
+            batch = []
+
+    if batch:
+        await _flush_updates(db, batch, result)
+    return result
+
+
+async def _flush_deletes(db: AsyncSession, batch: list, result: BulkResult) -> None:
+    existing = await _existing_ids(db, [org_id for _, org_id in batch])
+    rows = []
+    for index, org_id in batch:
+        if org_id not in existing:
+            result.errors.append(BulkRowError(index=index, id=org_id, detail="Organization not found"))
+        else:
+            rows.append((index, org_id, {"b_id": org_id}))
+
+    if rows:
+        table = Organization.__table__
+        stmt = delete(table).where(table.c.id == bindparam("b_id"))
+        await execute_batch(db, stmt, rows, result)
+
+
+async def bulk_delete_organizations(
+    request: Request,
+    db: AsyncSession = Depends(get_routed_db)
+) -> BulkResult:
+    """Delete organizations from a JSON array or NDJSON body of ids."""
+    result = BulkResult()
+    batch = []
+
+    async for index, row in iter_request_rows(request):
+        try:
+            if isinstance(row, RowParseError):
+                raise row
+            batch.append((index, UUID(str(row["id"] if isinstance(row, dict) else row))))
+        except (KeyError, ValueError) as e:
+            result.errors.append(BulkRowError(index=index, detail=f"Invalid id: {e}"))
+            continue
+        if len(batch) >= settings.bulk_batch_size:
+            await _flush_deletes(db, batch, result)
+            batch = []
+
+    if batch:
+        await _flush_deletes(db, batch, result)
+    return result
@@ -0,0 +1,35 @@
+from functools import lru_cache
+from typing import Annotated
+from fastapi import Depends, Request
+from fastapi.security import OAuth2PasswordRequestForm
+from app.core.rate_limit import (
+    InMemoryRateLimitBackend,
+    LoginRateLimiter,
+    RedisRateLimitBackend,
+)
+from app.settings import get_settings
+
+
+@lru_cache()
+def get_login_rate_limiter() -> LoginRateLimiter:
+    settings = get_settings()
+    if settings.rate_limit_redis_url:
+        backend = RedisRateLimitBackend(settings.rate_limit_redis_url)
+    else:
+        backend = InMemoryRateLimitBackend(max_keys=settings.login_rate_limit_max_keys)
+
+    return LoginRateLimiter(
+        backend,
+        per_username=settings.login_rate_limit_per_username,
+        per_ip=settings.login_rate_limit_per_ip,
+        window_seconds=settings.login_rate_limit_window_seconds,
+    )
+
+
+async def login_rate_limit(
+    request: Request,
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+):
+    """Reject a login attempt over the limit before any password is checked."""
+    client_ip = request.client.host if request.client else None
+    await get_login_rate_limiter().check(form_data.username, client_ip)
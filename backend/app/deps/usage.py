@@ -0,0 +1,49 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Sequence
+from uuid import UUID
+from fastapi import Depends, HTTPException, Query, status
+from sqlalchemy import Row, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.functions import utc_date
+from app.deps.db_routing import get_routed_db
+from app.models.usage import LLMUsage
+
+
+async def usage_rollup(
+    since: date | None = Query(None, description="First day to include; defaults to 30 days ago"),
+    until: date | None = Query(None, description="Last day to include; defaults to today"),
+    organization_id: UUID | None = None,
+    db: AsyncSession = Depends(get_routed_db)
+) -> Sequence[Row]:
+    """Sum LLM usage per organization and day (UTC), newest day first."""
+    until = until or datetime.now(timezone.utc).date()
+    since = since or until - timedelta(days=30)
+    if since > until:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="since is after until")
+
+    # Both the days and their bounds are UTC, not the session's TimeZone.
+    day = utc_date(LLMUsage.created_at)
+    query = (
+        select(
+            LLMUsage.organization_id,
+            day.label("day"),
+            func.count().label("calls"),
+            func.count().filter(LLMUsage.succeeded.is_(False)).label("failed_calls"),
+            func.count().filter(LLMUsage.cache_hit.is_(True)).label("cache_hits"),
+            func.coalesce(func.sum(LLMUsage.prompt_tokens), 0).label("prompt_tokens"),
+            func.coalesce(func.sum(LLMUsage.output_tokens), 0).label("output_tokens"),
+            func.coalesce(func.sum(LLMUsage.latency_ms), 0).label("latency_ms_total"),
+            func.avg(LLMUsage.latency_ms).label("latency_ms_avg"),
+        )
+        .where(
+            LLMUsage.created_at >= datetime.combine(since, time.min, timezone.utc),
+            LLMUsage.created_at < datetime.combine(until + timedelta(days=1), time.min, timezone.utc),
+        )
+        .group_by(LLMUsage.organization_id, day)
+        .order_by(day.desc(), LLMUsage.organization_id)
+    )
+    if organization_id:
+        query = query.where(LLMUsage.organization_id == organization_id)
+
+    result = await db.execute(query)
+    return result.all()
@@ -1,18 +1,66 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, status, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes.v1 import organization, gen_ai, grants
-from app.deps.gemini_service import GeminiService
+from app.api.routes.v1 import admin, applications, organization, gen_ai, grants, metrics
+from app.core.logs import RequestIdMiddleware, setup_logging
+from app.core.metrics import REGISTRY, MetricsMiddleware, PoolCollector
+from app.core.profiling import ProfilingMiddleware, profiling_allowed
+from app.core.responses import default_response_class
+from app.core.tracing import TracingMiddleware, instrument_engine, setup_tracing
+from app.db.session import engine, read_engine
+from app.deps.db_routing import ReadYourWritesMiddleware
+from app.services.export import export_cache
+from app.services.llm import warm_up_sdk
+from app.services.usage import usage_writer
 from app.settings import get_settings
 from app.utils import DbDependency
 from app.api.routes import auth
 from app.api.routes.auth import CurrentUser
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_listener = setup_logging()
+    # An embedded SQLite database has no separate deploy step to migrate it.
+    if engine.dialect.name == "sqlite":
+        from app.db.migrate import upgrade_database
+
+        await upgrade_database(engine)
+    usage_writer.start()
+    warm_up = asyncio.create_task(warm_up_sdk()) if settings.llm_warm_up_on_startup else None
+    try:
+        yield
+    finally:
+        if warm_up is not None:
+            await asyncio.gather(warm_up, return_exceptions=True)
+        await usage_writer.stop()
+        export_cache.shutdown()
+        # aiosqlite runs each connection on a worker thread that keeps the
+        # process alive until the pool is closed.
+        await engine.dispose()
+        if tracer_provider is not None:
+            tracer_provider.shutdown()
+        log_listener.stop()
+
+
+tracer_provider = setup_tracing()
+if tracer_provider is not None:
+    for traced_engine in (engine, read_engine):
+        if traced_engine is not None:
+            instrument_engine(traced_engine)
+
+
+app = FastAPI(default_response_class=default_response_class(), lifespan=lifespan)
 app.include_router(auth.router)
 app.include_router(organization.router)
 app.include_router(gen_ai.router)
 app.include_router(grants.router)
+app.include_router(applications.router)
+app.include_router(admin.router)
+app.include_router(metrics.router)
+
+REGISTRY.register(PoolCollector({"primary": engine, "replica": read_engine}))
 
 
 settings = get_settings()
@@ -24,7 +72,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Request-ID"],
 )
+if read_engine is not None:
+    app.add_middleware(ReadYourWritesMiddleware)
+if profiling_allowed():
+    app.add_middleware(ProfilingMiddleware)
+app.add_middleware(TracingMiddleware)
+# Wraps everything else and times the whole request.
+app.add_middleware(MetricsMiddleware)
+# Outermost, so every log record of a request carries its id.
+app.add_middleware(RequestIdMiddleware)
 
 
 @app.get("/")
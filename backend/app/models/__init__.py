@@ -1,3 +1,5 @@
 from app.models.user import User
 from app.models.organization import Organization
 from app.models.roles import Role, UserRole
+from app.models.application import GeneratedSection, GrantApplication, GrantApplicationVersion
+from app.models.usage import LLMUsage
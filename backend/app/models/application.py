@@ -0,0 +1,108 @@
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+import uuid
+from sqlalchemy import (
+    JSON,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    UniqueConstraint,
+    Uuid,
+)
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.db.functions import utcnow
+from app.models.base import Base, UUIDMixin, TimestampMixin
+
+if TYPE_CHECKING:
+    from app.models.organization import Organization
+
+
+class GrantApplication(Base, UUIDMixin, TimestampMixin):
+    __tablename__ = "grant_applications"
+    __table_args__ = (
+        Index(
+            "ix_grant_applications_organization_id_updated_at",
+            "organization_id",
+            "updated_at",
+            "id",
+        ),
+    )
+
+    organization_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid,
+        ForeignKey("organizations.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    title: Mapped[str] = mapped_column(String, nullable=False)
+    head_version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    latest_version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+
+    organization: Mapped["Organization"] = relationship("Organization")
+    versions: Mapped[list["GrantApplicationVersion"]] = relationship(
+        "GrantApplicationVersion",
+        back_populates="application",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+
+class GrantApplicationVersion(Base, UUIDMixin):
+    __tablename__ = "grant_application_versions"
+    __table_args__ = (
+        UniqueConstraint("application_id", "version"),
+    )
+
+    application_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid,
+        ForeignKey("grant_applications.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    parent_version: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    source: Mapped[str] = mapped_column(String, nullable=False)
+    input_hash: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+    model_name: Mapped[str | None] = mapped_column(String, nullable=True)
+    model_metadata: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False, default=dict)
+    encoding: Mapped[str] = mapped_column(String(8), nullable=False, default="full")
+    delta_depth: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    compression: Mapped[str] = mapped_column(String(16), nullable=False)
+    content: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    content_length: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=utcnow(),
+        nullable=False
+    )
+
+    application: Mapped["GrantApplication"] = relationship(
+        "GrantApplication", back_populates="versions"
+    )
+
+
+class GeneratedSection(Base):
+    """Text of one section as generated from the inputs hashed into `input_hash`.
+
+    See `app.services.sections`; a regeneration reuses it while the inputs
+    the section depends on are unchanged.
+    """
+
+    __tablename__ = "generated_sections"
+
+    organization_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid,
+        ForeignKey("organizations.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    input_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    section: Mapped[str] = mapped_column(String, nullable=False)
+    model_name: Mapped[str | None] = mapped_column(String, nullable=True)
+    compression: Mapped[str] = mapped_column(String(16), nullable=False)
+    content: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=utcnow(),
+        nullable=False
+    )
@@ -1,10 +1,10 @@
 from datetime import datetime
 import uuid
-from sqlalchemy.dialects.postgresql import UUID as pgUUID
+from sqlalchemy import Uuid
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from sqlalchemy.ext.declarative import declared_attr
-from sqlalchemy.sql import func
 from sqlalchemy.types import DateTime
+from app.db.functions import clock_utcnow, utcnow
 
 
 class Base(DeclarativeBase):
@@ -15,10 +15,9 @@ class UUIDMixin:
     @declared_attr
     def id(cls):
         return mapped_column(
-            pgUUID(as_uuid=True),
+            Uuid,
             primary_key=True,
             default=uuid.uuid4,
-            unique=True,
             nullable=False,
         )
 
@@ -26,12 +25,12 @@ class UUIDMixin:
 class TimestampMixin:
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
-        server_default=func.now(),
+        server_default=utcnow(),
         nullable=False
     )
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
-        server_default=func.now(),
-        onupdate=func.now(),
+        server_default=utcnow(),
+        onupdate=clock_utcnow(),
         nullable=False,
     )
@@ -1,5 +1,5 @@
 from typing import TYPE_CHECKING
-from sqlalchemy import String
+from sqlalchemy import Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import Base, UUIDMixin, TimestampMixin
 
@@ -9,6 +9,19 @@ if TYPE_CHECKING:
 
 class Organization(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "organizations"
+    __table_args__ = (
+        Index("ix_organizations_created_at_id", "created_at", "id"),
+        *(
+            Index(
+                f"ix_organizations_{column}_trgm",
+                column,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            )
+            for column in ("organization_name", "address", "contact_info")
+        ),
+    )
+
     organization_name: Mapped[str] = mapped_column(String, nullable=False)
     address: Mapped[str] = mapped_column(String, nullable=False)
     contact_info: Mapped[str] = mapped_column(String, nullable=False)
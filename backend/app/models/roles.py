@@ -5,10 +5,10 @@ from sqlalchemy import (
     DateTime,
     String,
     ForeignKey,
-    func,
+    Uuid,
 )
-from sqlalchemy.dialects.postgresql import UUID as pgUUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.db.functions import utcnow
 from app.models.base import Base, UUIDMixin
 
 if TYPE_CHECKING:
@@ -29,12 +29,12 @@ class Role(Base, UUIDMixin):
 class UserRole(Base):
     __tablename__ = "user_roles"
     user_id: Mapped[uuid.UUID] = mapped_column(
-        pgUUID(as_uuid=True), ForeignKey("users.id"), primary_key=True, nullable=False
+        Uuid, ForeignKey("users.id"), primary_key=True, nullable=False
     )
     role_id: Mapped[uuid.UUID] = mapped_column(
-        pgUUID(as_uuid=True), ForeignKey("roles.id"), primary_key=True, nullable=False
+        Uuid, ForeignKey("roles.id"), primary_key=True, nullable=False, index=True
     )
-    assigned_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=func.now())
+    assigned_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow())
 
     user: Mapped["User"] = relationship("User", back_populates="roles")
     role: Mapped["Role"] = relationship("Role", back_populates="user_roles")
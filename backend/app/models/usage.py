@@ -0,0 +1,33 @@
+from datetime import datetime
+import uuid
+from sqlalchemy import Boolean, DateTime, Index, Integer, String, Uuid
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.functions import utcnow
+from app.models.base import Base, UUIDMixin
+
+
+class LLMUsage(Base, UUIDMixin):
+    """One LLM call, written in batches by `app.services.usage.UsageWriter`."""
+
+    __tablename__ = "llm_usage"
+    __table_args__ = (
+        Index("ix_llm_usage_created_at", "created_at"),
+        Index("ix_llm_usage_organization_id_created_at", "organization_id", "created_at"),
+    )
+
+    # Not a foreign key: usage outlives the organization, and one deleted
+    # organization must not make a whole batch insert fail.
+    organization_id: Mapped[uuid.UUID | None] = mapped_column(Uuid, nullable=True)
+    service: Mapped[str] = mapped_column(String(32), nullable=False)
+    operation: Mapped[str] = mapped_column(String(64), nullable=False)
+    model_name: Mapped[str] = mapped_column(String, nullable=False)
+    prompt_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    output_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    latency_ms: Mapped[int] = mapped_column(Integer, nullable=False)
+    cache_hit: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    succeeded: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=utcnow(),
+        nullable=False
+    )
@@ -4,8 +4,8 @@ from app.models.base import TimestampMixin, UUIDMixin, Base
 from sqlalchemy import (
     String,
     ForeignKey,
+    Uuid,
 )
-from sqlalchemy.dialects.postgresql import UUID as pgUUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 # if TYPE_CHECKING:
@@ -16,9 +16,10 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 class User(Base, UUIDMixin, TimestampMixin):
     __tablename__ = "users"
     organization_id: Mapped[uuid.UUID] = mapped_column(
-        pgUUID(as_uuid=True),
+        Uuid,
         ForeignKey("organizations.id"),
-        nullable=True
+        nullable=True,
+        index=True
     )
     username: Mapped[str] = mapped_column(String, unique=True, nullable=False)
     hashed_password: Mapped[str] = mapped_column(String, nullable=False)
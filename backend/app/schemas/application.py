@@ -1,8 +1,69 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+from uuid import UUID
+from datetime import datetime
+from app.schemas.generation import CompanyInfo, SelectedTemplate
 
 
 # Data model for the edit request
 class ApplicationEditRequest(BaseModel):
-    original_text: str
+    original_text: Optional[str] = Field(
+        None,
+        description="Text to edit; omitted when editing a saved application, whose stored version is used"
+    )
     selected_text: str
     edit_instruction: str
+    base_version: Optional[int] = Field(
+        None,
+        description="Saved version to edit; defaults to the current head"
+    )
+
+
+class GrantApplicationSummary(BaseModel):
+    id: UUID
+    organization_id: UUID
+    title: str
+    head_version: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class GrantApplicationVersionMeta(BaseModel):
+    version: int
+    parent_version: Optional[int] = None
+    source: str
+    encoding: str
+    input_hash: Optional[str] = None
+    model_name: Optional[str] = None
+    model_metadata: dict[str, Any] = {}
+    content_length: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class GrantApplicationVersionRead(GrantApplicationVersionMeta):
+    application_id: UUID
+    content: str
+
+
+class GrantApplicationVersionCreate(BaseModel):
+    content: str = Field(description="Full markdown of the edited application")
+    parent_version: Optional[int] = Field(
+        None,
+        description="Version the edit was made on; defaults to the current head"
+    )
+
+
+class ApplicationRegenerateRequest(BaseModel):
+    companyInfo: CompanyInfo
+    selectedTemplate: SelectedTemplate = SelectedTemplate()
+    questionAnswers: Dict[str, str] = {}
+    base_version: Optional[int] = Field(
+        None,
+        description="Saved version to update; defaults to the current head"
+    )
@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+from typing import Any
+from uuid import UUID
+
+
+class BulkRowError(BaseModel):
+    index: int = Field(description="Zero-based position of the row in the request body")
+    id: UUID | None = None
+    detail: Any
+
+
+class BulkResult(BaseModel):
+    ids: list[UUID] = Field(default_factory=list, description="Ids of the rows that were written")
+    errors: list[BulkRowError] = Field(default_factory=list)
@@ -0,0 +1,31 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class OutlineSection(BaseModel):
+    title: str
+    key_points: List[str] = Field(default_factory=list)
+
+
+class TemplateOutline(BaseModel):
+    sections: List[OutlineSection]
+
+
+class CompanyInfo(BaseModel):
+    companyName: str
+    description: str
+    address: str = ""
+    email: str = ""
+    phone: str = ""
+    employeeCount: str = ""
+    annualRevenue: str = ""
+    industry: str = ""
+    website: str = ""
+
+
+class SelectedTemplate(BaseModel):
+    title: str = "SBIR Phase I"
+    agency: str = "NSF"
+    amount: str = "$275,000"
+    duration: str = "6-12 months"
+    category: str = "Technology Innovation"
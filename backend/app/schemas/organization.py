@@ -20,6 +20,10 @@ class OrganizationUpdate(BaseModel):
     contact_info: Optional[str] = None
 
 
+class OrganizationBulkUpdate(OrganizationUpdate):
+    id: UUID
+
+
 class OrganizationRead(OrganizationBase):
     id: UUID
     created_at: datetime
@@ -33,3 +37,7 @@ class ListOrganizationParams(BaseModel):
         None,
         description="Optional keyword to filter Organization"
     )
+    search_all_fields: bool = Field(
+        False,
+        description="Match the keyword against address and contact info as well as the name"
+    )
@@ -1,9 +1,34 @@
-from fastapi import Query
+import base64
+import json
+from typing import Any
+from fastapi import HTTPException, Query, status
 
 
-async def pagination(
-    skip: int = Query(0, ge=0),
+async def cursor_pagination(
+    cursor: str | None = Query(
+        None,
+        description="Opaque cursor taken from the `X-Next-Cursor` header of the previous page"
+    ),
     limit: int = Query(5, ge=0)
-) -> tuple[int, int]:
+) -> tuple[str | None, int]:
     capped_limit = min(100, limit)
-    return (skip, capped_limit)
+    return (cursor, capped_limit)
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row of a page into an opaque token."""
+    raw = json.dumps([str(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[str]:
+    """Decode a token produced by `encode_cursor` back into `size` values."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        values = None
+
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
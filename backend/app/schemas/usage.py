@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Optional
+from uuid import UUID
+from datetime import date
+
+
+class UsageRollup(BaseModel):
+    organization_id: Optional[UUID] = None
+    day: date
+    calls: int
+    failed_calls: int
+    cache_hits: int
+    prompt_tokens: int
+    output_tokens: int
+    latency_ms_total: int
+    latency_ms_avg: float
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,253 @@
+"""
+Export of generated applications to DOCX and PDF.
+
+Rendering is CPU-bound, so it runs in a process pool and never on the event
+loop. Rendered files are cached on disk under the SHA-256 of the format,
+renderer version and markdown, so exporting the same text again only costs
+a file read. Concurrent requests for the same export share one render.
+
+`render_docx` and `render_pdf` are module-level functions so the pool can
+pickle them.
+"""
+import asyncio
+import hashlib
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Callable
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Bump when rendering changes, so cached files are not served stale.
+RENDERER_VERSION = "1"
+
+# How often `ExportCache.open` renders again when its file was pruned first.
+OPEN_ATTEMPTS = 3
+
+MEDIA_TYPES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+}
+
+
+def _inline_runs(token) -> list[tuple[str, bool, bool, bool]]:
+    """Flatten an inline markdown token into (text, bold, italic, code) runs."""
+    runs = []
+    bold = italic = False
+    for child in token.children or []:
+        if child.type == "strong_open":
+            bold = True
+        elif child.type == "strong_close":
+            bold = False
+        elif child.type == "em_open":
+            italic = True
+        elif child.type == "em_close":
+            italic = False
+        elif child.type == "code_inline":
+            runs.append((child.content, bold, italic, True))
+        elif child.type in ("softbreak", "hardbreak"):
+            runs.append(("\n" if child.type == "hardbreak" else " ", bold, italic, False))
+        elif child.type == "text":
+            runs.append((child.content, bold, italic, False))
+    return runs
+
+
+def render_docx(markdown: str) -> bytes:
+    """Render markdown to a Word document.
+
+    Headings, paragraphs, bulleted and numbered lists, bold, italic, inline
+    and fenced code, and horizontal rules are kept.
+    """
+    from docx import Document
+    from markdown_it import MarkdownIt
+
+    document = Document()
+    lists: list[str] = []
+    paragraph_style = None
+
+    for token in MarkdownIt().parse(markdown):
+        if token.type == "heading_open":
+            paragraph_style = f"Heading {min(int(token.tag[1]), 9)}"
+        elif token.type == "bullet_list_open":
+            lists.append("List Bullet")
+        elif token.type == "ordered_list_open":
+            lists.append("List Number")
+        elif token.type in ("bullet_list_close", "ordered_list_close"):
+            lists.pop()
+        elif token.type == "inline":
+            style = paragraph_style
+            if style is None and lists:
+                depth = min(len(lists), 3)
+                style = lists[-1] if depth == 1 else f"{lists[-1]} {depth}"
+            paragraph = document.add_paragraph(style=style)
+            for text, bold, italic, code in _inline_runs(token):
+                run = paragraph.add_run(text)
+                run.bold = bold or None
+                run.italic = italic or None
+                if code:
+                    run.font.name = "Courier New"
+            paragraph_style = None
+        elif token.type in ("fence", "code_block"):
+            run = document.add_paragraph().add_run(token.content.rstrip("\n"))
+            run.font.name = "Courier New"
+        elif token.type == "hr":
+            document.add_page_break()
+
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def render_pdf(markdown: str) -> bytes:
+    """Render markdown to PDF through fpdf2's HTML support.
+
+    Uses the DejaVu fonts in `export_pdf_font_dir` when present, so any
+    Unicode text renders; otherwise falls back to the core Latin-1 fonts.
+    """
+    from fpdf import FPDF
+    from markdown_it import MarkdownIt
+
+    html = MarkdownIt().disable(["image", "html_block", "html_inline"]).render(markdown)
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+
+    font_dir = Path(settings.export_pdf_font_dir or "")
+    if (font_dir / "DejaVuSans.ttf").is_file() and (font_dir / "DejaVuSans-Bold.ttf").is_file():
+        regular, bold = font_dir / "DejaVuSans.ttf", font_dir / "DejaVuSans-Bold.ttf"
+        # There is no oblique face to register; italics render upright.
+        for style, path in (("", regular), ("B", bold), ("I", regular), ("BI", bold)):
+            pdf.add_font("DejaVu", style, str(path))
+        family, code_family = "DejaVu", "DejaVu"
+        if (font_dir / "DejaVuSansMono.ttf").is_file():
+            pdf.add_font("DejaVuMono", "", str(font_dir / "DejaVuSansMono.ttf"))
+            code_family = "DejaVuMono"
+    else:
+        family, code_family = "helvetica", "courier"
+        html = html.encode("latin-1", "replace").decode("latin-1")
+
+    pdf.add_page()
+    pdf.set_font(family, size=11)
+    pdf.write_html(html, font_family=family, pre_code_font=code_family, warn_on_tags_not_matching=False)
+    return bytes(pdf.output())
+
+
+RENDERERS: dict[str, Callable[[str], bytes]] = {"docx": render_docx, "pdf": render_pdf}
+
+
+def export_key(markdown: str, fmt: str) -> str:
+    """Cache key of an export: what is rendered, how, and into which format."""
+    digest = hashlib.sha256(f"{fmt}\0{RENDERER_VERSION}\0".encode())
+    digest.update(markdown.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ExportCache:
+    """Render exports in a process pool and keep the files on disk.
+
+    Files are named by `export_key`, written atomically, and pruned oldest
+    first once the directory grows past `max_bytes`. Since a file can be
+    pruned at any time by another export, serve it through `open`.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, workers: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self._pool: ProcessPoolExecutor | None = None
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def path(self, key: str, fmt: str) -> Path:
+        return self.directory / f"{key}.{fmt}"
+
+    async def get(self, markdown: str, fmt: str) -> tuple[Path, str]:
+        """Return the rendered file for `markdown` in `fmt`, rendering it if needed.
+
+        Returns:
+            The file path and its cache key, usable as an ETag
+        """
+        key = export_key(markdown, fmt)
+        path = self.path(key, fmt)
+        if path.is_file():
+            return path, key
+
+        # Rendering runs as its own task, shared by every request for this
+        # export; a request that goes away does not cancel it for the others.
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._render(path, markdown, fmt))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        await asyncio.shield(task)
+        return path, key
+
+    async def _render(self, path: Path, markdown: str, fmt: str) -> None:
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(self._executor(), RENDERERS[fmt], markdown)
+        await asyncio.to_thread(self._store, path, data)
+
+    def _finished(self, key: str, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Every waiter may have gone; don't warn about an unread exception.
+        if not task.cancelled():
+            task.exception()
+
+    async def open(self, markdown: str, fmt: str) -> tuple[BinaryIO, str]:
+        """Like `get`, but return the file opened for reading.
+
+        The open handle stays readable after the file is pruned, which a
+        path handed to the response does not.
+        """
+        for attempt in range(OPEN_ATTEMPTS):
+            path, key = await self.get(markdown, fmt)
+            try:
+                return path.open("rb"), key
+            except FileNotFoundError:
+                # Pruned by another export between rendering and opening.
+                if attempt == OPEN_ATTEMPTS - 1:
+                    raise
+
+    def _store(self, path: Path, data: bytes) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        self._prune(keep=path)
+
+    def _prune(self, keep: Path) -> None:
+        """Remove the oldest files beyond `max_bytes`, but never `keep`."""
+        files = []
+        for p in self.directory.iterdir():
+            if p.suffix not in (".docx", ".pdf") or p == keep:
+                continue
+            try:
+                files.append((p.stat(), p))
+            except FileNotFoundError:
+                continue  # pruned concurrently
+        total = sum(stat.st_size for stat, _ in files) + keep.stat().st_size
+        for stat, old in sorted(files, key=lambda f: f[0].st_mtime):
+            if total <= self.max_bytes:
+                break
+            total -= stat.st_size
+            old.unlink(missing_ok=True)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+
+export_cache = ExportCache(
+    settings.export_cache_dir,
+    max_bytes=settings.export_cache_max_bytes,
+    workers=settings.export_workers,
+)
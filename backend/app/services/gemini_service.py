@@ -4,14 +4,20 @@ Gemini AI Service for Grant Application Generation
 import os
 import logging
 from typing import Dict, Any, Optional
-import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
+from app.core.tracing import tracer
+from app.services.llm import ModelRouter, llm_call, model_tier
+from app.services.sections import section_key
 
 logger = logging.getLogger(__name__)
 
 class GeminiService:
     def __init__(self):
         """Initialize Gemini service with API key from environment."""
+        # The SDK takes most of a second to import; only pay for it once a
+        # service is actually needed.
+        import google.generativeai as genai
+        from google.generativeai.types import HarmCategory, HarmBlockThreshold
+
         self.api_key = os.getenv("GEMINI_API_KEY")
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY environment variable is required")
@@ -19,9 +25,9 @@ class GeminiService:
         # Configure Gemini API
         genai.configure(api_key=self.api_key)
         
-        # Initialize the model
-        self.model = genai.GenerativeModel(
-            model_name="gemini-1.5-pro-latest",
+        # Models are built per tier on first use; see `Settings.llm_routes`
+        self.router = ModelRouter(lambda model_name: genai.GenerativeModel(
+            model_name=model_name,
             generation_config={
                 "temperature": 0.7,
                 "top_p": 0.8,
@@ -34,7 +40,10 @@ class GeminiService:
                 HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
                 HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
             }
-        )
+        ))
+        # The model that answered the latest call, which may be the fallback
+        # tier's; starts as the one full generation is routed to.
+        self.model = self.router.model(model_tier("generate_application"))
     
     def build_prompt(self, base_prompt: str, company_data: Dict[str, Any]) -> str:
         """
@@ -100,7 +109,7 @@ class GeminiService:
             return complete_prompt
             
         except Exception as e:
-            logger.error(f"Error building prompt: {str(e)}")
+            logger.error("Error building prompt: %s", e)
             raise ValueError(f"Failed to build prompt: {str(e)}")
     
     async def generate_grant_application(
@@ -120,13 +129,14 @@ class GeminiService:
         """
         try:
             # Build the complete prompt
-            complete_prompt = self.build_prompt(base_prompt, company_data)
+            with tracer.start_as_current_span("gemini.build_prompt"):
+                complete_prompt = self.build_prompt(base_prompt, company_data)
             
             logger.info("Generating grant application with Gemini AI")
-            logger.debug(f"Prompt length: {len(complete_prompt)} characters")
+            logger.debug("Prompt length: %d characters", len(complete_prompt))
             
             # Generate content using Gemini
-            response = await self._generate_content_async(complete_prompt)
+            response = await self._generate_content_async(complete_prompt, "generate_application")
             
             if not response or not response.text:
                 raise ValueError("Empty response from Gemini API")
@@ -135,35 +145,138 @@ class GeminiService:
             return response.text.strip()
             
         except Exception as e:
-            logger.error(f"Error generating grant application: {str(e)}")
+            logger.error("Error generating grant application: %s", e)
             raise ValueError(f"Failed to generate grant application: {str(e)}")
     
-    async def _generate_content_async(self, prompt: str):
+    async def generate_section(
+        self,
+        base_prompt: str,
+        company_data: Dict[str, Any],
+        section: str,
+        length: str,
+        document: str
+    ) -> tuple[str, str]:
+        """
+        Rewrite one section of a generated application for changed inputs.
+
+        Args:
+            base_prompt: The base prompt template
+            company_data: Company information and form data
+            section: Title of the section, as listed in the prompt
+            length: Its expected length, e.g. "1 page"
+            document: The current application, so the section stays consistent with it
+
+        Returns:
+            The body of the section, without its heading, and the name of the
+            model that wrote it (sections written concurrently may differ)
+        """
+        with tracer.start_as_current_span("gemini.build_prompt"):
+            prompt = self.build_prompt(base_prompt, company_data) + f"""
+
+**CURRENT APPLICATION:**
+\"\"\"
+{document}
+\"\"\"
+
+**TASK:**
+Rewrite only the "{section}" section{f" ({length})" if length else ""} of the application above so that it reflects the company and project information given here. Keep it consistent with the other sections.
+
+Return only the body of the section in markdown, without its heading, explanations or extra comments.
+"""
+        try:
+            # Not through `_generate_content_async`: `self.model` only holds
+            # whichever of the concurrent calls answered last.
+            response, model = await self.router.generate(
+                prompt, service="grants", operation="regenerate_section"
+            )
+
+            if not response or not response.text:
+                raise ValueError("Empty response from Gemini API")
+
+            text = response.text.strip()
+            # Drop a heading the model added anyway; the document keeps its own.
+            first_line, _, rest = text.partition("\n")
+            if first_line.startswith("#") and section_key(first_line.lstrip("#")) == section_key(section):
+                text = rest.strip()
+            return text, model.model_name
+
+        except Exception as e:
+            logger.error("Error regenerating section %s: %s", section, e)
+            raise ValueError(f"Failed to regenerate section {section}: {str(e)}")
+
+    async def edit_text(
+        self,
+        original_text: str,
+        selected_text: str,
+        edit_instruction: str
+    ) -> str:
+        """
+        Rewrite a document so that an edit to one selected passage is applied
+        consistently, leaving unrelated parts unchanged.
+
+        Args:
+            original_text: The full document text
+            selected_text: The part of the document the user selected
+            edit_instruction: What the user wants changed
+
+        Returns:
+            The full updated document text
+        """
+        prompt = f"""
+You are an AI that edits grant application answers.
+
+Here is the original answer text:
+\"\"\"
+{original_text}
+\"\"\"
+
+The user selected this part to change:
+\"\"\"
+{selected_text}
+\"\"\"
+
+User instruction for the change:
+\"\"\"
+{edit_instruction}
+\"\"\"
+
+Please rewrite the entire answer text to reflect this change. Make sure to update all relevant mentions in the text (e.g., if a concept like 'innovation' is changed, replace all related references to keep the text cohesive).
+
+At the same time, keep all unrelated parts exactly as they are.
+
+Return only the full updated answer text without adding explanations or extra comments.
+"""
+        try:
+            response = await self._generate_content_async(prompt, "edit")
+
+            if not response or not response.text:
+                raise ValueError("Empty response from Gemini API")
+
+            return response.text.strip()
+
+        except Exception as e:
+            logger.error("Error editing text: %s", e)
+            raise ValueError(f"Failed to edit text: {str(e)}")
+
+    async def _generate_content_async(self, prompt: str, operation: str):
         """
         Generate content asynchronously using Gemini.
         
         Args:
             prompt: The complete prompt to send to Gemini
+            operation: What the call is for, used to label its metrics
             
         Returns:
             Gemini response object
         """
         try:
-            # Use the synchronous method but wrap it for async
-            # Note: google-generativeai doesn't have native async support yet
-            import asyncio
-            
-            def _sync_generate():
-                return self.model.generate_content(prompt)
-            
-            # Run in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, _sync_generate)
-            
+            # google-generativeai has no native async support; the call runs
+            # in a worker thread, on the model tier routed for `operation`.
+            response, self.model = await self.router.generate(prompt, service="grants", operation=operation)
             return response
             
         except Exception as e:
-            logger.error(f"Error in Gemini API call: {str(e)}")
+            logger.error("Error in Gemini API call: %s", e)
             raise
     
     def validate_api_key(self) -> bool:
@@ -175,8 +288,10 @@ class GeminiService:
         """
         try:
             # Simple test call
-            test_response = self.model.generate_content("Hello")
-            return bool(test_response and test_response.text)
+            model = self.router.model(model_tier("validate_key"))
+            with llm_call("grants", "validate_key", model) as call:
+                call.response = model.generate_content("Hello")
+            return bool(call.response and call.response.text)
         except Exception as e:
-            logger.error(f"API key validation failed: {str(e)}")
+            logger.error("API key validation failed: %s", e)
             return False
@@ -0,0 +1,289 @@
+"""
+Single entry point for LLM calls.
+
+Every Gemini request made by the services goes through `generate_content`
+(or `llm_call` for synchronous calls), which records latency, token usage,
+errors and retries in `app.core.metrics`, and appends each call to the
+per-organization usage ledger (`app.services.usage`). `ModelRouter` picks
+the model for each operation according to the routing policy in `Settings`.
+"""
+import asyncio
+import importlib
+import logging
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Iterator
+from app.core.metrics import (
+    LLM_FALLBACKS,
+    LLM_LATENCY,
+    LLM_OUTPUT_TOKENS,
+    LLM_PROMPT_TOKENS,
+    LLM_REQUESTS,
+    LLM_RETRIES,
+    LLM_TIER_LATENCY,
+)
+from app.core.tracing import start_executor_span, tracer
+from app.services.usage import usage_writer
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@lru_cache(maxsize=None)
+def transient_errors() -> tuple[type[Exception], ...]:
+    """Errors worth another attempt: rate limiting and provider-side failures.
+
+    Imported on first use; `google.api_core` pulls in grpc.
+    """
+    from google.api_core import exceptions as google_exceptions
+
+    return (
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.InternalServerError,
+        google_exceptions.DeadlineExceeded,
+    )
+
+
+async def warm_up_sdk() -> None:
+    """Import the Gemini SDK on a worker thread.
+
+    Started from the lifespan, so a fresh worker can serve requests at once,
+    and the first LLM request does not pay for the import.
+    """
+    started = time.perf_counter()
+    await asyncio.to_thread(importlib.import_module, "google.generativeai")
+    transient_errors()
+    logger.info("Gemini SDK loaded in %.0f ms", (time.perf_counter() - started) * 1000)
+
+
+class LLMCall:
+    """Handle for one instrumented call; set `response` so its token usage is recorded."""
+
+    __slots__ = ("response",)
+
+    def __init__(self):
+        self.response: Any = None
+
+
+def _model_name(model: Any) -> str:
+    return getattr(model, "model_name", None) or type(model).__name__
+
+
+@contextmanager
+def llm_call(service: str, operation: str, model: Any) -> Iterator[LLMCall]:
+    """Record latency, outcome and token usage of the LLM call made inside the block.
+
+    Args:
+        service: Which service makes the call, e.g. "grants"
+        operation: What the call is for, e.g. "generate"
+        model: The `GenerativeModel` used
+    """
+    labels = (service, operation, _model_name(model))
+    call = LLMCall()
+    start = time.perf_counter()
+    prompt_tokens = output_tokens = 0
+    succeeded = False
+    try:
+        yield call
+    except Exception:
+        LLM_REQUESTS.labels(*labels, "error").inc()
+        raise
+    else:
+        succeeded = True
+        LLM_REQUESTS.labels(*labels, "ok").inc()
+        usage = getattr(call.response, "usage_metadata", None)
+        if usage is not None:
+            prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+            output_tokens = getattr(usage, "candidates_token_count", 0) or 0
+            LLM_PROMPT_TOKENS.labels(*labels).inc(prompt_tokens)
+            LLM_OUTPUT_TOKENS.labels(*labels).inc(output_tokens)
+    finally:
+        elapsed = time.perf_counter() - start
+        LLM_LATENCY.labels(*labels).observe(elapsed)
+        usage_writer.record(
+            *labels,
+            latency_ms=round(elapsed * 1000),
+            prompt_tokens=prompt_tokens,
+            output_tokens=output_tokens,
+            succeeded=succeeded,
+        )
+
+
+async def generate_content(
+    model: Any,
+    contents: Any,
+    service: str,
+    operation: str,
+    **kwargs: Any,
+) -> Any:
+    """Call `model.generate_content` off the event loop, retrying transient errors.
+
+    Up to `llm_max_retries` retries are made with exponential backoff.
+
+    Args:
+        model: The `GenerativeModel` to call
+        contents: Prompt text or list of parts
+        service: Which service makes the call, for metrics
+        operation: What the call is for, for metrics
+        **kwargs: Passed through to `generate_content`
+
+    Returns:
+        The Gemini response
+    """
+    def run(submitted_ns: int) -> Any:
+        # Runs in the worker thread; to_thread copied the caller's context,
+        # so these spans nest under the caller's.
+        start_executor_span(submitted_ns)
+        with tracer.start_as_current_span("gemini.generate_content"):
+            return model.generate_content(contents, **kwargs)
+
+    with tracer.start_as_current_span("llm.generate_content") as span, \
+            llm_call(service, operation, model) as call:
+        span.set_attribute("llm.service", service)
+        span.set_attribute("llm.operation", operation)
+        span.set_attribute("llm.model", _model_name(model))
+        for attempt in range(settings.llm_max_retries + 1):
+            span.set_attribute("llm.attempts", attempt + 1)
+            try:
+                call.response = await asyncio.to_thread(run, time.time_ns())
+                break
+            except transient_errors() as e:
+                if attempt == settings.llm_max_retries:
+                    raise
+                LLM_RETRIES.labels(service, operation, _model_name(model)).inc()
+                delay = settings.llm_retry_backoff_seconds * 2 ** attempt
+                logger.warning("Transient LLM error (%s); retrying in %.1fs", e, delay)
+                await asyncio.sleep(delay)
+        usage = getattr(call.response, "usage_metadata", None)
+        if usage is not None:
+            span.set_attribute("llm.prompt_tokens", getattr(usage, "prompt_token_count", 0) or 0)
+            span.set_attribute("llm.output_tokens", getattr(usage, "candidates_token_count", 0) or 0)
+    return call.response
+
+
+# Calls that lost a fallback race. They are left to finish rather than
+# cancelled: the worker thread cannot be stopped anyway, and this way their
+# real token usage reaches the ledger.
+_abandoned: set[asyncio.Task] = set()
+
+
+def _forget_abandoned(task: asyncio.Task) -> None:
+    _abandoned.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.info("Abandoned LLM call failed: %s", task.exception())
+
+
+def model_tier(operation: str) -> str:
+    """The tier `llm_routes` assigns to `operation`."""
+    return settings.llm_routes.get(operation, settings.llm_default_tier)
+
+
+class ModelRouter:
+    """Route each operation to its model tier, falling back to `llm_fallback_tier`.
+
+    A call that still fails with a transient error after its retries is
+    sent to the fallback tier; any other error is raised as it is. Operations
+    listed in `llm_hedged_operations` are also hedged: when their call is
+    still running `llm_fallback_margin_seconds` before the deadline in
+    `llm_deadline_seconds`, the same request is started on the fallback tier
+    and the first successful answer wins. The other call is abandoned but
+    runs to completion in the background (its worker thread cannot be
+    stopped), so its usage is recorded and paid for. Latency per tier is
+    recorded in `llm_tier_request_duration_seconds`.
+
+    Models are built on first use by `make_model(model_name)`, so each
+    service keeps its own generation and safety settings.
+    """
+
+    def __init__(self, make_model: Callable[[str], Any]):
+        self._make_model = make_model
+        self._models: dict[str, Any] = {}
+
+    def model(self, tier: str) -> Any:
+        name = settings.llm_models[tier]
+        if name not in self._models:
+            self._models[name] = self._make_model(name)
+        return self._models[name]
+
+    async def _call(self, tier: str, contents: Any, service: str, operation: str, kwargs: dict) -> Any:
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await generate_content(self.model(tier), contents, service, operation, **kwargs)
+            outcome = "ok"
+            return response
+        except asyncio.CancelledError:
+            outcome = "abandoned"
+            raise
+        finally:
+            if asyncio.current_task() in _abandoned:
+                outcome = "abandoned"
+            LLM_TIER_LATENCY.labels(service, operation, tier, outcome).observe(time.perf_counter() - start)
+
+    async def generate(
+        self,
+        contents: Any,
+        service: str,
+        operation: str,
+        **kwargs: Any,
+    ) -> tuple[Any, Any]:
+        """Generate content for `operation` on its routed tier.
+
+        Args:
+            contents: Prompt text or list of parts
+            service: Which service makes the call, for metrics
+            operation: What the call is for; selects the tier and deadline
+            **kwargs: Passed through to `generate_content`
+
+        Returns:
+            The Gemini response and the model that produced it
+        """
+        tier = model_tier(operation)
+        fallback = settings.llm_fallback_tier
+        deadline = settings.llm_deadline_seconds.get(operation)
+        hedge_after = (
+            max(0.0, deadline - settings.llm_fallback_margin_seconds)
+            if deadline is not None and operation in settings.llm_hedged_operations
+            else None
+        )
+        tiers: dict[asyncio.Task, str] = {}
+
+        def start(t: str) -> asyncio.Task:
+            task = asyncio.create_task(self._call(t, contents, service, operation, kwargs))
+            tiers[task] = t
+            return task
+
+        pending = {start(tier)}
+        fell_back = fallback == tier
+        error: BaseException | None = None
+        try:
+            while True:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=None if fell_back else hedge_after,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result(), self.model(tiers[task])
+                    error = task.exception()
+
+                # Close to the deadline, or the primary tier still failing
+                # after its retries; other errors would fail there too.
+                if not fell_back and (not done or not pending and isinstance(error, transient_errors())):
+                    fell_back = True
+                    LLM_FALLBACKS.labels(service, operation, "failed" if done else "deadline").inc()
+                    logger.warning(
+                        "Falling back from %s to %s for %s (%s)",
+                        tier, fallback, operation, "error" if done else "deadline",
+                    )
+                    pending.add(start(fallback))
+                elif not pending:
+                    raise error
+        finally:
+            for task in pending:
+                _abandoned.add(task)
+                task.add_done_callback(_forget_abandoned)
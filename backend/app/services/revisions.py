@@ -0,0 +1,120 @@
+"""
+Revision store for saved grant applications.
+
+Each version is stored either in full or as a line delta against its parent
+version. A chain of deltas is cut with a full snapshot every
+`revision_snapshot_interval` versions, so rebuilding any version reads at most
+that many rows and applies at most that many deltas.
+"""
+import json
+from typing import Any
+from uuid import UUID
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.compression import compress_text, decompress_text
+from app.core.delta import apply_delta, make_delta
+from app.models.application import GrantApplication, GrantApplicationVersion
+from app.settings import get_settings
+
+settings = get_settings()
+
+
+def new_version(
+    application: GrantApplication,
+    version: int,
+    content: str,
+    source: str,
+    parent: tuple[GrantApplicationVersion, str] | None = None,
+    input_hash: str | None = None,
+    model_name: str | None = None,
+    model_metadata: dict[str, Any] | None = None,
+) -> GrantApplicationVersion:
+    """Build a version row, delta-encoded against `parent` when that pays off.
+
+    Args:
+        parent: The parent version row and its full text, if there is one
+
+    Returns:
+        The unsaved `GrantApplicationVersion`
+    """
+    encoding, depth, payload = "full", 0, content
+    if parent is not None:
+        parent_row, parent_text = parent
+        if parent_row.delta_depth + 1 < settings.revision_snapshot_interval:
+            delta = json.dumps(make_delta(parent_text, content), separators=(",", ":"))
+            if len(delta) < len(content):
+                encoding, depth, payload = "delta", parent_row.delta_depth + 1, delta
+
+    codec, data = compress_text(payload)
+    return GrantApplicationVersion(
+        application=application,
+        version=version,
+        parent_version=parent[0].version if parent else None,
+        source=source,
+        input_hash=input_hash,
+        model_name=model_name,
+        model_metadata=model_metadata or {},
+        encoding=encoding,
+        delta_depth=depth,
+        compression=codec,
+        content=data,
+        content_length=len(content),
+    )
+
+
+async def load_version(
+    db: AsyncSession,
+    application_id: UUID,
+    version: int | None = None,
+) -> tuple[GrantApplicationVersion, str] | None:
+    """Load a version row and rebuild its text, or the head version if `version` is None.
+
+    The row and every ancestor up to the nearest full snapshot are fetched with
+    one recursive query.
+
+    Returns:
+        The version row and its full text, or None when it does not exist
+    """
+    V = GrantApplicationVersion
+    target = version
+    if target is None:
+        target = (
+            select(GrantApplication.head_version)
+            .where(GrantApplication.id == application_id)
+            .scalar_subquery()
+        )
+
+    chain = (
+        select(V.id, V.parent_version, V.encoding)
+        .where(V.application_id == application_id, V.version == target)
+        .cte("revision_chain", recursive=True)
+    )
+    parent = V.__table__.alias("parent")
+    chain = chain.union_all(
+        select(parent.c.id, parent.c.parent_version, parent.c.encoding).join(
+            chain,
+            and_(
+                parent.c.application_id == application_id,
+                parent.c.version == chain.c.parent_version,
+                chain.c.encoding == "delta",
+            ),
+        )
+    )
+
+    result = await db.execute(select(V).join(chain, V.id == chain.c.id))
+    rows = {row.version: row for row in result.scalars().all()}
+    if not rows:
+        return None
+
+    # The target is the one row nobody else in the chain points at as parent.
+    parents = {row.parent_version for row in rows.values()}
+    head = next(row for row in rows.values() if row.version not in parents)
+
+    lineage = [head]
+    while lineage[-1].encoding == "delta":
+        lineage.append(rows[lineage[-1].parent_version])
+
+    text = decompress_text(lineage[-1].compression, lineage[-1].content)
+    for row in reversed(lineage[:-1]):
+        text = apply_delta(text, json.loads(decompress_text(row.compression, row.content)))
+    return head, text
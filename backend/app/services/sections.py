@@ -0,0 +1,239 @@
+"""
+Sections of a generated application and the inputs each one is written from.
+
+The section list comes from the "REQUIRED SECTIONS" of prompt.txt.
+`SECTION_INPUTS` maps each section to the request fields it depends on, as
+patterns over flattened field paths such as `companyInfo.industry` or
+`questionAnswers.targetMarket`. A section's input hash covers only those
+fields (and the prompt), so when one answer changes, only the sections that
+depend on it are regenerated; `split_sections` and `splice_sections` swap
+them into the stored document.
+"""
+import hashlib
+import json
+import re
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Any, NamedTuple
+
+PROMPT_PATH = Path(__file__).parents[2] / "prompt.txt"
+
+_CORE = ("companyinfo.companyname", "companyinfo.description", "companyinfo.industry")
+
+# Patterns are matched case-insensitively against flattened field paths.
+# Sections missing from this map depend on every field.
+SECTION_INPUTS: dict[str, tuple[str, ...]] = {
+    "abstract": _CORE + ("selectedtemplate.*", "questionanswers.*"),
+    "project description": _CORE + (
+        "selectedtemplate.title", "selectedtemplate.category",
+        "questionanswers.*problem*", "questionanswers.*innovation*", "questionanswers.*solution*",
+        "questionanswers.*product*", "questionanswers.*project*", "questionanswers.*technolog*",
+    ),
+    "technical approach & methodology": (
+        "companyinfo.description", "companyinfo.industry",
+        "questionanswers.*technolog*", "questionanswers.*technical*", "questionanswers.*approach*",
+        "questionanswers.*method*", "questionanswers.*innovation*", "questionanswers.*solution*",
+    ),
+    "commercialization plan": (
+        "companyinfo.companyname", "companyinfo.industry", "companyinfo.annualrevenue",
+        "questionanswers.*market*", "questionanswers.*customer*", "questionanswers.*commerciali*",
+        "questionanswers.*competi*", "questionanswers.*revenue*", "questionanswers.*business*",
+    ),
+    "management team": (
+        "companyinfo.companyname", "companyinfo.employeecount", "companyinfo.address",
+        "companyinfo.email", "companyinfo.phone", "companyinfo.website",
+        "questionanswers.*team*", "questionanswers.*founder*", "questionanswers.*personnel*",
+        "questionanswers.*experience*",
+    ),
+    "budget & financial projections": (
+        "companyinfo.annualrevenue", "companyinfo.employeecount",
+        "selectedtemplate.amount", "selectedtemplate.duration",
+        "questionanswers.*budget*", "questionanswers.*fund*", "questionanswers.*financ*",
+        "questionanswers.*cost*", "questionanswers.*revenue*",
+    ),
+    "risk assessment": (
+        "companyinfo.description",
+        "questionanswers.*risk*", "questionanswers.*challenge*", "questionanswers.*technolog*",
+        "questionanswers.*technical*", "questionanswers.*competi*",
+    ),
+    "broader impacts": (
+        "companyinfo.description", "companyinfo.industry", "selectedtemplate.category",
+        "questionanswers.*impact*", "questionanswers.*benefit*", "questionanswers.*societ*",
+        "questionanswers.*problem*",
+    ),
+    "timeline & milestones": (
+        "selectedtemplate.duration",
+        "questionanswers.*timeline*", "questionanswers.*milestone*", "questionanswers.*schedule*",
+        "questionanswers.*approach*",
+    ),
+    "conclusion": _CORE + ("selectedtemplate.*", "questionanswers.*"),
+    "bibliography": (
+        "companyinfo.industry", "selectedtemplate.category",
+        "questionanswers.*technolog*", "questionanswers.*market*",
+    ),
+}
+# Answers no section names specifically still have to be written somewhere.
+UNMATCHED_ANSWERS_SECTION = "project description"
+
+_SECTION_LINE = re.compile(r"^\s*\d+\.\s+(?P<title>.+?)\s*(?:\((?P<length>[^)]*)\))?\s*$")
+_HEADING = re.compile(r"^(?P<level>#{1,6})[ \t]+(?P<title>.+?)[ \t#]*$", re.MULTILINE)
+
+
+class PromptSection(NamedTuple):
+    title: str
+    length: str
+
+
+class SectionSpan(NamedTuple):
+    """Where a section sits in a document: its heading, then its body up to `end`."""
+    heading_start: int
+    body_start: int
+    end: int
+
+
+def section_key(title: str) -> str:
+    """Normalize a section or heading title so the two can be compared."""
+    title = re.sub(r"[*_`]", "", title).lower().replace(" and ", " & ")
+    title = re.sub(r"^(section\s+)?([0-9]+|[ivx]+)[.):]\s*", "", title.strip())
+    return re.sub(r"\s+", " ", title).strip(" :.")
+
+
+def prompt_sections(base_prompt: str) -> list[PromptSection]:
+    """The numbered list under "REQUIRED SECTIONS" in the prompt, in order."""
+    sections = []
+    in_list = False
+    for line in base_prompt.splitlines():
+        if "REQUIRED SECTIONS" in line:
+            in_list = True
+            continue
+        if in_list:
+            match = _SECTION_LINE.match(line)
+            if match:
+                sections.append(PromptSection(match["title"], match["length"] or ""))
+            elif sections:
+                break
+    return sections
+
+
+def flatten_inputs(company_data: dict[str, Any]) -> dict[str, str]:
+    """Flatten a generation request into `{"group.field": value}`, dropping blank values."""
+    fields = {}
+    for group in ("companyInfo", "selectedTemplate", "questionAnswers"):
+        for name, value in (company_data.get(group) or {}).items():
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value, sort_keys=True, default=str)
+            value = str(value).strip() if value is not None else ""
+            if value:
+                fields[f"{group}.{name}"] = value
+    return fields
+
+
+def _matches(path: str, patterns: tuple[str, ...], catch_all: bool) -> bool:
+    path = path.lower()
+    return any(
+        fnmatchcase(path, pattern)
+        for pattern in patterns
+        if catch_all or not pattern.endswith(".*")
+    )
+
+
+def section_inputs(sections: list[PromptSection], company_data: dict[str, Any]) -> dict[str, dict[str, str]]:
+    """The input fields each section depends on, with their values.
+
+    Returns:
+        `{section title: {field path: value}}`
+    """
+    fields = flatten_inputs(company_data)
+    inputs: dict[str, dict[str, str]] = {section.title: {} for section in sections}
+    titles = {section_key(section.title): section.title for section in sections}
+    for path, value in fields.items():
+        specific = False
+        for key, title in titles.items():
+            patterns = SECTION_INPUTS.get(key)
+            if patterns is None or _matches(path, patterns, catch_all=True):
+                inputs[title][path] = value
+                specific |= patterns is not None and _matches(path, patterns, catch_all=False)
+        if path.startswith("questionAnswers.") and not specific and UNMATCHED_ANSWERS_SECTION in titles:
+            inputs[titles[UNMATCHED_ANSWERS_SECTION]][path] = value
+    return inputs
+
+
+def section_hashes(base_prompt: str, company_data: dict[str, Any]) -> dict[str, str]:
+    """SHA-256 of each section's inputs, plus the prompt they are written with.
+
+    Returns:
+        `{section title: input hash}`, in prompt order
+    """
+    prompt_hash = hashlib.sha256(base_prompt.encode("utf-8")).hexdigest()
+    return {
+        title: hashlib.sha256(json.dumps(
+            {"section": title, "prompt": prompt_hash, "inputs": fields},
+            sort_keys=True,
+            separators=(",", ":"),
+        ).encode("utf-8")).hexdigest()
+        for title, fields in section_inputs(prompt_sections(base_prompt), company_data).items()
+    }
+
+
+def split_sections(document: str, titles: list[str]) -> dict[str, SectionSpan]:
+    """Find each section of `document` by its heading.
+
+    A section runs from its heading to the next heading of the same or a
+    higher level. Headings may be numbered and use "and" for "&". Sections
+    without a heading are left out.
+    """
+    wanted = {section_key(title): title for title in titles}
+    headings = list(_HEADING.finditer(document))
+    spans = {}
+    for i, heading in enumerate(headings):
+        key = section_key(heading["title"])
+        title = next((t for k, t in wanted.items() if key == k or key.startswith(k + " ")), None)
+        if title is None or title in spans:
+            continue
+        level = len(heading["level"])
+        end = next(
+            (h.start() for h in headings[i + 1:] if len(h["level"]) <= level),
+            len(document),
+        )
+        body_start = min(heading.end() + 1, len(document))
+        spans[title] = SectionSpan(heading.start(), body_start, end)
+    return spans
+
+
+def section_bodies(document: str, titles: list[str]) -> dict[str, str]:
+    """The body text of each section found in `document`, without its heading."""
+    return {
+        title: document[span.body_start:span.end].strip()
+        for title, span in split_sections(document, titles).items()
+    }
+
+
+def splice_sections(document: str, titles: list[str], bodies: dict[str, str]) -> str:
+    """Replace the bodies of the sections in `bodies`, keeping their headings.
+
+    A section missing from the document is added under a new heading, before
+    the next section in `titles` that is present, or at the end.
+    """
+    spans = split_sections(document, titles)
+    edits: list[tuple[int, int, int, str]] = []
+    appended = []
+    for i, title in enumerate(titles):
+        if title not in bodies:
+            continue
+        body = bodies[title].strip()
+        if title in spans:
+            span = spans[title]
+            tail = "\n" if span.end == len(document) else "\n\n"
+            edits.append((span.body_start, i, span.end, f"\n{body}{tail}"))
+            continue
+        before = next((spans[t].heading_start for t in titles[i + 1:] if t in spans), None)
+        if before is None:
+            appended.append(f"## {title}\n\n{body}\n")
+        else:
+            edits.append((before, i, before, f"## {title}\n\n{body}\n\n"))
+    # Right to left, so earlier offsets stay valid.
+    for start, _, end, text in sorted(edits, reverse=True):
+        document = document[:start] + text + document[end:]
+    if appended:
+        document = "\n\n".join(([document.rstrip("\n")] if document.strip() else []) + appended)
+    return document
@@ -0,0 +1,135 @@
+"""
+Per-organization LLM usage ledger.
+
+`llm_call` hands every finished call to `usage_writer`, which queues it and
+inserts queued records in batches from a background task, so requests never
+wait on the ledger. The organization is taken from `usage_scope`, set by
+whoever knows which organization a call is made for.
+"""
+import asyncio
+import contextvars
+import logging
+from contextlib import contextmanager
+from typing import Any, Iterator
+from uuid import UUID
+from sqlalchemy import insert
+from app.db.session import AsyncSessionLocal
+from app.models.usage import LLMUsage
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_organization: contextvars.ContextVar[UUID | None] = contextvars.ContextVar(
+    "usage_organization", default=None
+)
+
+
+@contextmanager
+def usage_scope(organization_id: UUID | None) -> Iterator[None]:
+    """Attribute LLM calls made inside the block to `organization_id`."""
+    token = _organization.set(organization_id)
+    try:
+        yield
+    finally:
+        _organization.reset(token)
+
+
+class UsageWriter:
+    """Buffer usage records in memory and insert them in batches.
+
+    Records are dropped, with a warning, when the buffer is full: losing some
+    accounting is better than slowing down or failing the requests being
+    accounted for.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, max_queued: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=max_queued)
+        self._batch_ready = asyncio.Event()
+        self._stopping = False
+        self._task: asyncio.Task | None = None
+        self.dropped = 0
+
+    def record(
+        self,
+        service: str,
+        operation: str,
+        model_name: str,
+        latency_ms: int,
+        prompt_tokens: int = 0,
+        output_tokens: int = 0,
+        cache_hit: bool = False,
+        succeeded: bool = True,
+    ) -> None:
+        """Queue one usage record for the organization in the current `usage_scope`."""
+        try:
+            self._queue.put_nowait({
+                "organization_id": _organization.get(),
+                "service": service,
+                "operation": operation,
+                "model_name": model_name,
+                "latency_ms": latency_ms,
+                "prompt_tokens": prompt_tokens,
+                "output_tokens": output_tokens,
+                "cache_hit": cache_hit,
+                "succeeded": succeeded,
+            })
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning("Usage buffer full; %d records dropped so far", self.dropped)
+            return
+        if self._queue.qsize() >= self.batch_size:
+            self._batch_ready.set()
+
+    async def flush(self) -> int:
+        """Insert everything queued so far.
+
+        Returns:
+            Number of records written
+        """
+        written = 0
+        while not self._queue.empty():
+            batch = [self._queue.get_nowait() for _ in range(min(self.batch_size, self._queue.qsize()))]
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(insert(LLMUsage), batch)
+                    await db.commit()
+            except Exception as e:
+                logger.error("Failed to write %d usage records: %s", len(batch), e)
+                continue
+            written += len(batch)
+        return written
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            # Flush as soon as a batch is full, or every `flush_interval`.
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task and write out what is still queued."""
+        if self._task is not None:
+            self._stopping = True
+            self._batch_ready.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+
+usage_writer = UsageWriter(
+    batch_size=settings.usage_batch_size,
+    flush_interval=settings.usage_flush_interval_seconds,
+    max_queued=settings.usage_max_queued,
+)
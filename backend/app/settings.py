@@ -21,9 +21,105 @@ class Settings(BaseSettings):
     cors_origins: list[str] = ["*"]
     env_name: str
     db_url: str
+    bulk_batch_size: int = 1000
+
+    # Application revisions: every Nth revision in a chain is a full snapshot
+    revision_snapshot_interval: int = 10
+
+    # Serialize responses with orjson when it is installed
+    fast_json_responses: bool = True
+
+    # Logging: JSON lines on stdout, written by a background thread
+    log_level: str = "INFO"
+    log_json: bool = True
+
+    # Users holding this role (see the roles table) may use the /admin routes
+    admin_role: str = "admin"
+
+    # Tracing: console, file, otlp, none or "module:factory"
+    tracing_exporter: str = "none"
+    tracing_file: str = "traces.jsonl"
+    tracing_service_name: str = "grant-api"
+    tracing_sample_ratio: float = 1.0
+
+    # Per-request profiling; never enabled when env_name is "production".
+    # Profiles requests sending `profiling_header`, and a random fraction.
+    profiling_enabled: bool = False
+    profiling_profiler: str = "cprofile"
+    profiling_header: str = "X-Profile"
+    profiling_sample_ratio: float = 0.0
+    profiling_dir: str = "profiles"
+
+    # Database connection pool
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100
+
+    # Statement timing: slow statements are logged (and optionally EXPLAINed),
+    # per-statement totals are served by GET /admin/db/queries
+    db_slow_query_ms: float = 200.0
+    db_slow_query_explain: bool = False
+    db_query_stats_max_statements: int = 500
+
+    # Optional read replica for safe (GET) requests
+    db_read_url: str | None = None
+    db_read_your_writes_seconds: float = 5.0
 
     # llm key
     gemini_api_key: str
+    llm_max_retries: int = 2
+    llm_retry_backoff_seconds: float = 1.0
+    # Model routing: tier -> model name, operation -> tier. Calls failing
+    # with transient errors fall back to `llm_fallback_tier`. For operations
+    # in `llm_hedged_operations`, a call still running
+    # `llm_fallback_margin_seconds` before its deadline is also sent there,
+    # and the first answer wins; the other call is still paid for.
+    llm_models: dict[str, str] = {
+        "pro": "gemini-1.5-pro-latest",
+        "flash": "gemini-1.5-flash-latest",
+    }
+    llm_routes: dict[str, str] = {
+        "generate_application": "pro",
+        "generate_template": "pro",
+        "generate_outline": "flash",
+        "expand_section": "pro",
+        "regenerate_section": "pro",
+        "edit": "flash",
+        "validate_key": "flash",
+    }
+    llm_default_tier: str = "pro"
+    llm_fallback_tier: str = "flash"
+    llm_deadline_seconds: dict[str, float] = {
+        "generate_application": 90.0,
+        "generate_template": 120.0,
+        "expand_section": 60.0,
+        "regenerate_section": 60.0,
+    }
+    llm_fallback_margin_seconds: float = 30.0
+    # Hedging is opt-in: it can pay for one request twice
+    llm_hedged_operations: set[str] = set()
+    # Outline-first template generation
+    outline_max_sections: int = 12
+    outline_max_parallel_sections: int = 6
+    # Incremental regeneration of a saved draft's sections
+    regenerate_max_parallel_sections: int = 4
+
+    # DOCX/PDF export: rendered in a process pool, cached on disk by content hash
+    export_workers: int = 2
+    export_cache_dir: str = "exports"
+    export_cache_max_bytes: int = 512 * 1024 * 1024
+    export_pdf_font_dir: str = "/usr/share/fonts/truetype/dejavu"
+
+    # Import the Gemini SDK in the background after startup instead of on the first request
+    llm_warm_up_on_startup: bool = True
+
+    # LLM usage ledger, written in batches off the request path
+    usage_batch_size: int = 200
+    usage_flush_interval_seconds: float = 5.0
+    usage_max_queued: int = 10_000
 
     # JWT Settings
     secret_key: str
@@ -31,6 +127,13 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int
     refresh_token_expire_days: int
 
+    # Login throttling
+    login_rate_limit_per_username: int = 5
+    login_rate_limit_per_ip: int = 20
+    login_rate_limit_window_seconds: int = 60
+    login_rate_limit_max_keys: int = 100_000
+    rate_limit_redis_url: str | None = None
+
     test_db_url: str | None = None
 
     model_config = SettingsConfigDict(env_file=f"{get_env_file()}")
@@ -0,0 +1,131 @@
+"""
+Benchmark the schema change made by the index hygiene migration.
+
+Builds two throwaway copies of the organizations/users tables in their own
+schemas, one with the redundant `UNIQUE (id)` constraints and no index on
+`users.organization_id`, one with the cleaned up layout, and times:
+
+- inserting organizations and users
+- looking up the users of one organization (the join side of the FK)
+- deleting organizations, which makes Postgres check `users` for references
+
+Usage:
+    python -m benchmarks.index_hygiene --orgs 20000 --users 200000
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.settings import get_settings
+
+
+LAYOUTS = {
+    "before": {
+        "constraints": "UNIQUE (id)",
+        "fk_index": False,
+    },
+    "after": {
+        "constraints": "",
+        "fk_index": True,
+    },
+}
+
+
+async def build(conn: AsyncConnection, schema: str, constraints: str, fk_index: bool) -> None:
+    await conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+    await conn.execute(text(f"CREATE SCHEMA {schema}"))
+    await conn.execute(text(
+        f"CREATE TABLE {schema}.organizations ("
+        f"id uuid PRIMARY KEY, organization_name varchar NOT NULL)"
+    ))
+    await conn.execute(text(
+        f"CREATE TABLE {schema}.users ("
+        f"id uuid PRIMARY KEY, username varchar NOT NULL, "
+        f"organization_id uuid REFERENCES {schema}.organizations (id))"
+    ))
+    if constraints:
+        # Added separately: inside CREATE TABLE Postgres would drop the duplicate.
+        await conn.execute(text(f"ALTER TABLE {schema}.organizations ADD {constraints}"))
+        await conn.execute(text(f"ALTER TABLE {schema}.users ADD {constraints}"))
+    if fk_index:
+        await conn.execute(text(f"CREATE INDEX ON {schema}.users (organization_id)"))
+
+
+async def timed(conn: AsyncConnection, sql: str, params: dict | None = None) -> float:
+    start = time.perf_counter()
+    await conn.execute(text(sql), params or {})
+    return time.perf_counter() - start
+
+
+async def run_layout(conn: AsyncConnection, name: str, orgs: int, users: int, lookups: int) -> dict:
+    schema = f"bench_index_{name}"
+    await build(conn, schema, **LAYOUTS[name])
+
+    results = {}
+    results["insert orgs"] = await timed(
+        conn,
+        f"INSERT INTO {schema}.organizations "
+        f"SELECT gen_random_uuid(), 'org ' || i FROM generate_series(1, :n) i",
+        {"n": orgs},
+    )
+    results["insert users"] = await timed(
+        conn,
+        f"INSERT INTO {schema}.users "
+        f"SELECT gen_random_uuid(), 'user ' || i, o.id "
+        f"FROM generate_series(1, :n) i "
+        f"JOIN (SELECT id, row_number() OVER () - 1 AS rn FROM {schema}.organizations) o "
+        f"ON o.rn = i % :orgs",
+        {"n": users, "orgs": orgs},
+    )
+    await conn.execute(text(f"ANALYZE {schema}.organizations"))
+    await conn.execute(text(f"ANALYZE {schema}.users"))
+
+    sample = (await conn.execute(text(
+        f"SELECT id FROM {schema}.organizations ORDER BY random() LIMIT :n"
+    ), {"n": lookups})).scalars().all()
+
+    start = time.perf_counter()
+    for org_id in sample:
+        await conn.execute(text(
+            f"SELECT count(*) FROM {schema}.organizations o "
+            f"JOIN {schema}.users u ON u.organization_id = o.id WHERE o.id = :id"
+        ), {"id": org_id})
+    results[f"{lookups} joins"] = time.perf_counter() - start
+
+    # Detach the sampled organizations' users so the deletes succeed; the FK
+    # check still has to look for referencing rows.
+    await conn.execute(text(
+        f"UPDATE {schema}.users SET organization_id = NULL WHERE organization_id = ANY(:ids)"
+    ), {"ids": list(sample)})
+    results[f"delete {lookups} orgs"] = await timed(
+        conn, f"DELETE FROM {schema}.organizations WHERE id = ANY(:ids)", {"ids": list(sample)}
+    )
+
+    await conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+    return results
+
+
+async def main(orgs: int, users: int, lookups: int) -> None:
+    engine = create_async_engine(get_settings().db_url)
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        before = await run_layout(conn, "before", orgs, users, lookups)
+        after = await run_layout(conn, "after", orgs, users, lookups)
+    await engine.dispose()
+
+    print(f"{'step':<20}{'before (s)':>12}{'after (s)':>12}{'speedup':>10}")
+    for step in before:
+        speedup = before[step] / after[step] if after[step] else float("inf")
+        print(f"{step:<20}{before[step]:>12.3f}{after[step]:>12.3f}{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orgs", type=int, default=20_000)
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.orgs, args.users, args.lookups))
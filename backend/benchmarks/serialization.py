@@ -0,0 +1,119 @@
+"""
+Benchmark the fast JSON response path against FastAPI's default one.
+
+Serves the same payloads from two minimal apps, one with FastAPI defaults
+(`response_model` validation and the stdlib JSON encoder) and one using
+`ORJSONResponse` and `trusted_response`, and reports CPU time per response
+for:
+
+- a page of organization ORM rows
+- a generation response carrying a large markdown body
+
+No database is needed; the rows are transient ORM instances.
+
+Usage:
+    python -m benchmarks.serialization --rows 100 --markdown-kb 50 --requests 500
+"""
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import List
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+
+from app.api.routes.v1.grants import GrantApplicationResponse
+from app.core.responses import trusted_response
+from app.models.organization import Organization
+from app.schemas.organization import OrganizationRead
+
+
+def organizations(count: int) -> list[Organization]:
+    now = datetime.now(timezone.utc)
+    return [
+        Organization(
+            id=uuid.uuid4(),
+            organization_name=f"Organization {i}",
+            address=f"{i} Main Street, Springfield",
+            contact_info=f"contact{i}@example.org",
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def markdown(kilobytes: int) -> str:
+    paragraph = (
+        "## Technical Objectives\n\nThe project will develop a \"novel\" approach to "
+        "grid-scale storage, with milestones tracked quarterly.\n\n"
+    )
+    return paragraph * (kilobytes * 1024 // len(paragraph) + 1)
+
+
+def build_apps(rows: list[Organization], body: str) -> dict[str, FastAPI]:
+    def generation() -> GrantApplicationResponse:
+        return GrantApplicationResponse(
+            status="success", generated_application=body, message="ok", version=1
+        )
+
+    default = FastAPI()
+
+    @default.get("/organizations", response_model=List[OrganizationRead])
+    async def default_orgs():
+        return rows
+
+    @default.get("/generation", response_model=GrantApplicationResponse)
+    async def default_generation():
+        return generation()
+
+    fast = FastAPI(default_response_class=ORJSONResponse)
+
+    @fast.get("/organizations", response_model=List[OrganizationRead])
+    async def fast_orgs():
+        return trusted_response(List[OrganizationRead], rows)
+
+    @fast.get("/generation", response_model=GrantApplicationResponse)
+    async def fast_generation():
+        return trusted_response(GrantApplicationResponse, generation())
+
+    return {"default": default, "fast": fast}
+
+
+async def cpu_per_response(app: FastAPI, path: str, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(10):
+            await client.get(path)
+        start = time.process_time()
+        for _ in range(requests):
+            response = await client.get(path)
+            response.raise_for_status()
+        return (time.process_time() - start) / requests
+
+
+async def main(rows: int, markdown_kb: int, requests: int) -> None:
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    apps = build_apps(organizations(rows), markdown(markdown_kb))
+
+    print(f"{'endpoint':<16}{'default (ms)':>14}{'fast (ms)':>12}{'saved (ms)':>12}")
+    for path in ("/organizations", "/generation"):
+        default = await cpu_per_response(apps["default"], path, requests)
+        fast = await cpu_per_response(apps["fast"], path, requests)
+        print(
+            f"{path:<16}{default * 1000:>14.3f}{fast * 1000:>12.3f}"
+            f"{(default - fast) * 1000:>12.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--markdown-kb", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.markdown_kb, args.requests))
@@ -0,0 +1,87 @@
+"""
+Measure how long a fresh worker takes to import the app.
+
+Runs `python -X importtime -c "import app.main"` in new interpreters and
+reports:
+- the total import time of `app.main`
+- the slowest modules by cumulative time
+- the import time of each `app.*` module
+
+Every run starts from scratch, so the numbers are cold-start numbers
+(modulo the OS file cache). The median of `--runs` runs is reported.
+
+With `--budget-ms`, the exit status is 1 when `app.main` takes longer than
+the budget, so CI can catch cold-start regressions. The test suite instead
+checks that the heavy SDKs are not imported at all
+(`tests/test_startup.py`).
+
+Usage:
+    python -m benchmarks.startup --runs 5 --top 15 --budget-ms 1500
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def import_times(module: str = "app.main") -> dict[str, tuple[int, int]]:
+    """Import `module` in a new interpreter.
+
+    Returns:
+        {module: (self_us, cumulative_us)} for every module it imported
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main(runs: int, top: int, budget_ms: float | None) -> int:
+    samples: dict[str, list[tuple[int, int]]] = defaultdict(list)
+    for _ in range(runs):
+        for name, times in import_times().items():
+            samples[name].append(times)
+
+    median = {
+        name: (statistics.median(s for s, _ in values), statistics.median(c for _, c in values))
+        for name, values in samples.items()
+    }
+    total_ms = median["app.main"][1] / 1000
+
+    print(f"import app.main: {total_ms:.0f} ms (median of {runs})\n")
+    print(f"{'slowest modules':<60}{'cumulative (ms)':>16}")
+    for name, (_, cumulative) in sorted(median.items(), key=lambda i: -i[1][1])[:top]:
+        print(f"{name:<60}{cumulative / 1000:>16.1f}")
+
+    print(f"\n{'app modules':<60}{'self (ms)':>10}{'cumulative (ms)':>16}")
+    for name, (self_us, cumulative) in sorted(median.items(), key=lambda i: -i[1][1]):
+        if name == "app" or name.startswith("app."):
+            print(f"{name:<60}{self_us / 1000:>10.1f}{cumulative / 1000:>16.1f}")
+
+    if budget_ms is not None and total_ms > budget_ms:
+        print(f"\nOver budget: {total_ms:.0f} ms > {budget_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+    sys.exit(main(args.runs, args.top, args.budget_ms))
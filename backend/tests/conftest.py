@@ -1,49 +1,157 @@
-import asyncio
+import hashlib
+import os
 import subprocess
+import sys
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy import create_engine, make_url, text
 import pytest
 import pytest_asyncio
 
-from app.main import app
-from app.models.base import Base
 from app.settings import get_settings
 
 
 settings = get_settings()
-settings.db_url
+
+# Every pytest-xdist worker gets its own database, cloned from a template that
+# holds the migrated schema. The app's engine is created on import from
+# `settings.db_url`, so point it at the worker database before importing it.
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+WORKER = os.environ.get("PYTEST_XDIST_WORKER", "main")
+BASE_URL = make_url(settings.test_db_url or settings.db_url)
+TEMPLATE_DB = f"{BASE_URL.database}_template"
+WORKER_DB = f"{BASE_URL.database}_{WORKER}"
+settings.db_url = BASE_URL.set(database=WORKER_DB).render_as_string(hide_password=False)
+# Keep spans in memory instead of printing them; tests attach their own processor.
+settings.tracing_exporter = "opentelemetry.sdk.trace.export.in_memory_span_exporter:InMemorySpanExporter"
+
+from app.db.session import AsyncSessionLocal, engine  # noqa: E402
+from app.api.routes.v1 import grants  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.roles import Role, UserRole  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.utils import create_access_token  # noqa: E402
+from tests.fakes import FakeGeminiService  # noqa: E402
+
+
+def _sync_engine(database: str):
+    url = BASE_URL.set(drivername="postgresql+psycopg2", database=database)
+    return create_engine(url, isolation_level="AUTOCOMMIT")
+
+
+def _schema_key() -> str:
+    """The Alembic head plus a hash of everything the migrations are built from.
+
+    Editing a migration or a model in place keeps the head id, so the id
+    alone would keep serving a stale template.
+    """
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    digest = hashlib.sha256()
+    for path in sorted(
+        [*(BACKEND_DIR / "alembic").rglob("*.py"), *(BACKEND_DIR / "app" / "models").glob("*.py")]
+    ):
+        digest.update(path.relative_to(BACKEND_DIR).as_posix().encode())
+        digest.update(path.read_bytes())
+    return f"{ScriptDirectory.from_config(config).get_current_head()}:{digest.hexdigest()}"
 
 
-engine = create_async_engine(settings.db_url)
-TestingSessionLocal = async_sessionmaker(bind=engine, autocommit=False, autoflush=False)
+def _template_key(admin) -> str | None:
+    """The schema key the template was built with, kept as its database comment."""
+    return admin.execute(
+        text("SELECT shobj_description(oid, 'pg_database') FROM pg_database WHERE datname = :name"),
+        {"name": TEMPLATE_DB},
+    ).scalar()
 
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create a fresh event loop for each test"""
-    loop = asyncio.new_event_loop()
-    yield loop
-    loop.close()
+def _build_template(admin, key: str) -> None:
+    admin.execute(text(f'DROP DATABASE IF EXISTS "{TEMPLATE_DB}" WITH (FORCE)'))
+    admin.execute(text(f'CREATE DATABASE "{TEMPLATE_DB}"'))
+    url = BASE_URL.set(database=TEMPLATE_DB).render_as_string(hide_password=False)
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "DB_URL": url},
+        check=True,
+    )
+    admin.execute(text(f'COMMENT ON DATABASE "{TEMPLATE_DB}" IS \'{key}\''))
 
 
 @pytest.fixture(scope="session", autouse=True)
-def override_settings():
-    """Override settings for testing"""
-    settings.db_url = settings.test_db_url
+def test_database():
+    """Clone this worker's database from the migrated template.
 
+    The template is only rebuilt when the migrations or models changed since
+    it was built (see `_schema_key`). Workers serialize on an advisory lock,
+    since a template cannot be copied while another session is connected to
+    it.
+    """
+    admin_engine = _sync_engine("postgres")
+    admin = admin_engine.connect()
+    try:
+        admin.execute(text("SELECT pg_advisory_lock(hashtext(:name))"), {"name": TEMPLATE_DB})
+        key = _schema_key()
+        if _template_key(admin) != key:
+            _build_template(admin, key)
+        admin.execute(text(f'DROP DATABASE IF EXISTS "{WORKER_DB}" WITH (FORCE)'))
+        admin.execute(text(f'CREATE DATABASE "{WORKER_DB}" TEMPLATE "{TEMPLATE_DB}"'))
+        admin.execute(text("SELECT pg_advisory_unlock(hashtext(:name))"), {"name": TEMPLATE_DB})
+        yield
+        admin.execute(text(f'DROP DATABASE IF EXISTS "{WORKER_DB}" WITH (FORCE)'))
+    finally:
+        admin.close()
+        admin_engine.dispose()
 
-@pytest_asyncio.fixture
+
+@pytest_asyncio.fixture(autouse=True, loop_scope="session")
+async def db_transaction(test_database):
+    """Run each test inside one outer transaction that is rolled back afterwards.
+
+    Sessions made by `AsyncSessionLocal` bind to the test's connection and turn
+    their commits and rollbacks into SAVEPOINTs, so nothing a test writes
+    outlives it and no table has to be truncated.
+    """
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        AsyncSessionLocal.configure(bind=conn, join_transaction_mode="create_savepoint")
+        try:
+            yield conn
+        finally:
+            AsyncSessionLocal.configure(bind=engine, join_transaction_mode="conservative_savepoint")
+            await transaction.rollback()
+
+
+@pytest_asyncio.fixture(loop_scope="session")
 async def async_client():
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as client:
         yield client
 
 
-@pytest_asyncio.fixture(autouse=True)
-async def clean_db():
-    """Clean database between tests"""
-    async with engine.begin() as conn:
-        # Simple truncate approach
-        await conn.execute(text("TRUNCATE users CASCADE"))
-        await conn.commit()
+@pytest.fixture
+def auth_headers():
+    token = create_access_token("test-user", uuid.uuid4(), timedelta(minutes=5))
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def admin_headers(db_transaction):
+    """Headers for a user holding the admin role, rolled back with the test."""
+    async with AsyncSessionLocal() as session:
+        user = User(username="test-admin", hashed_password="!")
+        role = Role(role_name=settings.admin_role, description="Administrators")
+        session.add_all([user, role])
+        await session.flush()
+        session.add(UserRole(user_id=user.id, role_id=role.id))
+        await session.commit()
+    token = create_access_token(user.username, user.id, timedelta(minutes=5))
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    monkeypatch.setattr(grants, "GeminiService", FakeGeminiService)
@@ -0,0 +1,13 @@
+class FakeModel:
+    model_name = "models/fake-pro"
+
+
+class FakeGeminiService:
+    def __init__(self):
+        self.model = FakeModel()
+
+    def validate_api_key(self):
+        return True
+
+    async def generate_grant_application(self, base_prompt, company_data):
+        return "# Abstract\n\nGenerated for " + company_data["companyInfo"]["companyName"]
@@ -0,0 +1,244 @@
+import pytest
+from fastapi import HTTPException
+
+from app.api.routes.v1 import grants
+from app.core.delta import apply_delta, make_delta
+from app.deps import application as application_deps
+from app.db import session as db_session
+from app.db.session import AsyncSessionLocal
+from app.services import revisions
+from tests.fakes import FakeGeminiService
+
+
+@pytest.mark.asyncio
+async def test_generated_application_is_saved_and_versioned(async_client, auth_headers, fake_gemini):
+    response = await async_client.post(
+        "/organizations/",
+        json={"organization_name": "Acme", "address": "1 St", "contact_info": "n/a"},
+        headers=auth_headers,
+    )
+    org_id = response.json()["id"]
+
+    response = await async_client.post(
+        "/api/v1/generate-grant-application",
+        json={"companyInfo": {"companyName": "Acme", "description": "d"}, "organizationId": org_id},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    application_id = response.json()["applicationId"]
+    assert response.json()["version"] == 1
+
+    response = await async_client.get(
+        f"/api/v1/organizations/{org_id}/applications", headers=auth_headers
+    )
+    assert [app["id"] for app in response.json()] == [application_id]
+
+    response = await async_client.post(
+        f"/api/v1/applications/{application_id}/versions",
+        json={"content": "# Abstract\n\nEdited"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 201
+    assert response.json()["version"] == 2
+    assert response.json()["parent_version"] == 1
+
+    response = await async_client.get(f"/api/v1/applications/{application_id}", headers=auth_headers)
+    assert response.json()["content"] == "# Abstract\n\nEdited"
+
+    response = await async_client.get(
+        f"/api/v1/applications/{application_id}/versions/1", headers=auth_headers
+    )
+    assert response.json()["content"] == "# Abstract\n\nGenerated for Acme"
+    assert response.json()["model_name"] == "models/fake-pro"
+    assert len(response.json()["input_hash"]) == 64
+
+    response = await async_client.get(
+        f"/api/v1/applications/{application_id}/versions", headers=auth_headers
+    )
+    assert [v["version"] for v in response.json()] == [2, 1]
+
+
+@pytest.mark.asyncio
+async def test_saving_a_draft_requires_authentication(async_client, auth_headers, fake_gemini):
+    response = await async_client.post(
+        "/organizations/",
+        json={"organization_name": "Acme", "address": "1 St", "contact_info": "n/a"},
+        headers=auth_headers,
+    )
+    payload = {"companyInfo": {"companyName": "Acme", "description": "d"}}
+
+    response = await async_client.post(
+        "/api/v1/generate-grant-application",
+        json={**payload, "organizationId": response.json()["id"]},
+    )
+    assert response.status_code == 401
+
+    # Generating without saving stays open.
+    response = await async_client.post("/api/v1/generate-grant-application", json=payload)
+    assert response.status_code == 200
+    assert response.json()["applicationId"] is None
+
+
+def test_delta_roundtrip():
+    parent = "# Abstract\n\nOne\nTwo\nThree\n"
+    child = "# Abstract\n\nOne\n2\nThree\nFour"
+    assert apply_delta(parent, make_delta(parent, child)) == child
+    assert apply_delta("", make_delta("", child)) == child
+
+
+class FakeEditService(FakeGeminiService):
+    async def generate_grant_application(self, base_prompt, company_data):
+        return "\n".join(f"Paragraph {i} of the project narrative." for i in range(50))
+
+    async def edit_text(self, original_text, selected_text, edit_instruction):
+        return original_text.replace(selected_text, edit_instruction)
+
+
+@pytest.mark.asyncio
+async def test_edits_are_delta_encoded_with_undo_redo(async_client, auth_headers, monkeypatch):
+    monkeypatch.setattr(grants, "GeminiService", FakeEditService)
+    monkeypatch.setattr(application_deps, "GeminiService", FakeEditService)
+    monkeypatch.setattr(revisions.settings, "revision_snapshot_interval", 3)
+
+    response = await async_client.post(
+        "/organizations/",
+        json={"organization_name": "Acme", "address": "1 St", "contact_info": "n/a"},
+        headers=auth_headers,
+    )
+    org_id = response.json()["id"]
+    response = await async_client.post(
+        "/api/v1/generate-grant-application",
+        json={"companyInfo": {"companyName": "Acme", "description": "d"}, "organizationId": org_id},
+        headers=auth_headers,
+    )
+    application_id = response.json()["applicationId"]
+    url = f"/api/v1/applications/{application_id}"
+
+    encodings = []
+    for i in range(4):
+        response = await async_client.post(
+            f"{url}/edit",
+            json={"selected_text": f"Paragraph {i} ", "edit_instruction": f"Section {i} "},
+            headers=auth_headers,
+        )
+        assert response.status_code == 201
+        assert f"Section {i} of" in response.json()["content"]
+        encodings.append(response.json()["encoding"])
+    # Every third version in a chain is a full snapshot.
+    assert encodings == ["delta", "delta", "full", "delta"]
+
+    response = await async_client.post(f"{url}/undo", headers=auth_headers)
+    assert response.json()["version"] == 4
+    response = await async_client.get(url, headers=auth_headers)
+    assert "Section 2 of" in response.json()["content"]
+    assert "Section 3 of" not in response.json()["content"]
+
+    response = await async_client.post(f"{url}/redo", headers=auth_headers)
+    assert response.json()["version"] == 5
+    assert "Section 3 of" in response.json()["content"]
+    response = await async_client.post(f"{url}/redo", headers=auth_headers)
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_generation_holds_no_transaction_while_the_llm_works(async_client, auth_headers, monkeypatch):
+    sessions = []
+
+    def tracked_session():
+        session = AsyncSessionLocal()
+        sessions.append(session)
+        return session
+
+    class CheckingService(FakeGeminiService):
+        async def generate_grant_application(self, base_prompt, company_data):
+            assert sessions and not any(session.in_transaction() for session in sessions)
+            return await super().generate_grant_application(base_prompt, company_data)
+
+    monkeypatch.setattr(grants, "GeminiService", CheckingService)
+    response = await async_client.post(
+        "/organizations/",
+        json={"organization_name": "Acme", "address": "1 St", "contact_info": "n/a"},
+        headers=auth_headers,
+    )
+    org_id = response.json()["id"]
+    monkeypatch.setattr(db_session, "AsyncSessionLocal", tracked_session)
+    response = await async_client.post(
+        "/api/v1/generate-grant-application",
+        json={"companyInfo": {"companyName": "Acme", "description": "d"}, "organizationId": org_id},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["version"] == 1
+
+
+@pytest.mark.asyncio
+async def test_revision_is_made_outside_a_transaction_and_rejected_on_conflict(async_client, auth_headers, fake_gemini):
+    response = await async_client.post(
+        "/organizations/",
+        json={"organization_name": "Acme", "address": "1 St", "contact_info": "n/a"},
+        headers=auth_headers,
+    )
+    response = await async_client.post(
+        "/api/v1/generate-grant-application",
+        json={"companyInfo": {"companyName": "Acme", "description": "d"}, "organizationId": response.json()["id"]},
+        headers=auth_headers,
+    )
+    application_id = response.json()["applicationId"]
+
+    async with AsyncSessionLocal() as db:
+        async def slow_edit(application, base):
+            # No connection is held while the LLM would be working.
+            assert not db.in_transaction()
+            # Someone else saves a version meanwhile.
+            response = await async_client.post(
+                f"/api/v1/applications/{application_id}/versions",
+                json={"content": "Concurrent edit"},
+                headers=auth_headers,
+            )
+            assert response.status_code == 201
+            return application_deps.Revision(base[1] + "\nSlow edit")
+
+        with pytest.raises(HTTPException) as exc:
+            await application_deps._add_revision(db, application_id, None, slow_edit)
+    assert exc.value.status_code == 409
+
+    response = await async_client.get(f"/api/v1/applications/{application_id}", headers=auth_headers)
+    assert response.json()["content"] == "Concurrent edit"
+
+
+@pytest.mark.asyncio
+async def test_undo_is_rejected_when_the_head_moved_meanwhile(async_client, auth_headers, fake_gemini, monkeypatch):
+    response = await async_client.post(
+        "/organizations/",
+        json={"organization_name": "Acme", "address": "1 St", "contact_info": "n/a"},
+        headers=auth_headers,
+    )
+    response = await async_client.post(
+        "/api/v1/generate-grant-application",
+        json={"companyInfo": {"companyName": "Acme", "description": "d"}, "organizationId": response.json()["id"]},
+        headers=auth_headers,
+    )
+    url = f"/api/v1/applications/{response.json()['applicationId']}"
+    await async_client.post(f"{url}/versions", json={"content": "Second"}, headers=auth_headers)
+
+    # A revision is committed between undo reading the head and moving it.
+    load = application_deps.load_version
+
+    async def load_then_revise(db, application_id, version):
+        loaded = await load(db, application_id, version)
+        monkeypatch.setattr(application_deps, "load_version", load)
+        async with AsyncSessionLocal() as other:
+            await application_deps._add_revision(
+                other, application_id, None, lambda *_: _revision("Third")
+            )
+        return loaded
+
+    monkeypatch.setattr(application_deps, "load_version", load_then_revise)
+    response = await async_client.post(f"{url}/undo", headers=auth_headers)
+    # (Both sessions share the test's connection, so the rollback after the
+    # 409 also undoes the concurrent revision; only the status is checked.)
+    assert response.status_code == 409
+
+
+async def _revision(content):
+    return application_deps.Revision(content)
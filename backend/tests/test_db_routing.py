@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+from app.db import session as db_session
+from app.deps import db_routing
+from app.deps.db_routing import LAST_WRITE_COOKIE, ReadYourWritesMiddleware, recent_write, use_replica
+
+
+def test_recent_write_expires_after_window(monkeypatch):
+    monkeypatch.setattr(db_routing.settings, "db_read_your_writes_seconds", 5)
+    assert recent_write("100.0", now=104.0)
+    assert not recent_write("100.0", now=106.0)
+    assert not recent_write(None, now=100.0)
+    assert not recent_write("garbage", now=100.0)
+
+
+def test_reads_go_to_primary_after_own_write(monkeypatch):
+    monkeypatch.setattr(db_session, "ReadSessionLocal", object())
+
+    assert use_replica("GET", None)
+    assert not use_replica("POST", None)
+    assert not use_replica("GET", str(time.time()))
+    assert use_replica("GET", str(time.time() - 3600))
+
+
+def test_no_replica_configured_uses_primary(monkeypatch):
+    monkeypatch.setattr(db_session, "ReadSessionLocal", None)
+    assert not use_replica("GET", None)
+
+
+@pytest.mark.asyncio
+async def test_write_time_is_handed_to_the_client():
+    async def app(scope, receive, send):
+        scope.setdefault("state", {})["last_write"] = 1234.5
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    await ReadYourWritesMiddleware(app)({"type": "http"}, None, send)
+    (cookie,) = [v.decode() for k, v in sent[0]["headers"] if k == b"set-cookie"]
+    assert cookie.startswith(f"{LAST_WRITE_COOKIE}=1234.500;")
+    assert "HttpOnly" in cookie
@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Runs in a fresh interpreter: the app's engine is bound to DB_URL on import.
+SCRIPT = r"""
+import asyncio
+import uuid
+from datetime import timedelta
+from httpx import ASGITransport, AsyncClient
+from app.api.routes.v1 import grants
+from app.main import app, lifespan
+from app.utils import create_access_token
+
+
+class FakeGeminiService:
+    class model:
+        model_name = "models/fake"
+
+    def validate_api_key(self):
+        return True
+
+    async def generate_grant_application(self, base_prompt, company_data):
+        return "\n".join(f"Paragraph {i}" for i in range(40))
+
+
+grants.GeminiService = FakeGeminiService
+
+
+async def main():
+    token = create_access_token("embedded", uuid.uuid4(), timedelta(minutes=5))
+    headers = {"Authorization": f"Bearer {token}"}
+    async with lifespan(app):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/organizations/",
+                json={"organization_name": "Acme Labs", "address": "1 St", "contact_info": "n/a"},
+                headers=headers,
+            )
+            org = response.json()
+
+            response = await client.get("/organizations/", params={"keyword": "acme"}, headers=headers)
+            assert [o["id"] for o in response.json()] == [org["id"]], response.json()
+
+            response = await client.get(f"/organizations/{org['id']}", headers=headers)
+            etag = response.headers["etag"]
+            response = await client.put(
+                f"/organizations/{org['id']}", json={"address": "2 St"},
+                headers={**headers, "If-Match": etag},
+            )
+            assert response.status_code == 200, response.text
+            response = await client.put(
+                f"/organizations/{org['id']}", json={"address": "3 St"},
+                headers={**headers, "If-Match": etag},
+            )
+            assert response.status_code == 412, response.text
+
+            response = await client.post(
+                "/api/v1/generate-grant-application",
+                json={"companyInfo": {"companyName": "Acme", "description": "d"}, "organizationId": org["id"]},
+                headers=headers,
+            )
+            url = f"/api/v1/applications/{response.json()['applicationId']}"
+            response = await client.post(
+                f"{url}/versions", json={"content": "Paragraph 0\nEdited"}, headers=headers
+            )
+            assert response.json()["encoding"] == "delta", response.json()
+            response = await client.get(f"{url}/versions/2", headers=headers)
+            assert response.json()["content"] == "Paragraph 0\nEdited", response.json()
+
+
+asyncio.run(main())
+print("embedded ok")
+"""
+
+
+def test_api_runs_on_embedded_sqlite(tmp_path):
+    env = {**os.environ, "DB_URL": f"sqlite+aiosqlite:///{tmp_path / 'app.db'}"}
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert "embedded ok" in result.stdout
@@ -0,0 +1,115 @@
+import asyncio
+import io
+import zipfile
+
+import pytest
+
+from app.services.export import export_cache
+
+
+@pytest.fixture
+def export_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(export_cache, "directory", tmp_path)
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_application_is_exported_and_cached(async_client, auth_headers, fake_gemini, export_dir, monkeypatch):
+    response = await async_client.post(
+        "/organizations/",
+        json={"organization_name": "Acme", "address": "1 St", "contact_info": "n/a"},
+        headers=auth_headers,
+    )
+    response = await async_client.post(
+        "/api/v1/generate-grant-application",
+        json={"companyInfo": {"companyName": "Acmé Ωmega", "description": "d"}, "organizationId": response.json()["id"]},
+        headers=auth_headers,
+    )
+    url = f"/api/v1/applications/{response.json()['applicationId']}/export"
+
+    response = await async_client.get(url, params={"format": "docx"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert "-v1.docx" in response.headers["content-disposition"]
+    document = zipfile.ZipFile(io.BytesIO(response.content)).read("word/document.xml").decode()
+    assert "Acmé Ωmega" in document
+    etag = response.headers["etag"]
+
+    response = await async_client.get(url, params={"format": "pdf"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.content.startswith(b"%PDF")
+    assert len(list(export_dir.iterdir())) == 2
+
+    # Cached: neither a repeated download nor a conditional one renders again.
+    monkeypatch.setattr(export_cache, "_executor", lambda: pytest.fail("rendered again"))
+    response = await async_client.get(url, params={"format": "docx"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["etag"] == etag
+
+    response = await async_client.get(
+        url, params={"format": "docx"}, headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_pruning_never_breaks_a_download(async_client, auth_headers, fake_gemini, export_dir, monkeypatch):
+    response = await async_client.post(
+        "/organizations/",
+        json={"organization_name": "Acme", "address": "1 St", "contact_info": "n/a"},
+        headers=auth_headers,
+    )
+    response = await async_client.post(
+        "/api/v1/generate-grant-application",
+        json={"companyInfo": {"companyName": "Acme", "description": "d"}, "organizationId": response.json()["id"]},
+        headers=auth_headers,
+    )
+    url = f"/api/v1/applications/{response.json()['applicationId']}/export"
+
+    # A cache too small for even one file keeps the one just written.
+    monkeypatch.setattr(export_cache, "max_bytes", 1)
+    response = await async_client.get(url, params={"format": "docx"}, headers=auth_headers)
+    assert response.status_code == 200
+    response = await async_client.get(url, params={"format": "pdf"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert [p.suffix for p in export_dir.iterdir()] == [".pdf"]
+
+    # A file pruned after it was opened is still sent in full.
+    open_file = export_cache.open
+
+    async def open_then_prune(markdown, fmt):
+        file, key = await open_file(markdown, fmt)
+        export_cache.path(key, fmt).unlink()
+        return file, key
+
+    monkeypatch.setattr(export_cache, "open", open_then_prune)
+    response = await async_client.get(url, params={"format": "pdf"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.content.startswith(b"%PDF")
+    assert int(response.headers["content-length"]) == len(response.content)
+    assert list(export_dir.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_a_cancelled_request_does_not_fail_others_rendering_the_same_export(export_dir, monkeypatch):
+    started = asyncio.Event()
+    release = asyncio.Event()
+    render = export_cache._render
+
+    async def slow_render(*args):
+        started.set()
+        await release.wait()
+        await render(*args)
+
+    monkeypatch.setattr(export_cache, "_render", slow_render)
+    first = asyncio.create_task(export_cache.get("# Shared", "docx"))
+    await started.wait()
+    second = asyncio.create_task(export_cache.get("# Shared", "docx"))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    release.set()
+    path, _ = await second
+    assert path.is_file()
+    with pytest.raises(asyncio.CancelledError):
+        await first
@@ -0,0 +1,62 @@
+import io
+import json
+import logging
+import sys
+
+import pytest
+
+from app.core import logs
+
+
+@pytest.mark.asyncio
+async def test_request_id_is_echoed_and_attached_to_json_records(monkeypatch, async_client):
+    response = await async_client.get("/", headers={"X-Request-ID": "req-123"})
+    assert response.headers["x-request-id"] == "req-123"
+    generated = (await async_client.get("/")).headers["x-request-id"]
+    assert len(generated) == 32
+
+    out = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", out)
+    monkeypatch.setattr(logs.settings, "log_json", True)
+    root = logging.getLogger()
+    level = root.level
+    listener = logs.setup_logging()
+    try:
+        token = logs.request_id.set("req-456")
+        logging.getLogger("app.test").warning("generated %d sections", 3, extra={"organization": "acme"})
+        logs.request_id.reset(token)
+    finally:
+        listener.stop()
+        root.handlers = [h for h in root.handlers if not isinstance(h, logs._ContextQueueHandler)]
+        root.setLevel(level)
+
+    (entry,) = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert entry["message"] == "generated 3 sections"
+    assert entry["level"] == "WARNING"
+    assert entry["request_id"] == "req-456"
+    assert entry["organization"] == "acme"
+
+
+def test_mutable_arguments_are_formatted_when_logged(monkeypatch):
+    out = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", out)
+    monkeypatch.setattr(logs.settings, "log_json", True)
+    root = logging.getLogger()
+    level = root.level
+    listener = logs.setup_logging()
+    try:
+        sections = ["Abstract"]
+        logging.getLogger("app.test").warning("regenerating %s (%d)", sections, len(sections))
+        sections.append("Conclusion")
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logging.getLogger("app.test").exception("failed")
+    finally:
+        listener.stop()
+        root.handlers = [h for h in root.handlers if not isinstance(h, logs._ContextQueueHandler)]
+        root.setLevel(level)
+
+    mutable, failed = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert mutable["message"] == "regenerating ['Abstract'] (1)"
+    assert failed["exception"].endswith("ValueError: boom")
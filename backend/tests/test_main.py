@@ -6,3 +6,30 @@ async def test_echo(async_client):
     response = await async_client.get("/")
     assert response.status_code == 200
     assert response.json() == {"Hello": "API"}
+
+
+@pytest.mark.asyncio
+async def test_db_pool_status(async_client, admin_headers):
+    response = await async_client.get("/admin/db/pool", headers=admin_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["pool_class"] == "InstrumentedAsyncPool"
+    assert {"checkouts", "waits", "overflow", "checked_out"} <= body.keys()
+
+
+@pytest.mark.asyncio
+async def test_admin_routes_require_the_admin_role(async_client, auth_headers):
+    for method, path in [("GET", "/admin/db/pool"), ("GET", "/admin/db/queries"),
+                         ("DELETE", "/admin/db/queries"), ("GET", "/admin/usage")]:
+        response = await async_client.request(method, path, headers=auth_headers)
+        assert response.status_code == 403, path
+
+
+@pytest.mark.asyncio
+async def test_lazy_session_is_not_opened_until_used():
+    from app.db.session import LazySession
+
+    opened = []
+    session = LazySession(lambda: opened.append(True) or object())
+    await session.close()
+    assert opened == []
@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from app.core.metrics import REGISTRY
+from app.services import llm
+
+
+class FlakyModel:
+    model_name = "models/flaky"
+
+    def __init__(self, failures):
+        self.failures = failures
+
+    def generate_content(self, contents, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise google_exceptions.ServiceUnavailable("try again")
+        usage = SimpleNamespace(prompt_token_count=12, candidates_token_count=30)
+        return SimpleNamespace(text="ok", usage_metadata=usage)
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.asyncio
+async def test_llm_calls_record_tokens_retries_and_errors(monkeypatch):
+    monkeypatch.setattr(llm.settings, "llm_retry_backoff_seconds", 0)
+    monkeypatch.setattr(llm.settings, "llm_max_retries", 2)
+    labels = {"service": "test", "operation": "generate", "model": "models/flaky"}
+    before = {
+        name: sample(name, **labels)
+        for name in ("llm_prompt_tokens_total", "llm_output_tokens_total", "llm_retries_total")
+    }
+
+    response = await llm.generate_content(FlakyModel(failures=2), "hi", "test", "generate")
+    assert response.text == "ok"
+    assert sample("llm_retries_total", **labels) - before["llm_retries_total"] == 2
+    assert sample("llm_prompt_tokens_total", **labels) - before["llm_prompt_tokens_total"] == 12
+    assert sample("llm_output_tokens_total", **labels) - before["llm_output_tokens_total"] == 30
+
+    errors = sample("llm_requests_total", **labels, outcome="error")
+    with pytest.raises(google_exceptions.ServiceUnavailable):
+        await llm.generate_content(FlakyModel(failures=3), "hi", "test", "generate")
+    assert sample("llm_requests_total", **labels, outcome="error") == errors + 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_routes_and_pool(async_client, auth_headers):
+    await async_client.get("/organizations/", headers=auth_headers)
+
+    response = await async_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/organizations/"}' in body
+    assert 'db_pool_checkouts_total{engine="primary"}' in body
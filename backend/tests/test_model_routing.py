@@ -0,0 +1,105 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from app.core.metrics import REGISTRY
+from app.services import llm
+from app.services.usage import usage_writer
+
+
+class SleepyModel:
+    def __init__(self, model_name, delay=0.0, fail=None):
+        self.model_name = model_name
+        self.delay = delay
+        self.fail = fail
+
+    def generate_content(self, contents, **kwargs):
+        time.sleep(self.delay)
+        if self.fail:
+            raise self.fail
+        usage = SimpleNamespace(prompt_token_count=7, candidates_token_count=len(contents))
+        return SimpleNamespace(text=f"{self.model_name}: {contents}", usage_metadata=usage)
+
+
+@pytest.fixture
+def routing(monkeypatch):
+    monkeypatch.setattr(llm.settings, "llm_models", {"pro": "models/pro", "flash": "models/flash"})
+    monkeypatch.setattr(llm.settings, "llm_routes", {"draft": "pro", "edit": "flash"})
+    monkeypatch.setattr(llm.settings, "llm_fallback_tier", "flash")
+    monkeypatch.setattr(llm.settings, "llm_deadline_seconds", {"draft": 0.3})
+    monkeypatch.setattr(llm.settings, "llm_hedged_operations", {"draft"})
+    monkeypatch.setattr(llm.settings, "llm_fallback_margin_seconds", 0.2)
+    monkeypatch.setattr(llm.settings, "llm_max_retries", 0)
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.asyncio
+async def test_operations_use_their_tier(routing):
+    router = llm.ModelRouter(lambda name: SleepyModel(name))
+
+    response, model = await router.generate("fix typo", "test", "edit")
+    assert model.model_name == "models/flash"
+    response, model = await router.generate("write it", "test", "draft")
+    assert model.model_name == "models/pro"
+    assert response.text == "models/pro: write it"
+    assert router.model("pro") is model
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_falls_back_before_the_deadline(routing, monkeypatch):
+    recorded = []
+    monkeypatch.setattr(usage_writer, "record", lambda *labels, **fields: recorded.append((labels, fields)))
+    router = llm.ModelRouter(lambda name: SleepyModel(name, delay=0.5 if name == "models/pro" else 0.0))
+    before = sample("llm_fallbacks_total", service="test", operation="draft", reason="deadline")
+
+    started = time.perf_counter()
+    response, model = await router.generate("write it", "test", "draft")
+    assert time.perf_counter() - started < 0.4
+    assert model.model_name == "models/flash"
+    assert sample("llm_fallbacks_total", service="test", operation="draft", reason="deadline") == before + 1
+
+    # The abandoned call still finishes, and its tokens are recorded.
+    await asyncio.wait_for(asyncio.gather(*llm._abandoned), timeout=2)
+    assert [(labels[2], fields["succeeded"], fields["output_tokens"]) for labels, fields in recorded] == [
+        ("models/flash", True, 8), ("models/pro", True, 8)
+    ]
+    assert sample(
+        "llm_tier_request_duration_seconds_count", service="test", operation="draft", tier="pro", outcome="abandoned"
+    ) >= 1
+
+
+@pytest.mark.asyncio
+async def test_operations_are_not_hedged_unless_listed(routing, monkeypatch):
+    monkeypatch.setattr(llm.settings, "llm_hedged_operations", set())
+    router = llm.ModelRouter(lambda name: SleepyModel(name, delay=0.3 if name == "models/pro" else 0.0))
+
+    response, model = await router.generate("write it", "test", "draft")
+    assert model.model_name == "models/pro"
+    assert llm._abandoned == set()
+
+
+@pytest.mark.asyncio
+async def test_transient_failure_falls_back_and_both_failing_raises(routing):
+    down = google_exceptions.ServiceUnavailable("model down")
+    router = llm.ModelRouter(lambda name: SleepyModel(name, fail=down if name == "models/pro" else None))
+    _, model = await router.generate("write it", "test", "draft")
+    assert model.model_name == "models/flash"
+
+    router = llm.ModelRouter(lambda name: SleepyModel(name, fail=down))
+    with pytest.raises(google_exceptions.ServiceUnavailable):
+        await router.generate("write it", "test", "draft")
+
+
+@pytest.mark.asyncio
+async def test_other_errors_do_not_fall_back(routing):
+    models = []
+    router = llm.ModelRouter(lambda name: models.append(name) or SleepyModel(name, fail=ValueError("bad input")))
+    with pytest.raises(ValueError):
+        await router.generate("write it", "test", "draft")
+    assert models == ["models/pro"]
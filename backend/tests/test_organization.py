@@ -1,3 +1,7 @@
+import json
+import uuid
+from datetime import datetime
+
 import pytest
 
 
@@ -12,4 +16,204 @@ async def test_unauthorized_create_organization(async_client):
             "contact_info": "123-456-7890",
         },
     )
-    assert response.status_code == 401
\ No newline at end of file
+    assert response.status_code == 401
+
+@pytest.mark.asyncio
+async def test_list_organizations_cursor_pagination(async_client, auth_headers):
+    created = []
+    for i in range(5):
+        response = await async_client.post(
+            "/organizations/",
+            json={
+                "organization_name": f"Org {i}",
+                "address": "123 Test St",
+                "contact_info": "123-456-7890",
+            },
+            headers=auth_headers,
+        )
+        assert response.status_code == 201
+        created.append(response.json())
+
+    seen = []
+    params = {"limit": 2}
+    while True:
+        response = await async_client.get("/organizations/", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        seen.extend(org["organization_name"] for org in response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+        params = {"limit": 2, "cursor": cursor}
+
+    # Rows created in one test share created_at (the outer transaction's
+    # now()), so the id breaks the tie; Postgres orders uuids bytewise.
+    created.sort(key=lambda org: (datetime.fromisoformat(org["created_at"]), uuid.UUID(org["id"])))
+    assert seen == [org["organization_name"] for org in created]
+
+
+@pytest.mark.asyncio
+async def test_list_organizations_rejects_bad_cursor(async_client, auth_headers):
+    response = await async_client.get(
+        "/organizations/", params={"cursor": "not-a-cursor"}, headers=auth_headers
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_keyword_search_ranks_and_covers_address(async_client, auth_headers):
+    for name, address in [
+        ("Lazy Grants", "1 Main St"),
+        ("Acme Lazygrant Holdings", "2 Main St"),
+        ("Other Co", "Lazy Grants Plaza"),
+    ]:
+        await async_client.post(
+            "/organizations/",
+            json={"organization_name": name, "address": address, "contact_info": "n/a"},
+            headers=auth_headers,
+        )
+
+    response = await async_client.get(
+        "/organizations/", params={"keyword": "lazy grants"}, headers=auth_headers
+    )
+    names = [org["organization_name"] for org in response.json()]
+    assert names[0] == "Lazy Grants"
+    assert "Other Co" not in names
+
+    response = await async_client.get(
+        "/organizations/",
+        params={"keyword": "lazy grants", "search_all_fields": True, "limit": 1},
+        headers=auth_headers,
+    )
+    assert response.json()[0]["organization_name"] == "Lazy Grants"
+    seen = {response.json()[0]["organization_name"]}
+    cursor = response.headers["x-next-cursor"]
+    while cursor:
+        response = await async_client.get(
+            "/organizations/",
+            params={"keyword": "lazy grants", "search_all_fields": True, "limit": 1, "cursor": cursor},
+            headers=auth_headers,
+        )
+        seen.update(org["organization_name"] for org in response.json())
+        cursor = response.headers.get("x-next-cursor")
+    assert "Other Co" in seen
+
+
+@pytest.mark.asyncio
+async def test_update_organization_with_if_match(async_client, auth_headers):
+    response = await async_client.post(
+        "/organizations/",
+        json={"organization_name": "Before", "address": "1 St", "contact_info": "n/a"},
+        headers=auth_headers,
+    )
+    org_id = response.json()["id"]
+
+    response = await async_client.put(
+        f"/organizations/{org_id}", json={"organization_name": "After"}, headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["organization_name"] == "After"
+    etag = response.headers["etag"]
+
+    response = await async_client.put(
+        f"/organizations/{org_id}",
+        json={"address": "2 St"},
+        headers={**auth_headers, "If-Match": etag},
+    )
+    assert response.status_code == 200
+    assert response.json()["address"] == "2 St"
+
+    response = await async_client.put(
+        f"/organizations/{org_id}",
+        json={"address": "3 St"},
+        headers={**auth_headers, "If-Match": etag},
+    )
+    assert response.status_code == 412
+
+    response = await async_client.put(
+        "/organizations/00000000-0000-0000-0000-000000000000",
+        json={"address": "3 St"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_returns_304_until_modified(async_client, auth_headers):
+    response = await async_client.post(
+        "/organizations/",
+        json={"organization_name": "Cached", "address": "1 St", "contact_info": "n/a"},
+        headers=auth_headers,
+    )
+    org_id = response.json()["id"]
+
+    response = await async_client.get(f"/organizations/{org_id}", headers=auth_headers)
+    etag = response.headers["etag"]
+    response = await async_client.get(
+        f"/organizations/{org_id}", headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    response = await async_client.get("/organizations/", headers=auth_headers)
+    list_etag = response.headers["etag"]
+    response = await async_client.get(
+        "/organizations/", headers={**auth_headers, "If-None-Match": list_etag}
+    )
+    assert response.status_code == 304
+
+    await async_client.put(
+        f"/organizations/{org_id}", json={"address": "2 St"}, headers=auth_headers
+    )
+    response = await async_client.get(
+        f"/organizations/{org_id}", headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    response = await async_client.get(
+        "/organizations/", headers={**auth_headers, "If-None-Match": list_etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != list_etag
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_update_delete(async_client, auth_headers):
+    rows = [
+        {"organization_name": f"Bulk {i}", "address": "1 St", "contact_info": "n/a"}
+        for i in range(3)
+    ]
+    body = "\n".join(json.dumps(row) for row in rows) + '\n{"organization_name": "missing fields"}\nnot json\n'
+    response = await async_client.post(
+        "/organizations/bulk",
+        content=body,
+        headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert len(result["ids"]) == 3
+    assert [error["index"] for error in result["errors"]] == [3, 4]
+    ids = result["ids"]
+
+    response = await async_client.patch(
+        "/organizations/bulk",
+        json=[
+            {"id": ids[0], "address": "2 St"},
+            {"id": ids[1], "organization_name": "Renamed"},
+            {"id": "00000000-0000-0000-0000-000000000000", "address": "x"},
+        ],
+        headers=auth_headers,
+    )
+    result = response.json()
+    assert sorted(result["ids"]) == sorted(ids[:2])
+    assert result["errors"][0]["index"] == 2
+
+    response = await async_client.get(f"/organizations/{ids[1]}", headers=auth_headers)
+    assert response.json()["organization_name"] == "Renamed"
+
+    response = await async_client.post(
+        "/organizations/bulk/delete", json=ids + ["not-a-uuid"], headers=auth_headers
+    )
+    result = response.json()
+    assert sorted(result["ids"]) == sorted(ids)
+    assert result["errors"][0]["index"] == 3
@@ -0,0 +1,62 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.routes.v1 import gen_ai
+from app.deps.gemini_service import GeminiService
+from app.main import app
+
+SECTION_DELAYS = {"Summary": 0.3, "Problem": 0.1, "Budget": 0.2}
+
+
+class FakeRouter:
+    async def generate(self, contents, service, operation, **kwargs):
+        if operation == "generate_outline":
+            sections = [{"title": title, "key_points": [f"{title} point"]} for title in SECTION_DELAYS]
+            return SimpleNamespace(text=json.dumps({"sections": sections})), None
+        title = next(t for t in SECTION_DELAYS if f'"{t}"' in contents[0])
+        await asyncio.sleep(SECTION_DELAYS[title])
+        return SimpleNamespace(text=f"## {title}\n\nWritten."), None
+
+
+class FakeTemplateService(GeminiService):
+    def __init__(self):
+        super().__init__("test-key")
+        self.router = FakeRouter()
+
+    async def _upload_parts(self, parts):
+        return [filename for _, filename, _ in parts]
+
+
+@pytest.fixture
+def fake_template_service():
+    service = FakeTemplateService()
+    app.dependency_overrides[gen_ai.get_template_service] = lambda: service
+    yield
+    app.dependency_overrides.pop(gen_ai.get_template_service)
+
+
+@pytest.mark.asyncio
+async def test_outline_first_then_sections_as_they_finish(async_client, fake_template_service):
+    started = time.perf_counter()
+    response = await async_client.post(
+        "/generate-grant-template/stream",
+        data={"user_context": json.dumps({"company": {"name": "Acme"}})},
+        files={"grant_template": ("nsf.md", b"# NSF template")},
+    )
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert events[0]["event"] == "outline"
+    assert [s["title"] for s in events[0]["sections"]] == list(SECTION_DELAYS)
+    sections = [e for e in events if e["event"] == "section"]
+    assert [s["title"] for s in sections] == ["Problem", "Budget", "Summary"]
+    assert sections[0]["index"] == 1
+    assert events[-1] == {"event": "done", "failed": 0}
+    # Sections ran concurrently: about the slowest one, not their sum.
+    assert elapsed < sum(SECTION_DELAYS.values())
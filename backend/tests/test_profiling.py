@@ -0,0 +1,24 @@
+import pstats
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core import profiling
+from app.main import app
+
+
+@pytest.mark.asyncio
+async def test_profiles_only_requests_that_ask_for_it(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling.settings, "profiling_dir", str(tmp_path))
+    monkeypatch.setattr(profiling.settings, "profiling_sample_ratio", 0.0)
+    transport = ASGITransport(app=profiling.ProfilingMiddleware(app))
+
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        plain = await client.get("/")
+        profiled = await client.get("/", headers={"X-Profile": "1"})
+
+    assert "x-profile-file" not in plain.headers
+    (written,) = tmp_path.iterdir()
+    assert profiled.headers["x-profile-file"] == written.name
+    assert written.suffix == ".prof"
+    assert pstats.Stats(str(written)).total_calls > 0
@@ -0,0 +1,38 @@
+import logging
+
+import pytest
+
+from app.db import query_stats as qs
+
+
+def test_normalize_sql_hides_values_and_collapses_lists():
+    assert qs.normalize_sql(
+        "SELECT *\n  FROM t WHERE a = $1 AND b IN ($2, $3, $4) AND c = 'x''y' LIMIT 10"
+    ) == "SELECT * FROM t WHERE a = ? AND b IN (?) AND c = ? LIMIT ?"
+    assert qs.normalize_sql(
+        "INSERT INTO t (a, b) VALUES ($1, $2), ($3, $4), ($5, $6)"
+    ) == "INSERT INTO t (a, b) VALUES (?, ?), ..."
+    assert qs.normalize_sql("SAVEPOINT sa_savepoint_12") == "SAVEPOINT sa_savepoint_?"
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_are_logged_explained_and_aggregated(
+    monkeypatch, caplog, async_client, auth_headers, admin_headers
+):
+    monkeypatch.setattr(qs.settings, "db_slow_query_ms", 0)
+    monkeypatch.setattr(qs.settings, "db_slow_query_explain", True)
+    qs.query_stats.reset()
+
+    with caplog.at_level(logging.WARNING, logger=qs.__name__):
+        for _ in range(2):
+            response = await async_client.get("/organizations/", params={"limit": 3}, headers=auth_headers)
+            assert response.status_code == 200
+    assert "Slow query" in caplog.text
+
+    response = await async_client.get("/admin/db/queries", headers=admin_headers)
+    assert response.status_code == 200
+    (listing,) = [s for s in response.json() if s["statement"].startswith("SELECT organizations.")]
+    assert listing["calls"] == 2
+    assert listing["slow_calls"] == 2
+    assert listing["last_plan"]
+    assert "$1" not in listing["statement"]
@@ -0,0 +1,97 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core.rate_limit import InMemoryRateLimitBackend, LoginRateLimiter
+from app.deps.rate_limit import get_login_rate_limiter
+from app.settings import get_settings
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_weights_previous_window():
+    clock = FakeClock()
+    backend = InMemoryRateLimitBackend(clock=clock)
+
+    for _ in range(3):
+        assert await backend.hit([("k", 3)], window=10) == 0
+    assert await backend.hit([("k", 3)], window=10) > 0
+
+    # Half way into the next window half of the previous count still applies.
+    clock.now = 1015.0
+    assert await backend.hit([("k", 3)], window=10) == 0
+    assert await backend.hit([("k", 3)], window=10) > 0
+
+
+@pytest.mark.asyncio
+async def test_stale_and_excess_keys_are_evicted():
+    clock = FakeClock()
+    backend = InMemoryRateLimitBackend(max_keys=2, clock=clock)
+
+    for key in ("a", "b", "c"):
+        await backend.hit([(key, 1)], window=10)
+    assert len(backend) == 2
+
+    clock.now = 1100.0
+    await backend.hit([("d", 1)], window=10)
+    assert len(backend) == 1
+
+
+@pytest.mark.asyncio
+async def test_limiter_raises_with_retry_after():
+    limiter = LoginRateLimiter(
+        InMemoryRateLimitBackend(clock=FakeClock()),
+        per_username=1,
+        per_ip=10,
+        window_seconds=60,
+    )
+    await limiter.check("User@Example.com", "10.0.0.1")
+
+    with pytest.raises(HTTPException) as exc:
+        await limiter.check("user@example.com ", "10.0.0.2")
+    assert exc.value.status_code == 429
+    assert int(exc.value.headers["Retry-After"]) > 0
+
+
+@pytest.mark.asyncio
+async def test_rejected_attempt_is_not_counted_against_other_keys():
+    limiter = LoginRateLimiter(
+        InMemoryRateLimitBackend(clock=FakeClock()),
+        per_username=1,
+        per_ip=2,
+        window_seconds=60,
+    )
+    await limiter.check("blocked", "10.0.0.1")
+    for _ in range(3):
+        with pytest.raises(HTTPException):
+            await limiter.check("blocked", "10.0.0.1")
+
+    # The address still has the attempt the blocked username did not use.
+    await limiter.check("someone-else", "10.0.0.1")
+    with pytest.raises(HTTPException):
+        await limiter.check("a-third-user", "10.0.0.1")
+
+
+@pytest.mark.asyncio
+async def test_login_is_throttled_per_username(async_client):
+    get_login_rate_limiter.cache_clear()
+    limit = get_settings().login_rate_limit_per_username
+
+    for _ in range(limit):
+        response = await async_client.post(
+            "/auth/login", data={"username": "nobody", "password": "wrong"}
+        )
+        assert response.status_code == 401
+
+    response = await async_client.post(
+        "/auth/login", data={"username": "nobody", "password": "wrong"}
+    )
+    assert response.status_code == 429
+    assert "retry-after" in response.headers
+    get_login_rate_limiter.cache_clear()
@@ -0,0 +1,128 @@
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app.api.routes.v1 import grants
+from app.core.compression import decompress_text
+from app.db.session import AsyncSessionLocal
+from app.deps import application as application_deps
+from app.models.application import GeneratedSection
+from app.services.sections import PROMPT_PATH, prompt_sections, section_hashes, splice_sections
+from tests.fakes import FakeGeminiService
+
+SECTIONS = [section.title for section in prompt_sections(PROMPT_PATH.read_text(encoding="utf-8"))]
+
+
+class FakeSectionService(FakeGeminiService):
+    calls = []
+
+    async def generate_grant_application(self, base_prompt, company_data):
+        return "# Application\n\n" + "\n\n".join(f"## {i}. {title}\n\nOriginal {title}." for i, title in enumerate(SECTIONS, 1))
+
+    async def generate_section(self, base_prompt, company_data, section, length, document):
+        self.calls.append(section)
+        # As if one of the calls had fallen back to the flash tier.
+        model_name = "models/fake-flash" if section == "Conclusion" else "models/fake-pro"
+        return f"New {section}: {company_data['questionAnswers'].get('targetMarket')}", model_name
+
+
+@pytest.fixture
+def fake_sections(monkeypatch):
+    FakeSectionService.calls = []
+    monkeypatch.setattr(grants, "GeminiService", FakeSectionService)
+    monkeypatch.setattr(application_deps, "GeminiService", FakeSectionService)
+    return FakeSectionService.calls
+
+
+def test_changed_answer_only_affects_dependent_sections():
+    base_prompt = PROMPT_PATH.read_text(encoding="utf-8")
+    before = {"companyInfo": {"companyName": "Acme", "phone": "1"}, "questionAnswers": {"targetMarket": "labs"}}
+    market = {**before, "questionAnswers": {"targetMarket": "hospitals"}}
+    phone = {**before, "companyInfo": {"companyName": "Acme", "phone": "2"}}
+
+    old = section_hashes(base_prompt, before)
+    assert [t for t, h in section_hashes(base_prompt, market).items() if h != old[t]] == [
+        "Abstract", "Commercialization Plan", "Conclusion", "Bibliography"
+    ]
+    assert [t for t, h in section_hashes(base_prompt, phone).items() if h != old[t]] == ["Management Team"]
+
+
+def test_splice_keeps_headings_and_adds_missing_sections():
+    document = "## 1. Abstract\n\nOld\n\n### Detail\n\nOld detail\n\n## 3. Technical Approach and Methodology\n\nKept\n"
+    assert splice_sections(document, SECTIONS, {"Abstract": "New", "Project Description": "Added"}) == (
+        "## 1. Abstract\n\nNew\n\n## Project Description\n\nAdded\n\n"
+        "## 3. Technical Approach and Methodology\n\nKept\n"
+    )
+
+
+@pytest.mark.asyncio
+async def test_regeneration_rewrites_only_affected_sections(async_client, auth_headers, fake_sections):
+    response = await async_client.post(
+        "/organizations/",
+        json={"organization_name": "Acme", "address": "1 St", "contact_info": "n/a"},
+        headers=auth_headers,
+    )
+    inputs = {"companyInfo": {"companyName": "Acme", "description": "d"}, "questionAnswers": {"targetMarket": "labs"}}
+    response = await async_client.post(
+        "/api/v1/generate-grant-application", json={**inputs, "organizationId": response.json()["id"]},
+        headers=auth_headers,
+    )
+    url = f"/api/v1/applications/{response.json()['applicationId']}"
+
+    # A manual edit to an unaffected section survives regeneration.
+    response = await async_client.get(url, headers=auth_headers)
+    edited = response.json()["content"].replace("Original Risk Assessment.", "Edited risks.")
+    await async_client.post(f"{url}/versions", json={"content": edited}, headers=auth_headers)
+
+    # Nothing changed: the edited head comes back as it is, and no version is added.
+    response = await async_client.post(f"{url}/regenerate", json=inputs, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+    assert fake_sections == []
+    response = await async_client.get(f"{url}/versions", headers=auth_headers)
+    assert [v["version"] for v in response.json()] == [2, 1]
+
+    changed = {**inputs, "questionAnswers": {"targetMarket": "hospitals"}}
+    response = await async_client.post(f"{url}/regenerate", json=changed, headers=auth_headers)
+    assert response.status_code == 201
+    body = response.json()
+    assert body["source"] == "regenerated"
+    assert sorted(fake_sections) == ["Abstract", "Bibliography", "Commercialization Plan", "Conclusion"]
+    assert "## 4. Commercialization Plan\n\nNew Commercialization Plan: hospitals\n\n" in body["content"]
+    assert "Edited risks." in body["content"]
+    assert "Original Project Description." in body["content"]
+    assert body["model_name"] is None
+    assert body["model_metadata"]["models"] == ["models/fake-flash", "models/fake-pro"]
+    async with AsyncSessionLocal() as db:
+        cached = {(row.section, row.model_name) for row in await db.scalars(select(GeneratedSection))}
+    assert {("Conclusion", "models/fake-flash"), ("Commercialization Plan", "models/fake-pro")} <= cached
+
+    # Going back to the original answer is served from the section cache.
+    fake_sections.clear()
+    response = await async_client.post(f"{url}/regenerate", json=inputs, headers=auth_headers)
+    assert fake_sections == []
+    assert response.json()["model_metadata"]["cached_sections"] == [
+        "Abstract", "Commercialization Plan", "Conclusion", "Bibliography"
+    ]
+    assert "Original Commercialization Plan." in response.json()["content"]
+    assert "Edited risks." in response.json()["content"]
+
+
+@pytest.mark.asyncio
+async def test_caching_a_known_section_is_a_no_op(async_client, auth_headers):
+    response = await async_client.post(
+        "/organizations/",
+        json={"organization_name": "Acme", "address": "1 St", "contact_info": "n/a"},
+        headers=auth_headers,
+    )
+    org_id = uuid.UUID(response.json()["id"])
+    async with AsyncSessionLocal() as first, AsyncSessionLocal() as second:
+        await application_deps._cache_sections(first, org_id, {"a" * 64: ("Abstract", "First", None)})
+        await first.commit()
+        # The same hash again, as a concurrent request would write it.
+        await application_deps._cache_sections(second, org_id, {"a" * 64: ("Abstract", "Second", None)})
+        await second.commit()
+
+        cached = await second.get(GeneratedSection, (org_id, "a" * 64))
+        assert decompress_text(cached.compression, cached.content) == "First"
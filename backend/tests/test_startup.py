@@ -0,0 +1,21 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Imported on first use or by the lifespan, never by `import app.main`.
+DEFERRED = ("google.generativeai", "google.api_core", "grpc", "alembic")
+
+
+def test_app_import_does_not_load_heavy_sdks():
+    script = (
+        "import json, sys\n"
+        "import app.main\n"
+        f"print(json.dumps([m for m in {DEFERRED!r} if m in sys.modules]))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    assert json.loads(result.stdout.splitlines()[-1]) == []
@@ -0,0 +1,69 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from app import main
+from app.core import tracing
+from app.services import llm
+
+
+class EchoModel:
+    model_name = "models/echo"
+
+    def generate_content(self, contents, **kwargs):
+        usage = SimpleNamespace(prompt_token_count=3, candidates_token_count=5)
+        return SimpleNamespace(text=contents, usage_metadata=usage)
+
+
+@pytest.fixture
+def spans():
+    exporter = InMemorySpanExporter()
+    main.tracer_provider.add_span_processor(SimpleSpanProcessor(exporter))
+    yield exporter
+    exporter.shutdown()
+
+
+def children(finished, parent):
+    return [s for s in finished if s.parent and s.parent.span_id == parent.context.span_id]
+
+
+@pytest.mark.asyncio
+async def test_llm_call_spans_cross_the_thread_pool(spans):
+    await llm.generate_content(EchoModel(), "hi", "test", "generate")
+
+    finished = spans.get_finished_spans()
+    (call,) = [s for s in finished if s.name == "llm.generate_content"]
+    assert call.attributes["llm.model"] == "models/echo"
+    assert call.attributes["llm.output_tokens"] == 5
+    assert {s.name for s in children(finished, call)} == {"executor.queue", "gemini.generate_content"}
+
+
+@pytest.mark.asyncio
+async def test_request_span_contains_db_queries(spans, async_client, auth_headers):
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    headers = {**auth_headers, "traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"}
+    response = await async_client.get("/organizations/", headers=headers)
+    assert response.status_code == 200
+
+    finished = spans.get_finished_spans()
+    (request,) = [s for s in finished if s.name == "GET /organizations/"]
+    assert format(request.context.trace_id, "032x") == trace_id
+    assert request.attributes["http.response.status_code"] == 200
+    queries = [s for s in children(finished, request) if s.name == "db.query"]
+    assert any("FROM organization" in s.attributes["db.statement"] for s in queries)
+
+
+def test_file_exporter_is_closed_on_shutdown(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing.settings, "tracing_file", str(tmp_path / "traces.jsonl"))
+    exporter = tracing._make_exporter("file")
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    provider.get_tracer("test").start_span("work").end()
+
+    provider.shutdown()
+    assert exporter._file.closed
+    assert json.loads((tmp_path / "traces.jsonl").read_text())["name"] == "work"
@@ -0,0 +1,60 @@
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import insert, text
+
+from app.models.usage import LLMUsage
+from app.services import llm
+from app.services.usage import usage_scope, usage_writer
+
+
+class CountingModel:
+    model_name = "models/counting"
+
+    def generate_content(self, contents, **kwargs):
+        usage = SimpleNamespace(prompt_token_count=10, candidates_token_count=len(contents))
+        return SimpleNamespace(text=contents, usage_metadata=usage)
+
+
+@pytest.mark.asyncio
+async def test_llm_calls_are_rolled_up_per_organization_and_day(async_client, admin_headers):
+    org_id = uuid.uuid4()
+    with usage_scope(org_id):
+        await llm.generate_content(CountingModel(), "abc", "grants", "generate_application")
+        await llm.generate_content(CountingModel(), "abcdef", "grants", "edit")
+    await llm.generate_content(CountingModel(), "unattributed", "grants", "edit")
+    assert await usage_writer.flush() >= 3
+
+    response = await async_client.get(
+        "/admin/usage", params={"organization_id": str(org_id)}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    (rollup,) = response.json()
+    assert rollup["organization_id"] == str(org_id)
+    assert rollup["day"] == datetime.now(timezone.utc).date().isoformat()
+    assert rollup["calls"] == 2
+    assert rollup["failed_calls"] == 0
+    assert rollup["prompt_tokens"] == 20
+    assert rollup["output_tokens"] == 9
+
+
+@pytest.mark.asyncio
+async def test_rollup_days_are_utc_whatever_the_session_timezone(async_client, admin_headers, db_transaction):
+    org_id = uuid.uuid4()
+    await db_transaction.execute(text("SET timezone = 'America/Los_Angeles'"))
+    # 20:00 on the 18th in Los Angeles.
+    await db_transaction.execute(insert(LLMUsage).values(
+        id=uuid.uuid4(), organization_id=org_id, service="grants", operation="edit",
+        model_name="models/counting", prompt_tokens=1, output_tokens=1, latency_ms=1,
+        created_at=datetime(2026, 10, 19, 3, tzinfo=timezone.utc),
+    ))
+
+    response = await async_client.get(
+        "/admin/usage",
+        params={"organization_id": str(org_id), "since": "2026-10-19", "until": "2026-10-19"},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    assert [(r["day"], r["calls"]) for r in response.json()] == [("2026-10-19", 1)]